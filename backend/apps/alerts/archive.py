@@ -0,0 +1,77 @@
+"""
+Archivage des alertes traitées
+
+Les alertes résolues ou acquittées depuis plus de ALERT_ARCHIVE_AFTER_DAYS
+jours sont déplacées par lots dans AlertArchive (métadonnées compressées),
+ce qui garde la table chaude et ses index à la taille des alertes en cours.
+"""
+
+import logging
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from apps.sync import tombstones
+from .models import Alert, AlertArchive
+from . import counters
+
+logger = logging.getLogger(__name__)
+
+
+def archive_alerts(days: int = None, batch_size: int = 1000) -> int:
+    """Archiver les alertes traitées avant la date limite, retourne le nombre d'alertes déplacées"""
+    days = days if days is not None else settings.ALERT_ARCHIVE_AFTER_DAYS
+    cutoff = timezone.now() - timedelta(days=days)
+    eligible = Alert.objects.filter(
+        Q(status='resolved', resolved_at__lt=cutoff) |
+        Q(status='acknowledged', acknowledged_at__lt=cutoff)
+    ).order_by('id')
+
+    started = time.perf_counter()
+    total = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            # skip_locked : un acquittement ou une résolution en cours n'est jamais bloqué
+            batch = list(
+                eligible.filter(id__gt=last_id)
+                .select_for_update(skip_locked=True)[:batch_size]
+            )
+            if not batch:
+                break
+
+            AlertArchive.objects.bulk_create([
+                AlertArchive(
+                    id=alert.id,
+                    user_id=alert.user_id,
+                    alert_type=alert.alert_type,
+                    title=alert.title,
+                    message=alert.message,
+                    severity=alert.severity,
+                    status=alert.status,
+                    location_id=alert.location_id,
+                    metadata_compressed=AlertArchive.compress_metadata(alert.metadata),
+                    occurrence_count=alert.occurrence_count,
+                    last_seen=alert.last_seen,
+                    acknowledged_by_id=alert.acknowledged_by_id,
+                    acknowledged_at=alert.acknowledged_at,
+                    resolved_at=alert.resolved_at,
+                    created_at=alert.created_at,
+                    updated_at=alert.updated_at,
+                )
+                for alert in batch
+            ], ignore_conflicts=True)
+            Alert.objects.filter(id__in=[alert.id for alert in batch]).delete()
+            # Les clients synchronisés retirent les alertes archivées
+            tombstones.record('alerts', [(alert.id, alert.user_id) for alert in batch])
+            counters.record_removed(
+                (alert.user_id, alert.alert_type, alert.severity, alert.status) for alert in batch
+            )
+
+        total += len(batch)
+        last_id = batch[-1].id
+
+    logger.info(f"Archivage des alertes: {total} alertes déplacées en {time.perf_counter() - started:.1f}s")
+    return total
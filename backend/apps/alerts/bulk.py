@@ -0,0 +1,75 @@
+"""
+Acquittement / résolution d'alertes en masse
+
+Une seule requête UPDATE ... RETURNING verrouille les lignes ciblées (déjà
+filtrées selon les droits de l'utilisateur), change leur statut et renvoie
+l'ancien statut de chacune : les compteurs et les abonnés temps réel sont
+ensuite mis à jour en un seul lot.
+"""
+
+import logging
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+from .models import Alert
+from .notifications import broadcast
+from . import counters
+
+logger = logging.getLogger(__name__)
+
+# action -> (nouveau statut, statuts de départ autorisés)
+ACTIONS = {
+    'acknowledge': ('acknowledged', ['active']),
+    'acknowledge_all': ('acknowledged', ['active']),
+    'resolve': ('resolved', ['active', 'acknowledged']),
+}
+
+
+def bulk_transition(queryset, action: str, user, using=DEFAULT_DB_ALIAS) -> list:
+    """
+    Appliquer `action` aux alertes de `queryset`, retourne les ids modifiés.
+    Le queryset doit déjà être restreint aux alertes visibles par `user`.
+    """
+    new_status, from_statuses = ACTIONS[action]
+    now = timezone.now()
+    table = Alert._meta.db_table
+
+    target_sql, target_params = (
+        queryset.filter(status__in=from_statuses)
+        .order_by()
+        .values_list('id', 'status')
+        .query.sql_with_params()
+    )
+    if new_status == 'acknowledged':
+        assignments = 'status = %s, acknowledged_by_id = %s, acknowledged_at = %s, updated_at = %s'
+        params = [new_status, user.id, now, now]
+    else:
+        assignments = 'status = %s, resolved_at = %s, updated_at = %s'
+        params = [new_status, now, now]
+
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH target(id, old_status) AS ({target_sql} FOR UPDATE)
+                UPDATE {table} AS a SET {assignments}
+                FROM target
+                WHERE a.id = target.id
+                RETURNING a.id, a.user_id, a.alert_type, a.severity, target.old_status
+                """,
+                [*target_params, *params]
+            )
+            rows = cursor.fetchall()
+        counters.record_transition([row[1:] for row in rows], new_status, using=using)
+
+    ids = sorted(row[0] for row in rows)
+    if ids:
+        broadcast({
+            'event': 'bulk_update',
+            'action': action,
+            'status': new_status,
+            'alert_ids': ids,
+            'updated_by': user.id,
+            'updated_at': now.isoformat(),
+        }, user_ids=sorted({row[1] for row in rows}))
+        logger.info(f"{len(ids)} alertes passées au statut {new_status} par {user.username}")
+    return ids
@@ -0,0 +1,24 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from apps.tracking.presence import presence
+from .notifications import ORGANIZATION_GROUP, user_group
+
+class AlertConsumer(AsyncJsonWebsocketConsumer):
+    """Alertes en temps réel : groupe de l'utilisateur, plus celui de l'organisation pour les admins"""
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+        # self.groups est quitté automatiquement à la déconnexion
+        self.groups = [user_group(user.id)]
+        if user.role in ['admin', 'organization']:
+            self.groups.append(ORGANIZATION_GROUP)
+        for group in self.groups:
+            await self.channel_layer.group_add(group, self.channel_name)
+        await self.accept()
+        await database_sync_to_async(presence.touch)(user.id)
+
+    async def alert_event(self, event):
+        await self.send_json({key: value for key, value in event.items() if key != 'type'})
@@ -0,0 +1,135 @@
+"""
+Compteurs d'alertes pré-agrégés (table AlertCounter)
+
+Les compteurs sont maintenus de façon incrémentale à la création,
+à l'acquittement et à la résolution des alertes, puis recalés
+périodiquement par `reconcile()` avec un agrégat SQL groupé.
+"""
+
+import logging
+from collections import Counter
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import Count, Sum
+from .models import Alert, AlertCounter
+
+logger = logging.getLogger(__name__)
+
+
+def _apply(deltas: Counter, using=DEFAULT_DB_ALIAS):
+    """Appliquer des deltas {(user_id, alert_type, severity, status): n} en une seule requête"""
+    deltas = {key: n for key, n in deltas.items() if n}
+    if not deltas:
+        return
+
+    table = AlertCounter._meta.db_table
+    values = ', '.join(['(%s, %s, %s, %s, %s)'] * len(deltas))
+    params = [value for key, n in deltas.items() for value in (*key, n)]
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (user_id, alert_type, severity, status, count)
+            VALUES {values}
+            ON CONFLICT (user_id, alert_type, severity, status)
+            DO UPDATE SET count = {table}.count + EXCLUDED.count
+            """,
+            params
+        )
+
+
+def record_created(alert: Alert, using=DEFAULT_DB_ALIAS):
+    """Compter une nouvelle alerte"""
+    _apply(Counter({(alert.user_id, alert.alert_type, alert.severity, alert.status): 1}), using)
+
+
+def record_created_bulk(alerts, using=DEFAULT_DB_ALIAS):
+    """Compter des alertes créées par bulk_create (pas de signal post_save)"""
+    _apply(Counter((alert.user_id, alert.alert_type, alert.severity, alert.status) for alert in alerts), using)
+
+
+def record_changes(rows, using=DEFAULT_DB_ALIAS):
+    """
+    Changer la sévérité et/ou le statut d'alertes existantes.
+    `rows` : itérable de (user_id, alert_type, ancienne_sévérité, ancien_statut, nouvelle_sévérité, nouveau_statut).
+    """
+    deltas = Counter()
+    for user_id, alert_type, old_severity, old_status, new_severity, new_status in rows:
+        if (old_severity, old_status) == (new_severity, new_status):
+            continue
+        deltas[(user_id, alert_type, old_severity, old_status)] -= 1
+        deltas[(user_id, alert_type, new_severity, new_status)] += 1
+    _apply(deltas, using)
+
+
+def record_transition(rows, new_status: str, using=DEFAULT_DB_ALIAS):
+    """
+    Déplacer des alertes d'un statut à un autre.
+    `rows` : itérable de (user_id, alert_type, severity, ancien_statut).
+    """
+    deltas = Counter()
+    for user_id, alert_type, severity, old_status in rows:
+        if old_status == new_status:
+            continue
+        deltas[(user_id, alert_type, severity, old_status)] -= 1
+        deltas[(user_id, alert_type, severity, new_status)] += 1
+    _apply(deltas, using)
+
+
+def record_removed(rows, using=DEFAULT_DB_ALIAS):
+    """
+    Retirer des alertes des compteurs (archivage).
+    `rows` : itérable de (user_id, alert_type, severity, statut).
+    """
+    deltas = Counter()
+    for key in rows:
+        deltas[tuple(key)] -= 1
+    _apply(deltas, using)
+
+
+def summary_for(user) -> dict:
+    """Résumé des alertes visible par l'utilisateur (même logique de rôle que AlertListCreateView)"""
+    counters = AlertCounter.objects.all()
+    if user.role not in ['admin', 'organization']:
+        counters = counters.filter(user=user)
+
+    summary = {
+        'total': 0,
+        'by_status': {key: 0 for key, _ in Alert.STATUS_CHOICES},
+        'by_type': {key: 0 for key, _ in Alert.ALERT_TYPES},
+        'by_severity': {key: 0 for key, _ in Alert.SEVERITY_CHOICES},
+        'active_by_severity': {key: 0 for key, _ in Alert.SEVERITY_CHOICES},
+    }
+    rows = counters.values('alert_type', 'severity', 'status').annotate(total=Sum('count'))
+    for row in rows:
+        n = row['total'] or 0
+        summary['total'] += n
+        summary['by_status'][row['status']] = summary['by_status'].get(row['status'], 0) + n
+        summary['by_type'][row['alert_type']] = summary['by_type'].get(row['alert_type'], 0) + n
+        summary['by_severity'][row['severity']] = summary['by_severity'].get(row['severity'], 0) + n
+        if row['status'] == 'active':
+            summary['active_by_severity'][row['severity']] = \
+                summary['active_by_severity'].get(row['severity'], 0) + n
+    return summary
+
+
+def reconcile() -> int:
+    """Recalculer tous les compteurs à partir de la table Alert, retourne le nombre de lignes écrites"""
+    with transaction.atomic():
+        # Bloque les mises à jour incrémentales le temps du recalcul
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {AlertCounter._meta.db_table} IN EXCLUSIVE MODE')
+
+        rows = (
+            Alert.objects.order_by()
+            .values('user_id', 'alert_type', 'severity', 'status')
+            .annotate(total=Count('id'))
+        )
+        counters = [
+            AlertCounter(user_id=row['user_id'], alert_type=row['alert_type'],
+                         severity=row['severity'], status=row['status'], count=row['total'])
+            for row in rows
+        ]
+        AlertCounter.objects.all().delete()
+        AlertCounter.objects.bulk_create(counters, batch_size=1000)
+
+    logger.info(f"Compteurs d'alertes recalculés: {len(counters)} lignes")
+    return len(counters)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.alerts.archive import archive_alerts
+
+class Command(BaseCommand):
+    help = 'Archiver les alertes résolues ou acquittées depuis plus de N jours'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.ALERT_ARCHIVE_AFTER_DAYS,
+            help='Ancienneté minimale (jours) depuis la résolution ou l\'acquittement',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Nombre d\'alertes déplacées par transaction',
+        )
+
+    def handle(self, *args, **options):
+        total = archive_alerts(days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {total} alertes archivées')
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from apps.alerts import counters
+
+class Command(BaseCommand):
+    help = 'Recalculer les compteurs d\'alertes à partir de la table Alert'
+
+    def handle(self, *args, **options):
+        rows = counters.reconcile()
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Compteurs d\'alertes recalculés ({rows} lignes)')
+        )
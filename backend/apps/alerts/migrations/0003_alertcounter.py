@@ -0,0 +1,48 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counters(apps, schema_editor):
+    Alert = apps.get_model('alerts', 'Alert')
+    AlertCounter = apps.get_model('alerts', 'AlertCounter')
+    rows = (
+        Alert.objects.order_by()
+        .values('user_id', 'alert_type', 'severity', 'status')
+        .annotate(total=Count('id'))
+    )
+    AlertCounter.objects.bulk_create([
+        AlertCounter(user_id=row['user_id'], alert_type=row['alert_type'],
+                     severity=row['severity'], status=row['status'], count=row['total'])
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0002_alert_occurrences'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alert_type', models.CharField(choices=[('emergency', 'Urgence'), ('zone_violation', 'Violation de zone'), ('weather', 'Météo'), ('system', 'Système'), ('maintenance', 'Maintenance')], max_length=20)),
+                ('severity', models.CharField(choices=[('low', 'Faible'), ('medium', 'Moyenne'), ('high', 'Élevée'), ('critical', 'Critique')], max_length=10)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('acknowledged', 'Acquittée'), ('resolved', 'Résolue')], max_length=15)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alert_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='alertcounter',
+            constraint=models.UniqueConstraint(fields=('user', 'alert_type', 'severity', 'status'), name='unique_alert_counter'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:53
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0003_alertcounter'),
+        ('tracking', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('alert_type', models.CharField(choices=[('emergency', 'Urgence'), ('zone_violation', 'Violation de zone'), ('weather', 'Météo'), ('system', 'Système'), ('maintenance', 'Maintenance')], max_length=20)),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('severity', models.CharField(choices=[('low', 'Faible'), ('medium', 'Moyenne'), ('high', 'Élevée'), ('critical', 'Critique')], max_length=10)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('acknowledged', 'Acquittée'), ('resolved', 'Résolue')], max_length=15)),
+                ('metadata_compressed', models.BinaryField(blank=True, default=b'')),
+                ('occurrence_count', models.PositiveIntegerField(default=1)),
+                ('last_seen', models.DateTimeField(blank=True, null=True)),
+                ('acknowledged_at', models.DateTimeField(blank=True, null=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['-created_at'], name='alert_active_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='alertarchive',
+            name='acknowledged_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='alertarchive',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tracking.location'),
+        ),
+        migrations.AddField(
+            model_name='alertarchive',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_alerts', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='alertarchive',
+            index=models.Index(fields=['user', '-created_at'], name='alerts_aler_user_id_e7c69e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alertarchive',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['created_at'], name='alerts_aler_created_02699a_brin'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-19 15:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0004_alertarchive'),
+        ('tracking', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['updated_at', 'id'], name='alert_sync_idx'),
+        ),
+    ]
@@ -1,3 +1,6 @@
+import json
+import zlib
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
 from apps.users.models import User
 from apps.tracking.models import Location
@@ -32,6 +35,8 @@ class Alert(models.Model):
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='active')
     location = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, blank=True)
     metadata = models.JSONField(default=dict, blank=True)
+    occurrence_count = models.PositiveIntegerField(default=1)
+    last_seen = models.DateTimeField(null=True, blank=True)
     acknowledged_by = models.ForeignKey(User, on_delete=models.SET_NULL, 
                                       null=True, blank=True, related_name='acknowledged_alerts')
     acknowledged_at = models.DateTimeField(null=True, blank=True)
@@ -44,7 +49,76 @@ class Alert(models.Model):
         indexes = [
             models.Index(fields=['status', '-created_at']),
             models.Index(fields=['alert_type', 'severity']),
+            models.Index(fields=['-created_at'], condition=models.Q(status='active'),
+                         name='alert_active_created_idx'),
+            # Synchronisation delta : alertes modifiées après un curseur (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='alert_sync_idx'),
         ]
     
     def __str__(self):
-        return f"{self.get_alert_type_display()} - {self.title}"
\ No newline at end of file
+        return f"{self.get_alert_type_display()} - {self.title}"
+
+class AlertCounter(models.Model):
+    """Compteurs d'alertes pré-agrégés par utilisateur, type, sévérité et statut"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='alert_counters')
+    alert_type = models.CharField(max_length=20, choices=Alert.ALERT_TYPES)
+    severity = models.CharField(max_length=10, choices=Alert.SEVERITY_CHOICES)
+    status = models.CharField(max_length=15, choices=Alert.STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'alert_type', 'severity', 'status'],
+                                    name='unique_alert_counter'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} {self.alert_type}/{self.severity}/{self.status}: {self.count}"
+
+
+class AlertArchive(models.Model):
+    """Alertes résolues ou acquittées depuis longtemps, sorties de la table chaude"""
+    # Même identifiant que l'alerte d'origine
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_alerts')
+    alert_type = models.CharField(max_length=20, choices=Alert.ALERT_TYPES)
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    severity = models.CharField(max_length=10, choices=Alert.SEVERITY_CHOICES)
+    status = models.CharField(max_length=15, choices=Alert.STATUS_CHOICES)
+    location = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='+')
+    # JSON des métadonnées (réponses ELock complètes) compressé zlib
+    metadata_compressed = models.BinaryField(blank=True, default=b'')
+    occurrence_count = models.PositiveIntegerField(default=1)
+    last_seen = models.DateTimeField(null=True, blank=True)
+    acknowledged_by = models.ForeignKey(User, on_delete=models.SET_NULL, 
+                                      null=True, blank=True, related_name='+')
+    acknowledged_at = models.DateTimeField(null=True, blank=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            # Insertion chronologique : un index BRIN suffit pour les plages de dates
+            BrinIndex(fields=['created_at']),
+        ]
+    
+    @staticmethod
+    def compress_metadata(metadata) -> bytes:
+        if not metadata:
+            return b''
+        return zlib.compress(json.dumps(metadata, separators=(',', ':')).encode(), 6)
+    
+    @property
+    def metadata(self):
+        if not self.metadata_compressed:
+            return {}
+        return json.loads(zlib.decompress(bytes(self.metadata_compressed)))
+    
+    def __str__(self):
+        return f"[Archive] {self.get_alert_type_display()} - {self.title}"
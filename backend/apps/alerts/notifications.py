@@ -0,0 +1,50 @@
+"""
+Diffusion des alertes en temps réel via le channel layer (Redis)
+
+Groupes :
+- alerts_user_<id> : un utilisateur (pêcheur, navire)
+- alerts_organization : administrateurs et organisations
+"""
+
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+logger = logging.getLogger(__name__)
+
+ORGANIZATION_GROUP = 'alerts_organization'
+
+
+def user_group(user_id) -> str:
+    return f'alerts_user_{user_id}'
+
+
+def broadcast(event: dict, user_ids=(), organization=True) -> bool:
+    """Envoyer un évènement aux utilisateurs et/ou à l'organisation, retourne False si le channel layer est indisponible"""
+    groups = [user_group(user_id) for user_id in user_ids]
+    if organization:
+        groups.append(ORGANIZATION_GROUP)
+    return broadcast_many([(event, groups)])
+
+
+def broadcast_many(messages) -> bool:
+    """
+    Envoyer plusieurs évènements en une seule boucle asynchrone.
+    `messages` : itérable de (évènement, groupes).
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return False
+
+    messages = [({'type': 'alert.event', **event}, groups) for event, groups in messages]
+    try:
+        async def send_all():
+            for message, groups in messages:
+                for group in groups:
+                    await channel_layer.group_send(group, message)
+
+        async_to_sync(send_all)()
+        return True
+    except Exception as e:
+        logger.error(f"Diffusion de l'alerte impossible: {str(e)}")
+        return False
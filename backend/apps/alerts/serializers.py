@@ -10,8 +10,30 @@ class AlertSerializer(serializers.ModelSerializer):
     class Meta:
         model = Alert
         fields = ['id', 'user', 'user_name', 'alert_type', 'title', 'message', 
-                 'severity', 'status', 'location', 'metadata', 'acknowledged_by', 
-                 'acknowledged_by_name', 'acknowledged_at', 'resolved_at', 
-                 'created_at', 'updated_at']
+                 'severity', 'status', 'location', 'metadata', 'occurrence_count', 
+                 'last_seen', 'acknowledged_by', 'acknowledged_by_name', 
+                 'acknowledged_at', 'resolved_at', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at', 'user_name', 
-                           'acknowledged_by_name', 'location']
\ No newline at end of file
+                           'acknowledged_by_name', 'location', 'occurrence_count', 
+                           'last_seen']
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('user__profile', 'acknowledged_by__profile', 'location')
+
+class AlertHistorySerializer(serializers.Serializer):
+    """Ligne d'historique (alertes actives et archivées, sans métadonnées)"""
+    id = serializers.IntegerField()
+    user = serializers.IntegerField(source='user_id')
+    alert_type = serializers.CharField()
+    title = serializers.CharField()
+    message = serializers.CharField()
+    severity = serializers.CharField()
+    status = serializers.CharField()
+    occurrence_count = serializers.IntegerField()
+    last_seen = serializers.DateTimeField()
+    acknowledged_by = serializers.IntegerField(source='acknowledged_by_id')
+    acknowledged_at = serializers.DateTimeField()
+    resolved_at = serializers.DateTimeField()
+    created_at = serializers.DateTimeField()
+    archived = serializers.BooleanField()
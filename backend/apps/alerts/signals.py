@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import Alert
+from . import counters
+
+@receiver(post_save, sender=Alert)
+def count_new_alert(sender, instance, created, using, **kwargs):
+    """Maintenir les compteurs d'alertes à la création"""
+    if created:
+        counters.record_created(instance, using=using)
@@ -0,0 +1,61 @@
+"""
+Déduplication des alertes répétées (alarmes ELock, alertes dispositif)
+
+Une alarme qui se répète toutes les quelques secondes ne doit pas créer une
+alerte par message : tant que la fenêtre n'est pas écoulée, on incrémente
+`occurrence_count` et `last_seen` sur l'alerte active existante.
+La recherche de l'alerte existante passe par une clé de cache (Redis),
+jamais par une requête SQL.
+"""
+
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from .models import Alert
+
+logger = logging.getLogger(__name__)
+
+
+def suppression_key(device_id: str, alert_type: str, cmd_type: str) -> str:
+    return f"alerts:suppress:{device_id}:{alert_type}:{cmd_type}"
+
+
+def create_or_suppress(key: str, window: int = None, **alert_fields):
+    """
+    Créer l'alerte, ou compter une occurrence de plus sur l'alerte active
+    associée à `key` si elle a été vue dans la fenêtre.
+    Retourne (alert_id, created).
+    """
+    window = window if window is not None else settings.ALERT_SUPPRESSION_WINDOW
+    now = timezone.now()
+
+    try:
+        alert_id = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Cache de déduplication indisponible: {str(e)}")
+        alert_id = None
+
+    if alert_id:
+        # Mise à jour par clé primaire ; 0 ligne si l'alerte a été acquittée ou résolue entre-temps
+        updated = Alert.objects.filter(id=alert_id, status='active').update(
+            occurrence_count=F('occurrence_count') + 1,
+            last_seen=now,
+            updated_at=now
+        )
+        if updated:
+            _remember(key, alert_id, window)
+            return alert_id, False
+
+    alert = Alert.objects.create(last_seen=now, **alert_fields)
+    _remember(key, alert.id, window)
+    return alert.id, True
+
+
+def _remember(key: str, alert_id: int, window: int):
+    # Fenêtre glissante : une alarme continue reste regroupée sur la même alerte
+    try:
+        cache.set(key, alert_id, timeout=window)
+    except Exception as e:
+        logger.warning(f"Cache de déduplication indisponible: {str(e)}")
@@ -0,0 +1,12 @@
+from celery import shared_task
+from . import archive, counters
+
+@shared_task
+def reconcile_alert_counters():
+    """Recaler les compteurs d'alertes sur la table Alert"""
+    return counters.reconcile()
+
+@shared_task
+def archive_alerts():
+    """Déplacer les alertes traitées anciennes vers l'archive"""
+    return archive.archive_alerts()
@@ -3,5 +3,10 @@ from . import views
 
 urlpatterns = [
     path('', views.AlertListCreateView.as_view(), name='alerts'),
+    path('summary/', views.alert_summary, name='alert-summary'),
+    path('bulk/', views.bulk_alerts, name='bulk-alerts'),
+    path('history/', views.AlertHistoryView.as_view(), name='alert-history'),
+    path('emergency/', views.emergency_alert, name='emergency-alert'),
     path('<int:alert_id>/acknowledge/', views.acknowledge_alert, name='acknowledge-alert'),
+    path('<int:alert_id>/resolve/', views.resolve_alert, name='resolve-alert'),
 ]
\ No newline at end of file
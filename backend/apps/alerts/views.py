@@ -1,13 +1,31 @@
-from rest_framework import generics, status
+from rest_framework import generics, serializers, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BooleanField, Value
 from django.utils import timezone
-from .models import Alert
-from .serializers import AlertSerializer
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime
+import logging
+import time
+from .models import Alert, AlertArchive
+from .serializers import AlertSerializer, AlertHistorySerializer
+from .notifications import broadcast
+from .bulk import ACTIONS, bulk_transition
+from . import counters
+from apps.monitoring.metrics import metrics
+from apps.tracking.fleet import fleet_index
+from apps.tracking.presence import presence
 from apps.tracking.models import Location
+from pirogue_smart.db_routing import ReplicaReadMixin, replica_reads
+from pirogue_smart.eager_loading import EagerLoadingMixin
+from pirogue_smart.sparse_fields import SparseFieldsMixin
 
-class AlertListCreateView(generics.ListCreateAPIView):
+logger = logging.getLogger(__name__)
+
+class AlertListCreateView(ReplicaReadMixin, SparseFieldsMixin, EagerLoadingMixin, generics.ListCreateAPIView):
     serializer_class = AlertSerializer
     permission_classes = [IsAuthenticated]
     
@@ -34,6 +52,58 @@ class AlertListCreateView(generics.ListCreateAPIView):
         
         serializer.save(user=self.request.user, location=location)
 
+def parse_date_param(value):
+    """Date ou date-heure ISO en datetime aware, None si la valeur est invalide"""
+    try:
+        parsed = parse_datetime(value) or parse_date(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed is None:
+        return None
+    if not isinstance(parsed, datetime):
+        parsed = datetime.combine(parsed, datetime.min.time())
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+HISTORY_FIELDS = ['id', 'user_id', 'alert_type', 'title', 'message', 'severity', 'status', 
+                  'occurrence_count', 'last_seen', 'acknowledged_by_id', 'acknowledged_at', 
+                  'resolved_at', 'created_at']
+
+class AlertHistoryView(ReplicaReadMixin, generics.ListAPIView):
+    """
+    Historique des alertes : table chaude et archive, interrogées ensemble
+    uniquement sur cet endpoint
+    """
+    serializer_class = AlertHistorySerializer
+    permission_classes = [IsAuthenticated]
+    
+    def _filter(self, queryset):
+        user = self.request.user
+        if user.role not in ['admin', 'organization']:
+            queryset = queryset.filter(user=user)
+        params = self.request.query_params
+        if params.get('status'):
+            queryset = queryset.filter(status=params['status'])
+        if params.get('alert_type'):
+            queryset = queryset.filter(alert_type=params['alert_type'])
+        if params.get('since'):
+            queryset = queryset.filter(created_at__gte=self._date('since'))
+        if params.get('until'):
+            queryset = queryset.filter(created_at__lt=self._date('until'))
+        return queryset.order_by()
+
+    def _date(self, name):
+        parsed = parse_date_param(self.request.query_params[name])
+        if parsed is None:
+            raise serializers.ValidationError({name: 'Date invalide'})
+        return parsed
+    
+    def get_queryset(self):
+        hot = self._filter(Alert.objects.all()).values(*HISTORY_FIELDS).annotate(
+            archived=Value(False, output_field=BooleanField()))
+        cold = self._filter(AlertArchive.objects.all()).values(*HISTORY_FIELDS).annotate(
+            archived=Value(True, output_field=BooleanField()))
+        return hot.union(cold, all=True).order_by('-created_at', '-id')
+
 @api_view(['PATCH'])
 @permission_classes([IsAuthenticated])
 def acknowledge_alert(request, alert_id):
@@ -41,16 +111,52 @@ def acknowledge_alert(request, alert_id):
     Acquitter une alerte
     """
     try:
-        alert = Alert.objects.get(id=alert_id)
+        # Ligne verrouillée jusqu'au compteur : deux acquittements simultanés ne comptent qu'une transition
+        with transaction.atomic():
+            alert = Alert.objects.select_for_update().get(id=alert_id)
+            
+            # Vérifier les permissions
+            if request.user.role not in ['admin', 'organization'] and alert.user_id != request.user.id:
+                return Response({'error': 'Permission refusée'}, status=status.HTTP_403_FORBIDDEN)
+            
+            old_status = alert.status
+            alert.status = 'acknowledged'
+            alert.acknowledged_by = request.user
+            alert.acknowledged_at = timezone.now()
+            # Seuls ces champs : occurrence_count / last_seen peuvent être mis à jour en parallèle
+            alert.save(update_fields=['status', 'acknowledged_by', 'acknowledged_at', 'updated_at'])
+            counters.record_transition([(alert.user_id, alert.alert_type, alert.severity, old_status)], alert.status)
         
-        # Vérifier les permissions
-        if request.user.role not in ['admin', 'organization'] and alert.user != request.user:
-            return Response({'error': 'Permission refusée'}, status=status.HTTP_403_FORBIDDEN)
+        serializer = AlertSerializer(alert)
+        return Response(serializer.data)
         
-        alert.status = 'acknowledged'
-        alert.acknowledged_by = request.user
-        alert.acknowledged_at = timezone.now()
-        alert.save()
+    except Alert.DoesNotExist:
+        return Response({'error': 'Alerte non trouvée'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({
+            'error': 'Erreur serveur',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['PATCH'])
+@permission_classes([IsAuthenticated])
+def resolve_alert(request, alert_id):
+    """
+    Résoudre une alerte
+    """
+    try:
+        with transaction.atomic():
+            alert = Alert.objects.select_for_update().get(id=alert_id)
+            
+            # Vérifier les permissions
+            if request.user.role not in ['admin', 'organization'] and alert.user_id != request.user.id:
+                return Response({'error': 'Permission refusée'}, status=status.HTTP_403_FORBIDDEN)
+            
+            old_status = alert.status
+            alert.status = 'resolved'
+            alert.resolved_at = timezone.now()
+            alert.save(update_fields=['status', 'resolved_at', 'updated_at'])
+            counters.record_transition([(alert.user_id, alert.alert_type, alert.severity, old_status)], alert.status)
         
         serializer = AlertSerializer(alert)
         return Response(serializer.data)
@@ -61,4 +167,204 @@ def acknowledge_alert(request, alert_id):
         return Response({
             'error': 'Erreur serveur',
             'details': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+BULK_MAX_IDS = 1000
+BULK_FILTERS = ['alert_type', 'severity', 'user']
+BULK_FILTER_CHOICES = {
+    'alert_type': {key for key, _ in Alert.ALERT_TYPES},
+    'severity': {key for key, _ in Alert.SEVERITY_CHOICES},
+}
+
+def bulk_filter_queryset(queryset, filters):
+    """Appliquer le filtre de acknowledge_all, (queryset, None) ou (None, message d'erreur)"""
+    if not isinstance(filters, dict) or not filters:
+        # Sans filtre, toutes les alertes visibles seraient acquittées
+        return None, 'Filtre requis: ' + ', '.join([*BULK_FILTERS, 'before'])
+    unknown = sorted(set(filters) - {*BULK_FILTERS, 'before'})
+    if unknown:
+        return None, f"Filtres inconnus: {', '.join(unknown)}"
+    for field, choices in BULK_FILTER_CHOICES.items():
+        if field in filters and (not isinstance(filters[field], str) or filters[field] not in choices):
+            return None, f"Valeur de {field} invalide"
+    if 'user' in filters:
+        try:
+            filters = {**filters, 'user': int(filters['user'])}
+        except (TypeError, ValueError):
+            return None, 'Valeur de user invalide'
+    for field in BULK_FILTERS:
+        if field in filters:
+            queryset = queryset.filter(**{field: filters[field]})
+    if 'before' in filters:
+        before = parse_date_param(filters['before'])
+        if before is None:
+            return None, 'Date before invalide'
+        queryset = queryset.filter(created_at__lt=before)
+    return queryset, None
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_alerts(request):
+    """
+    Acquitter ou résoudre des alertes en masse
+    - {"action": "acknowledge" | "resolve", "ids": [...]}
+    - {"action": "acknowledge_all", "filter": {"alert_type", "severity", "user", "before"}}
+    """
+    try:
+        action = request.data.get('action')
+        if action not in ACTIONS:
+            return Response({'error': f"Action invalide, attendu: {', '.join(ACTIONS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        user = request.user
+        queryset = Alert.objects.all()
+        if user.role not in ['admin', 'organization']:
+            queryset = queryset.filter(user=user)
+        
+        if action == 'acknowledge_all':
+            queryset, error = bulk_filter_queryset(queryset, request.data.get('filter'))
+            if error:
+                return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            ids = request.data.get('ids')
+            if not isinstance(ids, list) or not ids:
+                return Response({'error': 'Liste d\'identifiants requise'}, status=status.HTTP_400_BAD_REQUEST)
+            if len(ids) > BULK_MAX_IDS:
+                return Response({'error': f'{BULK_MAX_IDS} alertes maximum par requête'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            try:
+                ids = [int(alert_id) for alert_id in ids]
+            except (TypeError, ValueError):
+                return Response({'error': 'Identifiants invalides'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(id__in=ids)
+        
+        updated = bulk_transition(queryset, action, user)
+        return Response({
+            'action': action,
+            'status': ACTIONS[action][0],
+            'updated': len(updated),
+            'ids': updated
+        })
+        
+    except Exception as e:
+        logger.error(f"Erreur action groupée sur les alertes: {str(e)}")
+        return Response({
+            'error': 'Erreur serveur',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@replica_reads
+def alert_summary(request):
+    """
+    Nombre d'alertes par statut, type et sévérité (servi depuis les compteurs pré-agrégés)
+    """
+    return Response(counters.summary_for(request.user))
+
+def _telemetry(value, cast, low, high):
+    """Vitesse / cap facultatifs d'un SOS : None si absents ou invalides, l'alerte part quand même"""
+    try:
+        value = cast(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return value if low <= value < high else None
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def emergency_alert(request):
+    """
+    Alerte SOS : enregistrement atomique sur la connexion dédiée, recherche des
+    navires les plus proches dans l'index de flotte et diffusion immédiate
+    """
+    started = time.perf_counter()
+    try:
+        user = request.user
+        data = request.data
+        db = settings.EMERGENCY_DB_ALIAS
+        now = timezone.now()
+        
+        latitude = data.get('latitude')
+        longitude = data.get('longitude')
+        has_position = latitude is not None and longitude is not None
+        if has_position:
+            try:
+                latitude, longitude = float(latitude), float(longitude)
+            except (TypeError, ValueError):
+                return Response({'error': 'Coordonnées invalides'}, status=status.HTTP_400_BAD_REQUEST)
+            if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+                return Response({'error': 'Coordonnées invalides'}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            # Sans GPS côté client : dernière position connue du navire
+            last_position = fleet_index.get(user.id)
+            if last_position:
+                latitude, longitude = last_position[0], last_position[1]
+        
+        nearest = []
+        if latitude is not None and longitude is not None:
+            nearest = fleet_index.nearest(latitude, longitude, k=settings.EMERGENCY_NEAREST_VESSELS,
+                                          exclude=[user.id])
+        
+        full_name = getattr(getattr(user, 'profile', None), 'full_name', None) or user.username
+        message = data.get('message') or f'🚨 ALERTE URGENCE - {full_name} demande assistance immédiate'
+        
+        with transaction.atomic(using=db):
+            location = None
+            if has_position:
+                location = Location.objects.using(db).create(
+                    user_id=user.id,
+                    latitude=latitude,
+                    longitude=longitude,
+                    speed=_telemetry(data.get('speed'), lambda value: round(float(value), 2), 0, 1000),
+                    heading=_telemetry(data.get('heading'), lambda value: int(float(value)), 0, 360),
+                    timestamp=now
+                )
+            alert = Alert.objects.using(db).create(
+                user_id=user.id,
+                alert_type='emergency',
+                title=data.get('title') or 'Alerte SOS',
+                message=message,
+                severity='critical',
+                location=location,
+                last_seen=now,
+                metadata={'source': 'sos', 'nearest_vessels': nearest}
+            )
+        
+        if has_position:
+            fleet_index.update(user.id, latitude, longitude, now)
+        
+        notified = broadcast({
+            'event': 'emergency',
+            'alert_id': alert.id,
+            'user_id': user.id,
+            'user_name': full_name,
+            'message': message,
+            'latitude': latitude,
+            'longitude': longitude,
+            'nearest_vessels': nearest,
+            'created_at': now.isoformat(),
+        }, user_ids=[vessel['user_id'] for vessel in nearest])
+        
+        latency = time.perf_counter() - started
+        metrics.observe('emergency_fanout_seconds', latency)
+        if latency * 1000 > settings.EMERGENCY_LATENCY_BUDGET_MS:
+            metrics.inc('emergency_budget_exceeded_total')
+            logger.warning(f"SOS {alert.id}: diffusion en {latency * 1000:.0f}ms "
+                           f"(budget {settings.EMERGENCY_LATENCY_BUDGET_MS}ms)")
+        
+        # Après la diffusion : hors du budget de latence du SOS
+        presence.touch(user.id, fix=has_position, at=now)
+        
+        return Response({
+            'alert': AlertSerializer(alert).data,
+            'nearest_vessels': nearest,
+            'notified': notified,
+            'latency_ms': round(latency * 1000, 1)
+        }, status=status.HTTP_201_CREATED)
+        
+    except Exception as e:
+        logger.error(f"Erreur alerte SOS: {str(e)}")
+        return Response({
+            'error': 'Erreur serveur',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
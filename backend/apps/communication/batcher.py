@@ -0,0 +1,125 @@
+"""
+Persistance des messages de chat par micro-lots
+
+Les consumers diffusent chaque message immédiatement puis le confient au
+batcher de leur boucle asyncio : les messages sont écrits par
+`bulk_create` dès que CHAT_BATCH_SIZE messages sont en attente ou après
+CHAT_BATCH_DELAY_MS millisecondes. Chaque appelant récupère le message
+enregistré (avec son id serveur) une fois le lot écrit, compteurs de non
+lus compris, et chaque canal reçoit un seul évènement `chat.persisted` par
+lot avec les ids attribués. Un lot refusé par la base est réécrit message
+par message : seul le message fautif échoue.
+"""
+
+import asyncio
+import logging
+import weakref
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from apps.monitoring.metrics import metrics
+from .models import Message
+from .sync import notify_channels
+from .unread import record_messages
+
+logger = logging.getLogger(__name__)
+
+
+class MessageBatcher:
+    def __init__(self, batch_size=None, delay_ms=None):
+        self.batch_size = batch_size or getattr(settings, 'CHAT_BATCH_SIZE', 100)
+        self.delay = (delay_ms if delay_ms is not None else getattr(settings, 'CHAT_BATCH_DELAY_MS', 50)) / 1000
+        self._pending = []   # (message, client_id, future)
+        self._timer = None
+
+    async def save(self, message: Message, client_id=None) -> Message:
+        """Mettre le message en attente et attendre l'écriture de son lot"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((message, client_id, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._write(batch))
+
+    async def _write(self, batch):
+        try:
+            messages = await database_sync_to_async(self._bulk_create)([message for message, _, _ in batch])
+            written = list(zip(messages, batch))
+        except Exception as e:
+            # Un message invalide ne doit pas faire perdre les autres messages du lot, déjà diffusés
+            logger.error(f"Enregistrement d'un lot de {len(batch)} messages impossible, "
+                         f"nouvel essai message par message: {str(e)}")
+            written = []
+            for entry in batch:
+                message, _, future = entry
+                try:
+                    saved = await database_sync_to_async(self._bulk_create)([message])
+                    written.append((saved[0], entry))
+                except Exception as e:
+                    logger.error(f"Enregistrement d'un message du canal {message.channel_id} impossible: {str(e)}")
+                    if not future.done():
+                        future.set_exception(e)
+
+        persisted = {}
+        for message, (_, client_id, future) in written:
+            if not future.done():
+                future.set_result(message)
+            persisted.setdefault(message.channel_id, []).append(
+                {'id': message.id, 'client_id': client_id, 'sender': message.sender_id})
+        await self._announce(persisted)
+
+    @staticmethod
+    async def _announce(persisted):
+        """Un évènement par canal pour tout le lot : les clients associent client_id et id serveur"""
+        from .consumers import chat_group
+
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        for channel_id, messages in persisted.items():
+            try:
+                await channel_layer.group_send(chat_group(channel_id), {'type': 'chat.persisted', 'messages': messages})
+            except Exception as e:
+                logger.warning(f"Diffusion des ids du canal {channel_id} impossible: {str(e)}")
+
+    @staticmethod
+    def _bulk_create(messages):
+        created = persist_messages(messages)
+        metrics.observe('chat_persist_batch_size', len(created))
+        return created
+
+
+def persist_messages(messages):
+    """Écrire des messages en une requête, compteurs de non-lus compris, et réveiller les canaux"""
+    # PostgreSQL renvoie les ids générés : pas de relecture nécessaire
+    with transaction.atomic():
+        created = Message.objects.bulk_create(messages)
+        record_messages(created)
+    # bulk_create n'envoie pas post_save : réveil des clients en long-poll, une fois
+    # la transaction englobante validée (téléversements de /api/sync/)
+    channel_ids = [message.channel_id for message in created]
+    transaction.on_commit(lambda: notify_channels(channel_ids))
+    return created
+
+
+# Un batcher par boucle d'évènements (un par processus ASGI en production)
+_batchers = weakref.WeakKeyDictionary()
+
+
+def get_batcher() -> MessageBatcher:
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        batcher = _batchers[loop] = MessageBatcher()
+    return batcher
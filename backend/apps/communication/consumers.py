@@ -0,0 +1,209 @@
+"""
+Chat en temps réel par canal (ws/chat/<channel_id>/)
+
+Protocole JSON :
+- client -> {"type": "message", "content": "...", "client_id": "...", "message_type": "text",
+             "receiver": id, "metadata": {...}}
+  Le message est diffusé tout de suite au groupe du canal (sans id), puis
+  enregistré par micro-lot ; l'expéditeur reçoit {"type": "ack", "client_id", "id",
+  "created_at"} et le groupe {"type": "persisted", "messages": [{"id", "client_id",
+  "sender"}, ...]} une fois par lot.
+- client -> {"type": "resume", "last_id": N} (ou ?last_id=N à la connexion)
+  Le serveur renvoie {"type": "history", "messages": [...], "has_more": bool} avec les
+  messages postérieurs au message N. Le groupe est rejoint avant la lecture : un message peut arriver
+  à la fois en direct et dans l'historique, le client dédoublonne par id / client_id.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from django.utils import timezone
+from apps.monitoring.metrics import metrics
+from apps.tracking.presence import presence
+from apps.users.models import User
+from . import sync
+from .batcher import get_batcher
+from .models import Message
+
+logger = logging.getLogger(__name__)
+
+MAX_CONTENT_LENGTH = 5000
+MAX_MESSAGE_TYPE_LENGTH = Message._meta.get_field('message_type').max_length
+
+
+def chat_group(channel_id: str) -> str:
+    """Nom de groupe valide pour le channel layer (caractères et longueur limités)"""
+    return 'chat_' + re.sub(r'[^\w.-]', '_', channel_id)[:90]
+
+
+def message_payload(message: Message, sender_name=None, client_id=None) -> dict:
+    return {
+        'id': message.id,
+        'client_id': client_id,
+        'sender': message.sender_id,
+        'sender_name': sender_name,
+        'receiver': message.receiver_id,
+        'channel_id': message.channel_id,
+        'content': message.content,
+        'message_type': message.message_type,
+        'created_at': message.created_at.isoformat() if message.created_at else None,
+        'is_read': message.is_read,
+        'metadata': message.metadata,
+    }
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+
+    async def connect(self):
+        self.user = self.scope.get('user')
+        if self.user is None or not self.user.is_authenticated:
+            await self.close(code=4401)
+            return
+        self.channel_id = self.scope['url_route']['kwargs']['channel_id']
+        self.pending = set()
+        self.receivers = {self.user.id}  # destinataires déjà vérifiés sur cette connexion
+        self.closed = False
+        self.group = chat_group(self.channel_id)
+        self.sender_name = await self._sender_name()
+
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+        self.seen_at = 0
+        await self._touch_presence()
+
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        last_id = (query.get('last_id') or [None])[0]
+        if last_id is not None:
+            await self._send_history(last_id)
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group'):
+            await self.channel_layer.group_discard(self.group, self.channel_name)
+        # Les lots en cours sont écrits quand même (tâches du batcher), seuls les accusés sont abandonnés
+        self.closed = True
+
+    async def receive_json(self, content, **kwargs):
+        await self._touch_presence()
+        kind = content.get('type')
+        if kind == 'message':
+            await self._handle_message(content)
+        elif kind == 'resume':
+            await self._send_history(content.get('last_id'))
+        else:
+            await self.send_json({'type': 'error', 'error': 'Type de message inconnu'})
+
+    async def _touch_presence(self):
+        # Au plus une écriture par PRESENCE_TOUCH_INTERVAL secondes et par connexion
+        now = time.monotonic()
+        if now - self.seen_at >= getattr(settings, 'PRESENCE_TOUCH_INTERVAL', 30):
+            self.seen_at = now
+            await database_sync_to_async(presence.touch)(self.user.id)
+
+    async def _handle_message(self, content):
+        client_id = content.get('client_id')
+        text = content.get('content')
+        if not isinstance(text, str) or not text.strip() or len(text) > MAX_CONTENT_LENGTH:
+            await self.send_json({'type': 'error', 'client_id': client_id, 'error': 'Contenu invalide'})
+            return
+
+        try:
+            receiver_id = int(content.get('receiver') or self.user.id)
+        except (TypeError, ValueError):
+            receiver_id = None
+        # Vérifié avant la diffusion : une clé étrangère invalide ferait échouer l'écriture
+        if receiver_id is None or not await self._receiver_exists(receiver_id):
+            await self.send_json({'type': 'error', 'client_id': client_id, 'error': 'Destinataire invalide'})
+            return
+        message_type = content.get('message_type') or 'text'
+        if not isinstance(message_type, str) or len(message_type) > MAX_MESSAGE_TYPE_LENGTH:
+            await self.send_json({'type': 'error', 'client_id': client_id, 'error': 'Type de message invalide'})
+            return
+        message = Message(
+            sender_id=self.user.id,
+            # Sans destinataire (message de canal), receiver = expéditeur comme pour l'upload d'image
+            receiver_id=receiver_id,
+            channel_id=self.channel_id,
+            content=text,
+            message_type=message_type,
+            metadata=content.get('metadata'),
+        )
+
+        # Diffusion immédiate, l'enregistrement suit par lot
+        payload = message_payload(message, self.sender_name, client_id)
+        payload['created_at'] = timezone.now().isoformat()
+        await self.channel_layer.group_send(self.group, {'type': 'chat.message', 'message': payload})
+        metrics.inc('chat_messages_total', result='broadcast')
+
+        # Attente du lot hors de la boucle de dispatch : le consumer continue de recevoir
+        # les diffusions du groupe pendant l'écriture
+        task = asyncio.create_task(self._persist(message, client_id))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    async def _persist(self, message, client_id):
+        try:
+            saved = await get_batcher().save(message, client_id)
+        except Exception:
+            metrics.inc('chat_messages_total', result='error')
+            if self.closed:
+                return
+            await self.send_json({'type': 'error', 'client_id': client_id, 'error': 'Message non enregistré'})
+            return
+        metrics.inc('chat_messages_total', result='persisted')
+        if self.closed:
+            return
+        await self.send_json({
+            'type': 'ack',
+            'client_id': client_id,
+            'id': saved.id,
+            'created_at': saved.created_at.isoformat(),
+        })
+
+    async def _send_history(self, last_id):
+        try:
+            last_id = int(last_id or 0)
+        except (TypeError, ValueError):
+            await self.send_json({'type': 'error', 'error': 'last_id invalide'})
+            return
+        messages, has_more = await self._messages_after(last_id)
+        if messages is None:
+            await self.send_json({'type': 'error', 'error': 'last_id introuvable dans ce canal'})
+            return
+        await self.send_json({'type': 'history', 'messages': messages, 'has_more': has_more})
+
+    @database_sync_to_async
+    def _messages_after(self, last_id):
+        # Même parcours par curseur (created_at, id) que la synchronisation HTTP
+        position = sync.cursor_position(self.channel_id, last_id) if last_id else None
+        if last_id and position is None:
+            return None, False
+        messages, has_more = sync.messages_after(
+            self.channel_id, position, getattr(settings, 'CHAT_RESUME_LIMIT', 500))
+        payloads = [
+            message_payload(message, getattr(getattr(message.sender, 'profile', None), 'full_name', None))
+            for message in messages
+        ]
+        return payloads, has_more
+
+    async def _receiver_exists(self, receiver_id):
+        if receiver_id not in self.receivers:
+            if not await database_sync_to_async(User.objects.filter(id=receiver_id, is_active=True).exists)():
+                return False
+            self.receivers.add(receiver_id)
+        return True
+
+    @database_sync_to_async
+    def _sender_name(self):
+        profile = getattr(self.user, 'profile', None)
+        return getattr(profile, 'full_name', None) or self.user.username
+
+    async def chat_message(self, event):
+        await self.send_json({'type': 'message', **event['message']})
+
+    async def chat_persisted(self, event):
+        await self.send_json({'type': 'persisted', 'messages': event['messages']})
@@ -0,0 +1,186 @@
+"""
+Images du chat : stockage rapide à l'upload, variantes générées en tâche de fond
+
+À l'upload, le fichier est haché (SHA-256) et rangé sous un chemin dérivé
+du hash : un contenu déjà reçu n'est ni réécrit ni retraité, le message
+pointe sur l'image existante. Le worker Celery génère ensuite, pour chaque
+taille de CHAT_IMAGE_VARIANTS, une version WebP et une version JPEG
+réduites, orientées selon l'EXIF puis enregistrées sans aucune métadonnée
+(position GPS, appareil...). Les clients mobiles téléchargent la vignette
+plutôt que l'original.
+"""
+
+import hashlib
+import io
+import logging
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+from .models import ChatImage
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/jpg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+}
+
+
+def variant_specs() -> dict:
+    """{nom: (plus grand côté en pixels, qualité)}, de la plus grande à la plus petite"""
+    variants = getattr(settings, 'CHAT_IMAGE_VARIANTS', {
+        'large': (2048, 85),
+        'medium': (1024, 80),
+        'thumb': (320, 70),
+    })
+    return dict(sorted(variants.items(), key=lambda item: -item[1][0]))
+
+
+def content_hash(upload) -> str:
+    digest = hashlib.sha256()
+    for chunk in upload.chunks():
+        digest.update(chunk)
+    upload.seek(0)
+    return digest.hexdigest()
+
+
+def _original_path(sha256, content_type):
+    return f"chat_images/originals/{sha256[:2]}/{sha256}.{EXTENSIONS.get(content_type, 'bin')}"
+
+
+def _variant_path(sha256, name, extension):
+    return f"chat_images/variants/{sha256[:2]}/{sha256}/{name}.{extension}"
+
+
+def store_upload(upload):
+    """Enregistrer l'upload une seule fois par contenu, retourne (ChatImage, créée)"""
+    sha256 = content_hash(upload)
+    existing = ChatImage.objects.filter(sha256=sha256).first()
+    if existing is not None:
+        return existing, False
+
+    path = _original_path(sha256, upload.content_type)
+    # Chemin dérivé du contenu : deux uploads simultanés écrivent le même fichier
+    name = path if default_storage.exists(path) else default_storage.save(path, upload)
+    try:
+        with transaction.atomic():
+            image = ChatImage.objects.create(
+                sha256=sha256, original=name, content_type=upload.content_type, size=upload.size)
+        return image, True
+    except IntegrityError:
+        return ChatImage.objects.get(sha256=sha256), False
+
+
+def _encode(image, extension, quality):
+    buffer = io.BytesIO()
+    if extension == 'webp':
+        image.save(buffer, 'WEBP', quality=quality, method=4)
+    else:
+        if image.mode != 'RGB':
+            # Pas de transparence en JPEG : fond blanc
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+            image = background
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def generate_variants(chat_image: ChatImage) -> dict:
+    """Générer et enregistrer les variantes WebP/JPEG sans métadonnées, retourne le dict `variants`"""
+    specs = variant_specs()
+    with default_storage.open(chat_image.original.name, 'rb') as source:
+        image = Image.open(source)
+        # JPEG : décodage directement à l'échelle réduite quand l'original est bien plus grand
+        largest = max(size for size, _ in specs.values())
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    # Nouvelle image sans info : aucune métadonnée (EXIF, XMP, ICC) n'est recopiée
+    image = Image.frombytes(image.mode, image.size, image.tobytes())
+    width, height = image.size
+
+    variants, by_size = {}, {}
+    current = image
+    for name, (max_side, quality) in specs.items():
+        # Réduction en cascade : chaque variante part de la précédente, jamais d'agrandissement
+        if max(current.size) > max_side:
+            current = current.copy()
+            current.thumbnail((max_side, max_side), Image.LANCZOS, reducing_gap=3.0)
+        if current.size in by_size:
+            variants[name] = variants[by_size[current.size]]
+            continue
+        entry = {'width': current.size[0], 'height': current.size[1]}
+        for extension in ('webp', 'jpeg'):
+            data = _encode(current, extension, quality)
+            path = _variant_path(chat_image.sha256, name, 'jpg' if extension == 'jpeg' else extension)
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            entry[extension] = default_storage.save(path, ContentFile(data))
+            entry[f'{extension}_size'] = len(data)
+        variants[name] = entry
+        by_size[current.size] = name
+
+    chat_image.width, chat_image.height = width, height
+    chat_image.variants = variants
+    chat_image.status = 'ready'
+    chat_image.processed_at = timezone.now()
+    chat_image.save(update_fields=['width', 'height', 'variants', 'status', 'processed_at'])
+    return variants
+
+
+def process(chat_image_id):
+    """Traitement d'une image (tâche Celery), l'échec est enregistré sur l'image"""
+    chat_image = ChatImage.objects.filter(id=chat_image_id).first()
+    if chat_image is None or chat_image.status == 'ready':
+        return None
+    try:
+        variants = generate_variants(chat_image)
+    except Exception as e:
+        logger.error(f"Traitement de l'image {chat_image.sha256} impossible: {str(e)}")
+        ChatImage.objects.filter(id=chat_image.id).update(status='failed', processed_at=timezone.now())
+        return None
+    logger.info(
+        f"Image {chat_image.sha256[:12]} traitée: "
+        + ', '.join(f"{name} {entry['webp_size'] // 1024} Ko" for name, entry in variants.items())
+    )
+    return variants
+
+
+def schedule(chat_image: ChatImage):
+    """Confier l'image au pool de workers après validation de la transaction"""
+    from .tasks import process_chat_image
+
+    def enqueue():
+        try:
+            process_chat_image.delay(chat_image.id)
+        except Exception as e:
+            # Broker indisponible : traitement immédiat plutôt qu'une image sans variantes
+            logger.warning(f"Mise en file de l'image {chat_image.sha256[:12]} impossible ({str(e)}), traitement direct")
+            process(chat_image.id)
+
+    transaction.on_commit(enqueue)
+
+
+def variant_urls(chat_image: ChatImage, build_url=None) -> dict:
+    """{nom: {'width', 'height', 'webp': url, 'jpeg': url}} des variantes prêtes"""
+    if chat_image is None or chat_image.status != 'ready':
+        return {}
+    build_url = build_url or (lambda url: url)
+    return {
+        name: {
+            'width': entry['width'],
+            'height': entry['height'],
+            'webp': build_url(default_storage.url(entry['webp'])),
+            'jpeg': build_url(default_storage.url(entry['jpeg'])),
+        }
+        for name, entry in chat_image.variants.items()
+    }
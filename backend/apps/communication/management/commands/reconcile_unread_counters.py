@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from apps.communication import unread
+
+class Command(BaseCommand):
+    help = 'Recalculer les compteurs de messages non lus à partir des messages'
+
+    def handle(self, *args, **options):
+        rows = unread.reconcile()
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Compteurs de non-lus recalculés ({rows} corrigés)')
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-19 15:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['channel_id', 'created_at', 'id'], name='message_channel_sync_idx'),
+        ),
+    ]
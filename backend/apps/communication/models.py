@@ -1,5 +1,7 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 
 class Zone(models.Model):
     name = models.CharField(max_length=255)
@@ -31,6 +33,34 @@ class Alert(models.Model):
     location = models.JSONField(blank=True, null=True)
     metadata = models.JSONField(blank=True, null=True)
 
+class ChatImage(models.Model):
+    """Image de chat stockée une seule fois par contenu (SHA-256), avec ses variantes réduites"""
+    STATUS_CHOICES = [
+        ('pending', 'En attente'),
+        ('ready', 'Prête'),
+        ('failed', 'Échec'),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    original = models.ImageField(upload_to='chat_images/originals/')
+    content_type = models.CharField(max_length=50)
+    size = models.PositiveIntegerField()
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    # {taille: {'width', 'height', 'webp': chemin, 'jpeg': chemin, 'webp_size', 'jpeg_size'}}
+    variants = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.sha256
+
+class MessageManager(models.Manager):
+    def get_queryset(self):
+        # Le vecteur de recherche ne sert qu'aux filtres SQL : jamais chargé avec les messages
+        return super().get_queryset().defer('search_vector')
+
 class Message(models.Model):
     sender = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -46,9 +76,52 @@ class Message(models.Model):
     content = models.TextField()
     message_type = models.CharField(max_length=50)
     image = models.ImageField(upload_to='chat_images/', blank=True, null=True)
+    image_asset = models.ForeignKey(ChatImage, on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='messages')
     created_at = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
     metadata = models.JSONField(blank=True, null=True)
+    # Recherche plein texte : calculé et stocké par PostgreSQL à chaque écriture
+    search_vector = models.GeneratedField(
+        expression=SearchVector('content', config='french'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = MessageManager()
+
+    class Meta:
+        indexes = [
+            # Synchronisation incrémentale par canal (curseurs after_id / before_id)
+            models.Index(fields=['channel_id', 'created_at', 'id'], name='message_channel_sync_idx'),
+            GinIndex(fields=['search_vector'], name='message_search_idx'),
+        ]
+
+class ChannelReadState(models.Model):
+    """Position de lecture et compteur de messages non lus d'un utilisateur dans un canal"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='channel_read_states'
+    )
+    channel_id = models.CharField(max_length=255)
+    # Dernier message lu : les non-lus sont les messages d'autrui après (last_read_at, last_read_id)
+    last_read_id = models.BigIntegerField(default=0)
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    unread_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'channel_id'], name='unique_channel_read_state'),
+        ]
+        indexes = [
+            # Incrément de tous les lecteurs d'un canal à chaque nouveau message
+            models.Index(fields=['channel_id'], name='read_state_channel_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.channel_id}: {self.unread_count}"
 
 class Location(models.Model):
     user = models.ForeignKey(
@@ -0,0 +1,8 @@
+from django.urls import path, re_path
+from apps.alerts.consumers import AlertConsumer
+from . import consumers
+
+websocket_urlpatterns = [
+    re_path(r'^ws/chat/(?P<channel_id>[\w.-]{1,100})/$', consumers.ChatConsumer.as_asgi()),
+    path('ws/alerts/', AlertConsumer.as_asgi()),
+]
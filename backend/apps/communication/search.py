@@ -0,0 +1,77 @@
+"""
+Recherche plein texte dans les messages
+
+PostgreSQL tient à jour la colonne générée `search_vector`
+(to_tsvector('french', content)) indexée en GIN : la recherche ne lit que
+les messages contenant les termes demandés, racinisés en français
+(« moteurs » trouve « moteur »). La requête utilise la syntaxe web
+(guillemets pour une expression, - pour exclure un mot, or).
+
+Résultats triés par pertinence (ou du plus récent au plus ancien) et
+paginés par curseur sur (rang, id) : une page suivante ne relit pas les
+pages précédentes.
+"""
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+from django.utils.dateparse import parse_datetime
+from .models import Message
+
+ORDERS = ('rank', 'recent')
+
+
+def encode_cursor(message, order):
+    """Curseur de la page suivante : position du dernier message renvoyé"""
+    if order == 'rank':
+        # repr d'un float : relu à l'identique par float()
+        return f'{message.rank!r}:{message.id}'
+    return f'{message.created_at.isoformat()}:{message.id}'
+
+
+def decode_cursor(cursor, order):
+    """(valeur, id) du curseur, ValueError s'il est invalide"""
+    value, message_id = cursor.rsplit(':', 1)
+    if order == 'rank':
+        return float(value), int(message_id)
+    created_at = parse_datetime(value)
+    if created_at is None:
+        raise ValueError(cursor)
+    return created_at, int(message_id)
+
+
+def search_messages(text, channels=None, since=None, until=None, order='rank', cursor=None, limit=None):
+    """Messages correspondant à `text` ; retourne (messages, has_more), chaque message portant `rank`"""
+    limit = limit or getattr(settings, 'CHAT_SEARCH_PAGE_SIZE', 20)
+    query = SearchQuery(text, config='french', search_type='websearch')
+
+    queryset = Message.objects.filter(search_vector=query).annotate(
+        # ts_rank renvoie un real : converti en double pour que le curseur se compare exactement
+        rank=Cast(SearchRank(F('search_vector'), query), FloatField()),
+    )
+    if channels:
+        queryset = queryset.filter(channel_id__in=channels)
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    if until is not None:
+        queryset = queryset.filter(created_at__lt=until)
+
+    if order == 'rank':
+        if cursor is not None:
+            rank, message_id = cursor
+            queryset = queryset.filter(Q(rank__lt=rank) | Q(rank=rank, id__lt=message_id))
+        queryset = queryset.order_by('-rank', '-id')
+    else:
+        if cursor is not None:
+            created_at, message_id = cursor
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(id__lt=message_id),
+                created_at__lte=created_at,
+            )
+        queryset = queryset.order_by('-created_at', '-id')
+
+    messages = list(
+        queryset.select_related('sender__profile', 'receiver__profile', 'image_asset')[:limit + 1]
+    )
+    return messages[:limit], len(messages) > limit
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .images import variant_urls
 from .models import Message, Channel
 from apps.users.serializers import UserSerializer
 
@@ -6,22 +7,37 @@ class MessageSerializer(serializers.ModelSerializer):
     sender_name = serializers.CharField(source='sender.profile.full_name', read_only=True)
     receiver_name = serializers.CharField(source='receiver.profile.full_name', read_only=True)
     image_url = serializers.SerializerMethodField()
+    image_status = serializers.CharField(source='image_asset.status', read_only=True, default=None)
+    image_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = Message
         fields = ['id', 'sender', 'sender_name', 'receiver', 'receiver_name', 
-                 'channel_id', 'content', 'message_type', 'image', 'image_url', 'created_at', 
-                 'is_read', 'metadata']
-        read_only_fields = ['id', 'created_at', 'sender_name', 'receiver_name', 'image_url']
+                 'channel_id', 'content', 'message_type', 'image', 'image_url', 'image_status',
+                 'image_variants', 'created_at', 'is_read', 'metadata']
+        read_only_fields = ['id', 'created_at', 'sender_name', 'receiver_name', 'image_url',
+                            'image_status', 'image_variants']
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('sender__profile', 'receiver__profile', 'image_asset')
     
+    def _absolute(self, url):
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
     def get_image_url(self, obj):
+        # Variante « large » sans métadonnées dès qu'elle existe, original en attendant
+        variants = self.get_image_variants(obj)
+        if variants:
+            return variants[max(variants, key=lambda name: variants[name]['width'])]['jpeg']
         if obj.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.image.url)
-            return obj.image.url
+            return self._absolute(obj.image.url)
         return None
 
+    def get_image_variants(self, obj):
+        return variant_urls(obj.image_asset, self._absolute) if obj.image_asset_id else {}
+
 class ChannelSerializer(serializers.ModelSerializer):
     created_by_name = serializers.CharField(source='created_by.profile.full_name', read_only=True)
     member_count = serializers.SerializerMethodField()
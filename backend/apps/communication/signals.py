@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import Message
+from .sync import notify_channels
+from .unread import record_messages
+
+@receiver(post_save, sender=Message)
+def message_created(sender, instance, created, using, **kwargs):
+    """Compter le message comme non lu puis réveiller les clients en attente sur le canal"""
+    if created:
+        # Dans la transaction de l'insertion : compteur et message sont validés ensemble
+        record_messages([instance], using=using)
+        transaction.on_commit(lambda: notify_channels([instance.channel_id]), using=using)
@@ -0,0 +1,102 @@
+"""
+Synchronisation incrémentale des messages d'un canal
+
+Les messages sont parcourus par curseur (keyset) sur (created_at, id), le
+long de l'index (channel_id, created_at, id) : une actualisation ne lit et
+ne renvoie que les messages postérieurs au dernier id connu du client,
+quelle que soit la taille de l'historique.
+
+Chaque canal a un numéro de version dans le cache partagé (celui du cache
+HTTP), incrémenté à chaque nouveau message. En mode long-poll, la vue
+surveille cette version et n'interroge la base que lorsqu'elle change.
+"""
+
+import time
+from django.conf import settings
+from django.db.models import Q
+from pirogue_smart.http_cache import bump_version, get_version
+from .models import Message
+
+
+def _resource(channel_id):
+    return f'chat:{channel_id}'
+
+
+def notify_channels(channel_ids):
+    """Signaler de nouveaux messages sur ces canaux (à appeler après validation de la transaction)"""
+    for channel_id in set(channel_ids):
+        bump_version(_resource(channel_id))
+
+
+def channel_version(channel_id):
+    return get_version(_resource(channel_id))[0]
+
+
+def cursor_position(channel_id, message_id):
+    """(created_at, id) du message servant de curseur, None s'il n'existe pas dans ce canal"""
+    created_at = (
+        Message.objects.filter(channel_id=channel_id, id=message_id)
+        .values_list('created_at', flat=True)
+        .first()
+    )
+    return (created_at, message_id) if created_at is not None else None
+
+
+def after_position(queryset, position):
+    """Restreindre aux messages postérieurs à la position (created_at, id)"""
+    if position is None:
+        return queryset
+    created_at, message_id = position
+    # created_at >= borne l'intervalle parcouru dans l'index, le OR départage les égalités
+    return queryset.filter(
+        Q(created_at__gt=created_at) | Q(id__gt=message_id),
+        created_at__gte=created_at,
+    )
+
+
+def messages_after(channel_id, position, limit):
+    """Messages postérieurs au curseur, du plus ancien au plus récent ; retourne (messages, has_more)"""
+    queryset = after_position(Message.objects.filter(channel_id=channel_id), position)
+    messages = list(
+        queryset.select_related('sender__profile', 'receiver__profile', 'image_asset')
+        .order_by('created_at', 'id')[:limit + 1]
+    )
+    return messages[:limit], len(messages) > limit
+
+
+def messages_before(channel_id, position, limit):
+    """
+    Messages antérieurs au curseur (ou les plus récents sans curseur), renvoyés
+    du plus ancien au plus récent ; retourne (messages, has_more)
+    """
+    queryset = Message.objects.filter(channel_id=channel_id)
+    if position is not None:
+        created_at, message_id = position
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(id__lt=message_id),
+            created_at__lte=created_at,
+        )
+    messages = list(
+        queryset.select_related('sender__profile', 'receiver__profile', 'image_asset')
+        .order_by('-created_at', '-id')[:limit + 1]
+    )
+    return messages[:limit][::-1], len(messages) > limit
+
+
+def wait_for_messages(channel_id, position, limit, timeout):
+    """
+    Long-poll : attendre jusqu'à `timeout` secondes des messages postérieurs au
+    curseur. La base n'est relue que lorsque la version du canal change (ou à
+    chaque tour si le cache est indisponible).
+    """
+    interval = getattr(settings, 'CHAT_SYNC_POLL_MS', 250) / 1000
+    deadline = time.monotonic() + timeout
+    version = channel_version(channel_id)
+    messages, has_more = messages_after(channel_id, position, limit)
+    while not messages and time.monotonic() < deadline:
+        time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+        current = channel_version(channel_id)
+        if current is None or current != version:
+            version = current
+            messages, has_more = messages_after(channel_id, position, limit)
+    return messages, has_more
@@ -0,0 +1,13 @@
+from celery import shared_task
+from . import images, unread
+
+@shared_task
+def process_chat_image(chat_image_id):
+    """Générer les variantes WebP/JPEG sans métadonnées d'une image de chat"""
+    images.process(chat_image_id)
+    return chat_image_id
+
+@shared_task
+def reconcile_unread_counters():
+    """Recaler les compteurs de non-lus sur les messages"""
+    return unread.reconcile()
@@ -0,0 +1,122 @@
+"""
+Messages non lus par utilisateur et par canal (table ChannelReadState)
+
+Chaque lecteur d'un canal a une position de lecture et un compteur de non
+lus, maintenu de façon incrémentale :
+- à l'insertion, tous les lecteurs du canal sont incrémentés en une requête
+  (l'expéditeur ne compte pas ses propres messages et devient lecteur du
+  canal s'il ne l'était pas) ;
+- à la lecture, la position avance et le compteur est recalculé sur les
+  seuls messages restant après la nouvelle position.
+Le badge se lit donc en une ligne par canal, sans parcourir les messages.
+`reconcile()` recale périodiquement tous les compteurs.
+"""
+
+import logging
+from collections import Counter
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from .models import ChannelReadState, Message
+from .sync import after_position
+
+logger = logging.getLogger(__name__)
+
+
+def record_messages(messages, using=DEFAULT_DB_ALIAS):
+    """Compter de nouveaux messages (à appeler dans la transaction qui les insère)"""
+    messages = list(messages)
+    if not messages:
+        return
+
+    totals = Counter(message.channel_id for message in messages)
+    own = Counter((message.channel_id, message.sender_id) for message in messages)
+    last_sent = {}
+    for message in messages:
+        last_sent[(message.channel_id, message.sender_id)] = message
+
+    table = ChannelReadState._meta.db_table
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table} AS s SET unread_count = s.unread_count + v.total, updated_at = now()
+            FROM (VALUES {', '.join(['(%s, %s)'] * len(totals))}) AS v(channel_id, total)
+            WHERE s.channel_id = v.channel_id
+            """,
+            [value for item in totals.items() for value in item]
+        )
+        # Ses propres messages ne sont pas « non lus » pour l'expéditeur
+        cursor.execute(
+            f"""
+            UPDATE {table} AS s SET unread_count = s.unread_count - v.own
+            FROM (VALUES {', '.join(['(%s, %s, %s)'] * len(own))}) AS v(channel_id, user_id, own)
+            WHERE s.channel_id = v.channel_id AND s.user_id = v.user_id
+            """,
+            [value for (channel_id, user_id), n in own.items() for value in (channel_id, user_id, n)]
+        )
+        # Premier message dans ce canal : l'expéditeur en devient lecteur, à jour
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (user_id, channel_id, last_read_id, last_read_at, unread_count, updated_at)
+            VALUES {', '.join(['(%s, %s, %s, %s, 0, now())'] * len(last_sent))}
+            ON CONFLICT (user_id, channel_id) DO NOTHING
+            """,
+            [value for (channel_id, user_id), message in last_sent.items()
+             for value in (user_id, channel_id, message.id, message.created_at)]
+        )
+
+
+def mark_read(user, message: Message) -> ChannelReadState:
+    """Avancer la position de lecture de l'utilisateur jusqu'à `message` (jamais en arrière)"""
+    with transaction.atomic():
+        # Verrou sur la ligne : une insertion concurrente attend la fin du recalcul
+        state, _ = ChannelReadState.objects.select_for_update().get_or_create(
+            user=user, channel_id=message.channel_id)
+        if state.last_read_at is not None and \
+                (message.created_at, message.id) <= (state.last_read_at, state.last_read_id):
+            return state
+
+        position = (message.created_at, message.id)
+        state.last_read_id, state.last_read_at = message.id, message.created_at
+        state.unread_count = after_position(
+            Message.objects.filter(channel_id=message.channel_id).exclude(sender=user), position
+        ).count()
+        state.save(update_fields=['last_read_id', 'last_read_at', 'unread_count', 'updated_at'])
+    return state
+
+
+def unread_for(user) -> dict:
+    """Non lus de l'utilisateur par canal"""
+    states = ChannelReadState.objects.filter(user=user).order_by('channel_id')
+    channels = [
+        {'channel_id': state.channel_id, 'unread': max(state.unread_count, 0), 'last_read_id': state.last_read_id}
+        for state in states.only('channel_id', 'unread_count', 'last_read_id')
+    ]
+    return {'total': sum(channel['unread'] for channel in channels), 'channels': channels}
+
+
+def reconcile() -> int:
+    """Recalculer tous les compteurs à partir des messages, retourne le nombre de compteurs corrigés"""
+    table = ChannelReadState._meta.db_table
+    messages = Message._meta.db_table
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # Bloque les mises à jour incrémentales le temps du recalcul
+            cursor.execute(f'LOCK TABLE {table} IN EXCLUSIVE MODE')
+            cursor.execute(
+                f"""
+                WITH actual AS (
+                    SELECT s.id, (
+                        SELECT count(*) FROM {messages} AS m
+                        WHERE m.channel_id = s.channel_id AND m.sender_id <> s.user_id
+                          AND (s.last_read_at IS NULL OR (m.created_at, m.id) > (s.last_read_at, s.last_read_id))
+                    ) AS unread
+                    FROM {table} AS s
+                )
+                UPDATE {table} AS s SET unread_count = actual.unread
+                FROM actual
+                WHERE s.id = actual.id AND s.unread_count <> actual.unread
+                """
+            )
+            fixed = cursor.rowcount
+
+    logger.info(f"Compteurs de non-lus recalculés: {fixed} corrigés")
+    return fixed
@@ -3,6 +3,10 @@ from . import views
 
 urlpatterns = [
     path('messages/', views.MessageListCreateView.as_view(), name='messages'),
+    path('messages/sync/', views.sync_messages, name='messages-sync'),
+    path('messages/search/', views.search_messages, name='messages-search'),
+    path('messages/<int:message_id>/read/', views.mark_message_read, name='message-read'),
+    path('unread/', views.unread_counts, name='unread-counts'),
     path('channels/', views.ChannelListCreateView.as_view(), name='channels'),
     path('upload-image/', views.upload_image, name='upload-image'),
 ]
\ No newline at end of file
@@ -5,18 +5,29 @@ from rest_framework.response import Response
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime
 import os
 import time
 from .models import Message, Channel
 from .serializers import MessageSerializer, ChannelSerializer
+from . import images, search, sync, unread
+from pirogue_smart.db_routing import ReplicaReadMixin, replica_reads
+from pirogue_smart.eager_loading import EagerLoadingMixin
 
-class MessageListCreateView(generics.ListCreateAPIView):
+class MessageListCreateView(ReplicaReadMixin, EagerLoadingMixin, generics.ListCreateAPIView):
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        # Retourner tous les messages du canal général
-        return Message.objects.all().order_by('created_at')
+        # Messages du canal demandé (?channel=), tous les canaux sinon
+        queryset = Message.objects.all().order_by('created_at')
+        channel_id = self.request.query_params.get('channel')
+        if channel_id:
+            queryset = queryset.filter(channel_id=channel_id)
+        return queryset
     
     def perform_create(self, serializer):
         serializer.save(sender=self.request.user)
@@ -26,6 +37,159 @@ class MessageListCreateView(generics.ListCreateAPIView):
         context['request'] = self.request
         return context
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync_messages(request):
+    """
+    Synchronisation incrémentale d'un canal par curseur.
+    ?channel=<id> (défaut general) &after_id=<id> : nouveaux messages ; &before_id=<id> : historique ;
+    sans curseur : derniers messages. &wait=<s> (avec after_id) : attendre de nouveaux messages.
+    """
+    try:
+        channel_id = request.query_params.get('channel', 'general')
+        after_id = request.query_params.get('after_id')
+        before_id = request.query_params.get('before_id')
+        if after_id and before_id:
+            return Response({'error': 'after_id et before_id sont exclusifs'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            cursor = int(after_id or before_id) if (after_id or before_id) else None
+            max_limit = getattr(settings, 'CHAT_SYNC_MAX_PAGE_SIZE', 500)
+            limit = min(int(request.query_params.get('limit', getattr(settings, 'CHAT_SYNC_PAGE_SIZE', 100))), max_limit)
+            wait = min(float(request.query_params.get('wait', 0)), getattr(settings, 'CHAT_SYNC_MAX_WAIT', 25))
+        except ValueError:
+            return Response({'error': 'Paramètres invalides'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'error': 'limit doit être positif'}, status=status.HTTP_400_BAD_REQUEST)
+
+        position = None
+        if cursor is not None:
+            position = sync.cursor_position(channel_id, cursor)
+            if position is None:
+                return Response({'error': 'Message curseur introuvable dans ce canal'},
+                                status=status.HTTP_404_NOT_FOUND)
+
+        if after_id:
+            if wait > 0:
+                messages, has_more = sync.wait_for_messages(channel_id, position, limit, wait)
+            else:
+                messages, has_more = sync.messages_after(channel_id, position, limit)
+        else:
+            messages, has_more = sync.messages_before(channel_id, position, limit)
+
+        serializer = MessageSerializer(messages, many=True, context={'request': request})
+        return Response({
+            'channel': channel_id,
+            'results': serializer.data,
+            'has_more': has_more,
+            # Curseurs à renvoyer : after_id pour la prochaine actualisation, before_id pour remonter
+            'last_id': messages[-1].id if messages else (cursor if after_id else None),
+            'first_id': messages[0].id if messages else (cursor if before_id else None),
+        })
+
+    except Exception as e:
+        return Response({
+            'error': 'Erreur lors de la synchronisation des messages',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@replica_reads
+def search_messages(request):
+    """
+    Recherche plein texte dans les messages.
+    ?q=<texte> &channel=<id>[,<id>...] &since=<date> &until=<date>
+    &order=rank|recent (défaut rank) &cursor=<next_cursor de la page précédente> &limit=<n>
+    """
+    try:
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response({'error': 'Paramètre q requis'}, status=status.HTTP_400_BAD_REQUEST)
+        order = request.query_params.get('order', 'rank')
+        if order not in search.ORDERS:
+            return Response({'error': f"order doit valoir {' ou '.join(search.ORDERS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        channels = [channel for channel in request.query_params.get('channel', '').split(',') if channel]
+        dates = {}
+        for name in ('since', 'until'):
+            value = request.query_params.get(name)
+            if value:
+                parsed = parse_datetime(value) or parse_date(value)
+                if parsed is None:
+                    return Response({'error': f'Date {name} invalide'}, status=status.HTTP_400_BAD_REQUEST)
+                if not isinstance(parsed, datetime):
+                    parsed = datetime.combine(parsed, datetime.min.time())
+                dates[name] = parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+        try:
+            max_limit = getattr(settings, 'CHAT_SEARCH_MAX_PAGE_SIZE', 100)
+            limit = min(int(request.query_params.get('limit', getattr(settings, 'CHAT_SEARCH_PAGE_SIZE', 20))), max_limit)
+            cursor = request.query_params.get('cursor')
+            cursor = search.decode_cursor(cursor, order) if cursor else None
+        except ValueError:
+            return Response({'error': 'Paramètres invalides'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'error': 'limit doit être positif'}, status=status.HTTP_400_BAD_REQUEST)
+
+        messages, has_more = search.search_messages(
+            text, channels=channels, since=dates.get('since'), until=dates.get('until'),
+            order=order, cursor=cursor, limit=limit,
+        )
+        results = MessageSerializer(messages, many=True, context={'request': request}).data
+        for result, message in zip(results, messages):
+            result['rank'] = message.rank
+        return Response({
+            'query': text,
+            'results': results,
+            'has_more': has_more,
+            'next_cursor': search.encode_cursor(messages[-1], order) if has_more else None,
+        })
+
+    except Exception as e:
+        return Response({
+            'error': 'Erreur lors de la recherche de messages',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def unread_counts(request):
+    """
+    Messages non lus de l'utilisateur par canal (badge)
+    """
+    try:
+        return Response(unread.unread_for(request.user))
+
+    except Exception as e:
+        return Response({
+            'error': 'Erreur lors de la récupération des messages non lus',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def mark_message_read(request, message_id):
+    """
+    Marquer comme lus le message et tous les précédents de son canal
+    """
+    try:
+        message = Message.objects.filter(id=message_id).only('id', 'channel_id', 'created_at').first()
+        if message is None:
+            return Response({'error': 'Message introuvable'}, status=status.HTTP_404_NOT_FOUND)
+
+        state = unread.mark_read(request.user, message)
+        return Response({
+            'channel_id': state.channel_id,
+            'last_read_id': state.last_read_id,
+            'unread': max(state.unread_count, 0),
+        })
+
+    except Exception as e:
+        return Response({
+            'error': 'Erreur lors du marquage comme lu',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def upload_image(request):
@@ -49,15 +213,21 @@ def upload_image(request):
         if image.size > 10 * 1024 * 1024:
             return Response({'error': 'Image trop volumineuse (max 10MB)'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Créer un message avec l'image
-        message = Message.objects.create(
-            sender=request.user,
-            receiver=request.user,  # Pour l'instant, on met le même utilisateur
-            channel_id=channel_id,
-            content=f"Image partagée: {image.name}",
-            message_type='image',
-            image=image
-        )
+        # Stockage de l'original (une seule fois par contenu), variantes générées par le worker
+        with transaction.atomic():
+            chat_image, created = images.store_upload(image)
+            message = Message.objects.create(
+                sender=request.user,
+                receiver=request.user,  # Pour l'instant, on met le même utilisateur
+                channel_id=channel_id,
+                content=f"Image partagée: {image.name}",
+                message_type='image',
+                image=chat_image.original.name,
+                image_asset=chat_image
+            )
+            # Contenu déjà reçu : variantes existantes (ou déjà en file), pas de nouveau traitement
+            if created or chat_image.status == 'failed':
+                images.schedule(chat_image)
         
         # Retourner les données du message avec l'URL de l'image
         serializer = MessageSerializer(message, context={'request': request})
@@ -0,0 +1,183 @@
+"""
+Registre de métriques PIROGUE-SMART exporté au format texte Prometheus.
+
+Chaque processus worker agrège ses mesures en mémoire (un dict protégé par
+un verrou) et les pousse périodiquement dans un hash Redis avec
+HINCRBYFLOAT : les incréments sont atomiques, donc l'agrégation reste
+correcte quel que soit le nombre de workers gunicorn/uvicorn. Sans Redis,
+les métriques restent locales au processus.
+"""
+
+import logging
+import threading
+import time
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+DEVICE_COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# nom -> (type, aide, buckets)
+METRICS = {
+    'http_request_duration_seconds': (
+        'histogram', 'Durée totale de traitement des requêtes HTTP par vue', LATENCY_BUCKETS),
+    'http_request_db_queries': (
+        'histogram', 'Nombre de requêtes SQL par requête HTTP', QUERY_COUNT_BUCKETS),
+    'http_request_db_duration_seconds': (
+        'histogram', 'Temps passé dans la base de données par requête HTTP', LATENCY_BUCKETS),
+    'http_request_serializer_duration_seconds': (
+        'histogram', 'Temps passé dans les serializers DRF par requête HTTP', LATENCY_BUCKETS),
+    'ingest_fixes_total': (
+        'counter', 'Positions GPS reçues par les webhooks, par source et résultat', None),
+    'ingest_devices_per_payload': (
+        'histogram', 'Nombre de dispositifs par payload webhook', DEVICE_COUNT_BUCKETS),
+    'emergency_fanout_seconds': (
+        'histogram', 'Délai entre la réception d\'un SOS et la diffusion aux navires', LATENCY_BUCKETS),
+    'emergency_budget_exceeded_total': (
+        'counter', 'SOS diffusés au-delà du budget de latence', None),
+    'weather_risk_run_seconds': (
+        'histogram', 'Durée d\'un passage du score de risque météo de la flotte', LATENCY_BUCKETS),
+    'http_cache_requests_total': (
+        'counter', 'Requêtes sur les ressources en cache HTTP, par ressource et résultat', None),
+    'chat_messages_total': (
+        'counter', 'Messages de chat websocket, par résultat (diffusé, enregistré, erreur)', None),
+    'chat_persist_batch_size': (
+        'histogram', 'Nombre de messages de chat écrits par lot', DEVICE_COUNT_BUCKETS),
+    'auth_token_cache_total': (
+        'counter', 'Authentifications par token, par résultat du cache (local, partagé, manqué)', None),
+    'sync_response_bytes': (
+        'histogram', 'Taille des réponses de synchronisation delta par encodage', BYTES_BUCKETS),
+    'db_route_total': (
+        'counter', 'Requêtes HTTP par base de lecture (réplica, primaire) et raison du choix', None),
+}
+
+REDIS_KEY = getattr(settings, 'METRICS_REDIS_KEY', 'pirogue_smart:metrics')
+FLUSH_INTERVAL = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+
+
+def _format_labels(labels: dict) -> str:
+    return ','.join(f'{key}="{str(value)}"' for key, value in sorted(labels.items()))
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class MetricsRegistry:
+    """Agrégation locale au processus, vidée périodiquement dans Redis"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self._redis = None
+        self._redis_failed_at = None
+
+    def _client(self):
+        redis_url = getattr(settings, 'METRICS_REDIS_URL', '')
+        if not redis_url:
+            return None
+        # Après une erreur, on ne retente pas la connexion à chaque requête
+        if self._redis_failed_at and time.monotonic() - self._redis_failed_at < 30:
+            return None
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        return self._redis
+
+    def _add(self, field: str, value: float):
+        self._pending[field] = self._pending.get(field, 0) + value
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Incrémenter un compteur"""
+        field = f"{name}\t{_format_labels(labels)}"
+        with self._lock:
+            self._add(field, value)
+        self._maybe_flush()
+
+    def observe(self, name: str, value: float, **labels):
+        """Ajouter une observation à un histogramme"""
+        buckets = METRICS[name][2]
+        label_str = _format_labels(labels)
+        with self._lock:
+            # Buckets cumulatifs, comme attendu par Prometheus
+            for bound in buckets:
+                if value <= bound:
+                    self._add(f"{name}_bucket\t{label_str}\t{bound}", 1)
+            self._add(f"{name}_bucket\t{label_str}\t+Inf", 1)
+            self._add(f"{name}_sum\t{label_str}", value)
+            self._add(f"{name}_count\t{label_str}", 1)
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Pousser les incréments locaux dans Redis"""
+        client = self._client()
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if client is None or not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for field, value in pending.items():
+                pipe.hincrbyfloat(REDIS_KEY, field, value)
+            pipe.execute()
+            self._redis_failed_at = None
+        except Exception as e:
+            logger.warning(f"Flush des métriques vers Redis impossible: {str(e)}")
+            self._redis_failed_at = time.monotonic()
+            # On réintègre les incréments pour le prochain flush
+            with self._lock:
+                for field, value in pending.items():
+                    self._add(field, value)
+
+    def snapshot(self) -> dict:
+        """Valeurs agrégées de tous les workers (Redis) plus les incréments non encore poussés"""
+        self.flush()
+        values = {}
+        client = self._client()
+        if client is not None:
+            try:
+                for field, value in client.hgetall(REDIS_KEY).items():
+                    values[field.decode()] = float(value)
+            except Exception as e:
+                logger.warning(f"Lecture des métriques Redis impossible: {str(e)}")
+        with self._lock:
+            for field, value in self._pending.items():
+                values[field] = values.get(field, 0) + value
+        return values
+
+    def render(self) -> str:
+        """Exposition au format texte Prometheus 0.0.4"""
+        values = self.snapshot()
+        series = {}
+        for field, value in values.items():
+            parts = field.split('\t')
+            series.setdefault(parts[0], []).append((parts[1], parts[2] if len(parts) > 2 else None, value))
+
+        lines = []
+        for name, (metric_type, help_text, _) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            suffixes = ('_bucket', '_sum', '_count') if metric_type == 'histogram' else ('',)
+            for suffix in suffixes:
+                samples = series.get(f"{name}{suffix}", [])
+                samples.sort(key=lambda s: (s[0], float('inf') if s[1] == '+Inf' else float(s[1] or 0)))
+                for label_str, le, value in samples:
+                    if le is not None:
+                        label_str = f'{label_str},le="{le}"' if label_str else f'le="{le}"'
+                    labels = f"{{{label_str}}}" if label_str else ''
+                    lines.append(f"{name}{suffix}{labels} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+# Instance globale
+metrics = MetricsRegistry()
@@ -0,0 +1,91 @@
+"""
+Middleware d'instrumentation des requêtes HTTP
+"""
+
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from django.db import connections
+from .metrics import metrics
+
+# Statistiques de la requête en cours, alimentées par le wrapper SQL et les serializers
+current_request_stats = ContextVar('current_request_stats', default=None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'serializer_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    stats = current_request_stats.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """Mesurer latence, requêtes SQL, temps SQL et temps serializer par vue"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_db_wrapper))
+                response = self.get_response(request)
+        finally:
+            current_request_stats.reset(token)
+
+        duration = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unmatched'
+
+        metrics.observe('http_request_duration_seconds', duration,
+                        view=view, method=request.method, status=response.status_code)
+        metrics.observe('http_request_db_queries', stats.queries, view=view)
+        metrics.observe('http_request_db_duration_seconds', stats.db_time, view=view)
+        if stats.serializer_time:
+            metrics.observe('http_request_serializer_duration_seconds', stats.serializer_time, view=view)
+        return response
+
+
+def instrument_serializers():
+    """Chronométrer Serializer.data et ListSerializer.data pour la requête en cours"""
+    from rest_framework import serializers
+
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        original = cls.data.fget
+        if getattr(original, '_instrumented', False):
+            continue
+
+        def timed_data(self, _original=original):
+            stats = current_request_stats.get()
+            if stats is None:
+                return _original(self)
+            # Un serializer imbriqué n'est compté qu'une fois, via le serializer parent
+            stats.serializer_depth += 1
+            started = time.perf_counter()
+            try:
+                return _original(self)
+            finally:
+                stats.serializer_depth -= 1
+                if stats.serializer_depth == 0:
+                    stats.serializer_time += time.perf_counter() - started
+
+        timed_data._instrumented = True
+        cls.data = property(timed_data)
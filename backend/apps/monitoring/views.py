@@ -0,0 +1,24 @@
+import hmac
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_http_methods
+from .metrics import metrics
+
+
+def _authorized(request):
+    """Bearer METRICS_TOKEN si configuré, sinon session d'un membre du staff : refus par défaut"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        return hmac.compare_digest(request.META.get('HTTP_AUTHORIZATION', '').encode(), f'Bearer {token}'.encode())
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_authenticated and user.is_staff
+
+@require_http_methods(["GET"])
+def metrics_view(request):
+    """
+    Exposition des métriques au format texte Prometheus
+    """
+    if not _authorized(request):
+        return JsonResponse({'error': 'Permission refusée'}, status=403)
+
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
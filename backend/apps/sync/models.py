@@ -0,0 +1,17 @@
+from django.db import models
+
+class Tombstone(models.Model):
+    """Enregistrement supprimé, transmis aux clients par la synchronisation delta"""
+    resource = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    # Utilisateur propriétaire de l'enregistrement (null : visible par tous)
+    owner_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['resource', 'deleted_at'], name='tombstone_resource_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.resource} {self.object_id}"
@@ -0,0 +1,178 @@
+"""
+Ressources de la synchronisation delta (/api/sync/)
+
+Chaque ressource reçoit le curseur renvoyé par la synchronisation
+précédente et ne renvoie que ce qui a changé depuis :
+- alertes et zones : enregistrements modifiés après (updated_at, id) et
+  identifiants supprimés (Tombstone, zones désactivées) ;
+- positions et messages, en ajout seul : enregistrements d'id supérieur ;
+- profil et météo : la donnée entière, seulement si son empreinte a changé.
+Sans curseur, ou avec un curseur plus ancien que la rétention des
+suppressions, la ressource est renvoyée en entier avec reset=True : le
+client remplace ses données au lieu de les fusionner.
+
+Chaque ressource renvoie {'cursor', 'reset', 'updated', 'deleted', 'has_more'}.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from apps.alerts.models import Alert
+from apps.alerts.serializers import AlertSerializer
+from apps.communication.models import Message
+from apps.communication.serializers import MessageSerializer
+from apps.tracking.models import Location
+from apps.tracking.serializers import LocationSerializer
+from apps.users.models import User
+from apps.users.serializers import UserSerializer
+from apps.weather.grid import weather_grid
+from apps.zones.models import Zone
+from apps.zones.serializers import ZoneSerializer
+from pirogue_smart.eager_loading import eager_load
+from .models import Tombstone
+from .tombstones import retention
+
+MANAGERS = ['admin', 'organization']
+
+
+def _result(cursor, updated=(), deleted=(), reset=False, has_more=False):
+    return {'cursor': cursor, 'reset': reset, 'updated': list(updated), 'deleted': list(deleted),
+            'has_more': has_more}
+
+
+def _parse_position(cursor):
+    """(updated_at, id) d'un curseur '<date iso>|<id>', ValueError s'il est invalide"""
+    value, object_id = cursor.rsplit('|', 1)
+    updated_at = parse_datetime(value)
+    # Date sans fuseau : non comparable aux dates de la base, curseur forgé
+    if updated_at is None or timezone.is_naive(updated_at):
+        raise ValueError(cursor)
+    return updated_at, int(object_id)
+
+
+def _format_position(position):
+    return f'{position[0].isoformat()}|{position[1]}'
+
+
+def _modified_since(queryset, serializer_class, cursor, context, tombstones, active=None):
+    """
+    Enregistrements modifiés après le curseur (updated_at, id), et suppressions.
+    `active` : {champ: valeur} des enregistrements à montrer, les autres sont transmis comme supprimés.
+    """
+    now = timezone.now()
+    limit = context['limit']
+    position = _parse_position(cursor) if cursor else None
+    reset = position is None or position[0] < now - retention()
+
+    if reset:
+        position = None
+        if active is not None:
+            queryset = queryset.filter(**active)
+    else:
+        updated_at, object_id = position
+        queryset = queryset.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=object_id))
+
+    rows = list(eager_load(serializer_class, queryset.order_by('updated_at', 'id'))[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    deleted = []
+    if not reset:
+        deleted = list(tombstones.filter(deleted_at__gt=position[0]).values_list('object_id', flat=True))
+    live = rows
+    if active is not None:
+        live = [row for row in rows if all(getattr(row, field) == value for field, value in active.items())]
+        live_ids = {row.id for row in live}
+        deleted += [row.id for row in rows if row.id not in live_ids]
+
+    new_position = (rows[-1].updated_at, rows[-1].id) if rows else position
+    if not has_more:
+        # Transaction validée après coup avec un updated_at antérieur : la marge la rattrape au prochain tour
+        margin = (now - timedelta(seconds=getattr(settings, 'SYNC_COMMIT_MARGIN_SECONDS', 5)), 0)
+        new_position = min(new_position, margin) if new_position else margin
+        if position is not None:
+            new_position = max(new_position, position)
+
+    return _result(
+        _format_position(new_position),
+        serializer_class(live, many=True, context={'request': context['request']}).data,
+        deleted, reset=reset, has_more=has_more,
+    )
+
+
+def _appended_since(queryset, serializer_class, cursor, context):
+    """Enregistrements en ajout seul d'id supérieur au curseur ; sans curseur, les `limit` derniers"""
+    limit = context['limit']
+    if cursor:
+        rows = list(eager_load(serializer_class, queryset.filter(id__gt=int(cursor)).order_by('id'))[:limit + 1])
+        has_more = len(rows) > limit
+        rows, reset = rows[:limit], False
+    else:
+        rows = list(eager_load(serializer_class, queryset.order_by('-id'))[:limit])[::-1]
+        has_more, reset = False, True
+
+    new_cursor = str(rows[-1].id) if rows else (cursor or '0')
+    return _result(
+        new_cursor,
+        serializer_class(rows, many=True, context={'request': context['request']}).data,
+        reset=reset, has_more=has_more,
+    )
+
+
+def _if_changed(data, cursor):
+    """Donnée entière si son empreinte diffère du curseur"""
+    digest = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    if digest == cursor:
+        return _result(digest)
+    return _result(digest, [data] if data is not None else [], reset=True)
+
+
+def alerts(user, cursor, context):
+    queryset = Alert.objects.all()
+    tombstones = Tombstone.objects.filter(resource='alerts')
+    if user.role not in MANAGERS:
+        queryset = queryset.filter(user=user)
+        tombstones = tombstones.filter(owner_id=user.id)
+    return _modified_since(queryset, AlertSerializer, cursor, context, tombstones)
+
+
+def zones(user, cursor, context):
+    return _modified_since(
+        Zone.objects.all(), ZoneSerializer, cursor, context,
+        Tombstone.objects.filter(resource='zones'), active={'is_active': True},
+    )
+
+
+def locations(user, cursor, context):
+    queryset = Location.objects.all()
+    if user.role not in MANAGERS:
+        queryset = queryset.filter(user=user)
+    return _appended_since(queryset, LocationSerializer, cursor, context)
+
+
+def messages(user, cursor, context):
+    return _appended_since(Message.objects.all(), MessageSerializer, cursor, context)
+
+
+def profile(user, cursor, context):
+    user = User.objects.select_related('profile').get(pk=user.pk)
+    return _if_changed(UserSerializer(user, context={'request': context['request']}).data, cursor)
+
+
+def weather(user, cursor, context):
+    # Conditions au nœud de grille le plus proche, comme /api/weather/current/
+    return _if_changed(weather_grid.nearest(context['lat'], context['lon']), cursor)
+
+
+RESOURCES = {
+    'profile': profile,
+    'locations': locations,
+    'alerts': alerts,
+    'zones': zones,
+    'messages': messages,
+    'weather': weather,
+}
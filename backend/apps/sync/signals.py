@@ -0,0 +1,9 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from apps.zones.models import Zone
+from . import tombstones
+
+@receiver(post_delete, sender=Zone)
+def zone_deleted(sender, instance, **kwargs):
+    """Transmettre la suppression de la zone aux clients synchronisés"""
+    tombstones.record('zones', [(instance.id, None)])
@@ -0,0 +1,7 @@
+from celery import shared_task
+from . import tombstones
+
+@shared_task
+def purge_tombstones():
+    """Purger les suppressions de synchronisation expirées"""
+    return tombstones.purge()
@@ -0,0 +1,34 @@
+"""
+Suppressions à transmettre aux clients synchronisés
+
+Les suppressions sont enregistrées dans la même transaction que la
+suppression elle-même, puis purgées après SYNC_TOMBSTONE_RETENTION_DAYS
+jours : un client dont le curseur est plus ancien repart d'un état complet.
+"""
+
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from .models import Tombstone
+
+logger = logging.getLogger(__name__)
+
+
+def retention():
+    return timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+def record(resource, rows):
+    """Enregistrer des suppressions, `rows` : itérable de (id, id du propriétaire ou None)"""
+    Tombstone.objects.bulk_create([
+        Tombstone(resource=resource, object_id=object_id, owner_id=owner_id)
+        for object_id, owner_id in rows
+    ])
+
+
+def purge() -> int:
+    """Supprimer les suppressions plus anciennes que la rétention"""
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=timezone.now() - retention()).delete()
+    logger.info(f"Suppressions de synchronisation purgées: {deleted}")
+    return deleted
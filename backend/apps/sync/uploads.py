@@ -0,0 +1,96 @@
+"""
+Envois groupés des clients : positions et messages mis en file hors connexion
+
+Le client renvoie sa file tant qu'il n'a pas reçu la réponse : chaque
+élément porte un client_id et les doublons sont ignorés (position déjà
+reçue au même instant, message portant le même client_id), l'id serveur
+existant est renvoyé.
+"""
+
+from apps.communication.batcher import persist_messages
+from apps.communication.models import Message
+from apps.tracking.fleet import fleet_index
+from apps.tracking.presence import presence
+from apps.tracking.models import Location
+from apps.tracking.serializers import LocationSerializer
+
+
+def _error(resource, client_id, error):
+    return {'resource': resource, 'client_id': client_id, 'error': error}
+
+
+def upload_locations(user, fixes):
+    """Enregistrer les positions en une requête, retourne (accusés, erreurs)"""
+    valid, errors = [], []
+    for fix in fixes:
+        client_id = fix.get('client_id')
+        serializer = LocationSerializer(data={**fix, 'user': user.id})
+        if serializer.is_valid():
+            valid.append((client_id, serializer.validated_data))
+        else:
+            errors.append(_error('locations', client_id, serializer.errors))
+    if not valid:
+        return [], errors
+
+    existing = dict(
+        Location.objects.filter(user=user, timestamp__in=[data['timestamp'] for _, data in valid])
+        .values_list('timestamp', 'id')
+    )
+    new = [(client_id, data) for client_id, data in valid if data['timestamp'] not in existing]
+    created = Location.objects.bulk_create([Location(**data) for _, data in new])
+
+    acks = [{'client_id': client_id, 'id': existing[data['timestamp']]}
+            for client_id, data in valid if data['timestamp'] in existing]
+    acks += [{'client_id': client_id, 'id': location.id} for (client_id, _), location in zip(new, created)]
+
+    if created:
+        latest = max(created, key=lambda location: location.timestamp)
+        fleet_index.update(user.id, latest.latitude, latest.longitude, latest.timestamp)
+        presence.touch(user.id, fix=True, at=latest.timestamp)
+    return acks, errors
+
+
+def upload_messages(user, items):
+    """Enregistrer les messages en une requête (non-lus et réveil des canaux compris)"""
+    valid, errors = [], []
+    for item in items:
+        client_id = item.get('client_id')
+        content = item.get('content')
+        metadata = item.get('metadata') or {}
+        if not client_id or not isinstance(content, str) or not content.strip() or not isinstance(metadata, dict):
+            errors.append(_error('messages', client_id, 'client_id et contenu requis'))
+            continue
+        valid.append(Message(
+            sender=user,
+            # Message de canal : pas de destinataire individuel
+            receiver=user,
+            channel_id=item.get('channel_id') or 'general',
+            content=content,
+            message_type=item.get('message_type') or 'text',
+            metadata={**metadata, 'client_id': client_id},
+        ))
+    if not valid:
+        return [], errors
+
+    existing = dict(
+        Message.objects.filter(sender=user, metadata__client_id__in=[m.metadata['client_id'] for m in valid])
+        .values_list('metadata__client_id', 'id')
+    )
+    new = [message for message in valid if message.metadata['client_id'] not in existing]
+    created = persist_messages(new) if new else []
+
+    acks = [{'client_id': client_id, 'id': message_id} for client_id, message_id in existing.items()]
+    acks += [{'client_id': message.metadata['client_id'], 'id': message.id} for message in created]
+    return acks, errors
+
+
+def process(user, uploads):
+    """{'locations': [...], 'messages': [...]} -> accusés par ressource et erreurs"""
+    result = {'locations': [], 'messages': [], 'errors': []}
+    if uploads.get('locations'):
+        acks, errors = upload_locations(user, uploads['locations'])
+        result['locations'], result['errors'] = acks, result['errors'] + errors
+    if uploads.get('messages'):
+        acks, errors = upload_messages(user, uploads['messages'])
+        result['messages'], result['errors'] = acks, result['errors'] + errors
+    return result
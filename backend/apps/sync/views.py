@@ -0,0 +1,108 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+import gzip
+import logging
+from apps.monitoring.metrics import metrics
+from pirogue_smart import fast_json
+from . import uploads
+from .resources import RESOURCES
+
+logger = logging.getLogger(__name__)
+
+
+def _payload(request):
+    """Corps JSON de la requête, éventuellement compressé (Content-Encoding: gzip)"""
+    if request.META.get('HTTP_CONTENT_ENCODING', '').lower() == 'gzip':
+        return fast_json.loads(gzip.decompress(request.body))
+    return request.data
+
+
+def _compressed_response(request, data):
+    """Réponse JSON compressée en gzip si le client l'accepte, tailles enregistrées dans les métriques"""
+    content = fast_json.ORJSONRenderer().render(data)
+    metrics.observe('sync_response_bytes', len(content), encoding='identity')
+    response = HttpResponse(content, content_type='application/json')
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+        compressed = compress_string(content)
+        if len(compressed) < len(content):
+            response.content = compressed
+            response['Content-Encoding'] = 'gzip'
+            metrics.observe('sync_response_bytes', len(compressed), encoding='gzip')
+    response['Content-Length'] = str(len(response.content))
+    response['X-Uncompressed-Length'] = str(len(content))
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def sync(request):
+    """
+    Synchronisation delta en un aller-retour.
+    Corps : {"cursors": {ressource: curseur reçu au tour précédent}, "resources": [...] (défaut : toutes),
+             "lat": ..., "lon": ... (météo), "uploads": {"locations": [...], "messages": [...]}}
+    Réponse : accusés des envois et, par ressource, {cursor, reset, updated, deleted, has_more}.
+    """
+    try:
+        try:
+            payload = _payload(request)
+        except (OSError, ValueError):
+            return Response({'error': 'Corps de requête invalide'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(payload, dict):
+            return Response({'error': 'Corps de requête invalide'}, status=status.HTTP_400_BAD_REQUEST)
+
+        cursors = payload.get('cursors') or {}
+        names = payload.get('resources') or list(RESOURCES)
+        unknown = [name for name in names if name not in RESOURCES]
+        if unknown:
+            return Response({'error': f"Ressources inconnues: {', '.join(unknown)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        queued = payload.get('uploads') or {}
+        queued_count = sum(len(queued.get(name) or []) for name in ('locations', 'messages'))
+        if queued_count > getattr(settings, 'SYNC_MAX_UPLOADS', 1000):
+            return Response({'error': 'Trop d\'éléments envoyés en une fois'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            context = {
+                'request': request,
+                'limit': getattr(settings, 'SYNC_MAX_RECORDS', 500),
+                'lat': float(payload.get('lat', 14.9325)),  # Cayar par défaut
+                'lon': float(payload.get('lon', -17.1925)),
+            }
+        except (TypeError, ValueError):
+            return Response({'error': 'Coordonnées invalides'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Envois d'abord : les deltas renvoyés contiennent déjà les ids attribués
+        with transaction.atomic():
+            acks = uploads.process(request.user, queued)
+
+        resources = {}
+        for name in names:
+            cursor = cursors.get(name)
+            try:
+                resources[name] = RESOURCES[name](request.user, str(cursor) if cursor else None, context)
+            except ValueError:
+                return Response({'error': f'Curseur invalide pour {name}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return _compressed_response(request, {
+            'server_time': timezone.now().isoformat(),
+            'uploads': acks,
+            'resources': resources,
+        })
+
+    except Exception as e:
+        logger.error(f"Erreur de synchronisation pour {request.user.username}: {str(e)}")
+        return Response({
+            'error': 'Erreur lors de la synchronisation',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,191 @@
+"""
+Index spatial en mémoire des dernières positions de la flotte
+
+Chaque processus garde la dernière position connue de chaque navire dans
+une grille de cellules (FLEET_INDEX_CELL_DEG degrés). La recherche des k
+navires les plus proches parcourt les cellules en anneaux autour du point,
+sans requête SQL. L'index est alimenté par l'ingestion locale et recalé
+sur la base toutes les FLEET_INDEX_REFRESH secondes (positions reçues par
+les autres workers).
+"""
+
+import heapq
+import logging
+import math
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Distance orthodromique en kilomètres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _ring_cells(ci, cj, ring):
+    """Cellules situées exactement à `ring` cellules de (ci, cj)"""
+    if ring == 0:
+        yield (ci, cj)
+        return
+    for j in range(cj - ring, cj + ring + 1):
+        yield (ci - ring, j)
+        yield (ci + ring, j)
+    for i in range(ci - ring + 1, ci + ring):
+        yield (i, cj - ring)
+        yield (i, cj + ring)
+
+
+class FleetIndex:
+    """Dernière position par utilisateur, indexée par cellule de grille"""
+
+    def __init__(self, cell_deg=None, max_age_hours=None, refresh_seconds=None):
+        self.cell_deg = cell_deg or getattr(settings, 'FLEET_INDEX_CELL_DEG', 0.1)
+        self.max_age = timedelta(hours=max_age_hours or getattr(settings, 'FLEET_INDEX_MAX_AGE_HOURS', 12))
+        self.refresh_seconds = refresh_seconds or getattr(settings, 'FLEET_INDEX_REFRESH', 30)
+        self._lock = threading.RLock()
+        self._positions = {}   # user_id -> (lat, lon, timestamp)
+        self._cells = {}       # (i, j) -> set(user_id)
+        self._loaded_at = None
+        self._synced_until = None
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def update(self, user_id, lat, lon, timestamp=None):
+        """Enregistrer la dernière position d'un navire"""
+        lat, lon = float(lat), float(lon)
+        timestamp = timestamp or timezone.now()
+        with self._lock:
+            previous = self._positions.get(user_id)
+            if previous and previous[2] > timestamp:
+                return
+            if previous:
+                old_cell = self._cell(previous[0], previous[1])
+                members = self._cells.get(old_cell)
+                if members:
+                    members.discard(user_id)
+                    if not members:
+                        del self._cells[old_cell]
+            self._positions[user_id] = (lat, lon, timestamp)
+            self._cells.setdefault(self._cell(lat, lon), set()).add(user_id)
+
+    def get(self, user_id):
+        self._ensure_fresh()
+        return self._positions.get(user_id)
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if self._loaded_at is not None and now - self._loaded_at < self.refresh_seconds:
+            return
+        with self._lock:
+            if self._loaded_at is not None and now - self._loaded_at < self.refresh_seconds:
+                return
+            try:
+                self._sync()
+            except Exception as e:
+                logger.error(f"Recalage de l'index de flotte impossible: {str(e)}")
+            self._loaded_at = now
+
+    def _sync(self):
+        from .models import Location
+
+        # Premier chargement : dernière position par navire (DISTINCT ON sur l'index user/-timestamp)
+        # Ensuite : uniquement les positions reçues depuis le dernier recalage
+        # (avec une marge pour les transactions validées après le recalage précédent)
+        if self._synced_until:
+            since = self._synced_until - timedelta(seconds=5)
+        else:
+            since = timezone.now() - self.max_age
+        rows = (
+            Location.objects.filter(timestamp__gt=since)
+            .order_by('user_id', '-timestamp')
+            .distinct('user_id')
+            .values_list('user_id', 'latitude', 'longitude', 'timestamp')
+        )
+        latest = since
+        for user_id, lat, lon, ts in rows:
+            self.update(user_id, lat, lon, ts)
+            latest = max(latest, ts)
+        self._synced_until = latest
+
+    def snapshot(self):
+        """Positions récentes de toute la flotte : (user_ids, latitudes, longitudes, timestamps)"""
+        self._ensure_fresh()
+        oldest = timezone.now() - self.max_age
+        with self._lock:
+            fresh = [(user_id, position) for user_id, position in self._positions.items() if position[2] >= oldest]
+        user_ids = [user_id for user_id, _ in fresh]
+        lats = [position[0] for _, position in fresh]
+        lons = [position[1] for _, position in fresh]
+        timestamps = [position[2] for _, position in fresh]
+        return user_ids, lats, lons, timestamps
+
+    def nearest(self, lat, lon, k=5, exclude=(), max_distance_km=None):
+        """
+        Les k navires les plus proches de (lat, lon), positions trop anciennes exclues.
+        Retourne une liste de dicts {user_id, latitude, longitude, timestamp, distance_km}.
+        """
+        self._ensure_fresh()
+        lat, lon = float(lat), float(lon)
+        oldest = timezone.now() - self.max_age
+        exclude = set(exclude)
+        ci, cj = self._cell(lat, lon)
+        # Taille minimale d'une cellule en km (la longitude se resserre vers les pôles)
+        cell_km = self.cell_deg * 111.0 * max(math.cos(math.radians(min(abs(lat) + self.cell_deg, 89.9))), 0.01)
+
+        with self._lock:
+            if not self._cells:
+                return []
+            lat_cells = [i for i, _ in self._cells]
+            lon_cells = [j for _, j in self._cells]
+            max_ring = max(abs(max(lat_cells) - ci), abs(min(lat_cells) - ci),
+                           abs(max(lon_cells) - cj), abs(min(lon_cells) - cj))
+
+            best = []  # tas max (distance négative) des k meilleurs
+            for ring in range(max_ring + 1):
+                # Tout navire hors des anneaux déjà parcourus est à plus de (ring - 1) * cell_km
+                if len(best) >= k and -best[0][0] <= (ring - 1) * cell_km:
+                    break
+                if max_distance_km is not None and (ring - 1) * cell_km > max_distance_km:
+                    break
+                for cell in _ring_cells(ci, cj, ring):
+                    for user_id in self._cells.get(cell, ()):
+                        if user_id in exclude:
+                            continue
+                        v_lat, v_lon, ts = self._positions[user_id]
+                        if ts < oldest:
+                            continue
+                        distance = haversine_km(lat, lon, v_lat, v_lon)
+                        if max_distance_km is not None and distance > max_distance_km:
+                            continue
+                        entry = (-distance, user_id)
+                        if len(best) < k:
+                            heapq.heappush(best, entry)
+                        elif distance < -best[0][0]:
+                            heapq.heapreplace(best, entry)
+
+            results = []
+            for neg_distance, user_id in sorted(best, reverse=True):
+                v_lat, v_lon, ts = self._positions[user_id]
+                results.append({
+                    'user_id': user_id,
+                    'latitude': v_lat,
+                    'longitude': v_lon,
+                    'timestamp': ts.isoformat(),
+                    'distance_km': round(-neg_distance, 3),
+                })
+            return results
+
+
+# Instance globale
+fleet_index = FleetIndex()
@@ -0,0 +1,168 @@
+"""
+Présence des utilisateurs et des navires dans Redis
+
+Deux sortes d'activité, chacune dans des ensembles triés par date de
+dernière activité (score en secondes epoch) :
+- `seen` : toute activité (position, websocket) ;
+- `fix`  : dernière position reçue (« en mer »).
+Un ensemble global et un ensemble par organisation (UserProfile.
+organization_name) par sorte : « qui est en ligne dans l'organisation X »
+est un ZCOUNT / ZRANGEBYSCORE sur un seul ensemble, en O(log n).
+La présence expire d'elle-même : seules les activités des
+PRESENCE_TTL_SECONDS dernières secondes sont lues, les plus anciennes sont
+purgées par `flush()` et les ensembles inutilisés expirent.
+
+`flush()` (tâche Celery périodique) reporte un résumé dans PostgreSQL :
+User.last_location_update et User.is_active_session, au lieu d'une
+écriture par position.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'presence'
+KINDS = ('seen', 'fix')
+
+
+def _key(kind, organization=None):
+    if organization:
+        return f'{KEY_PREFIX}:{kind}:org:{organization}'
+    return f'{KEY_PREFIX}:{kind}'
+
+
+def _to_datetime(score):
+    return datetime.fromtimestamp(score, tz=dt_timezone.utc)
+
+
+class Presence:
+    """Écriture et lecture de la présence, organisation de chaque utilisateur gardée en mémoire"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_failed_at = None
+        self._organizations = {}  # user_id -> (expiration, organisation ou None)
+
+    def _client(self):
+        redis_url = getattr(settings, 'PRESENCE_REDIS_URL', '')
+        if not redis_url:
+            return None
+        if self._redis_failed_at and time.monotonic() - self._redis_failed_at < 30:
+            return None
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        return self._redis
+
+    def ttl(self):
+        return getattr(settings, 'PRESENCE_TTL_SECONDS', 300)
+
+    def _organization(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._organizations.get(user_id)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        from apps.users.models import UserProfile
+        organization = (
+            UserProfile.objects.filter(user_id=user_id).values_list('organization_name', flat=True).first()
+        ) or None
+        with self._lock:
+            self._organizations[user_id] = (now + getattr(settings, 'PRESENCE_ORG_CACHE_SECONDS', 300), organization)
+        return organization
+
+    def touch(self, user_id, fix=False, at=None):
+        """Enregistrer une activité (fix=True : position reçue), jamais en arrière dans le temps"""
+        client = self._client()
+        if client is None:
+            return
+        score = at.timestamp() if at is not None else time.time()
+        organization = self._organization(user_id)
+        keys = [_key('seen'), _key('seen', organization)] if organization else [_key('seen')]
+        if fix:
+            keys += [_key('fix'), _key('fix', organization)] if organization else [_key('fix')]
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key in keys:
+                pipe.zadd(key, {user_id: score}, gt=True)
+                # Ensemble plus utilisé (organisation sans activité) : supprimé par Redis
+                pipe.expire(key, self.ttl() * 2)
+            pipe.execute()
+            self._redis_failed_at = None
+        except Exception as e:
+            self._redis_failed_at = time.monotonic()
+            logger.warning(f"Mise à jour de la présence impossible: {str(e)}")
+
+    def online(self, organization=None, kind='seen'):
+        """[(user_id, dernière activité)] des PRESENCE_TTL_SECONDS dernières secondes, plus récents d'abord"""
+        client = self._client()
+        if client is None:
+            return []
+        try:
+            return self._online(client, organization, kind)
+        except Exception as e:
+            self._redis_failed_at = time.monotonic()
+            logger.warning(f"Lecture de la présence impossible: {str(e)}")
+            return []
+
+    def _online(self, client, organization=None, kind='seen'):
+        rows = client.zrevrangebyscore(_key(kind, organization), '+inf', time.time() - self.ttl(), withscores=True)
+        return [(int(member), _to_datetime(score)) for member, score in rows]
+
+    def count(self, organization=None, kind='seen'):
+        """Nombre d'utilisateurs actifs, en O(log n)"""
+        client = self._client()
+        if client is None:
+            return 0
+        try:
+            return client.zcount(_key(kind, organization), time.time() - self.ttl(), '+inf')
+        except Exception as e:
+            self._redis_failed_at = time.monotonic()
+            logger.warning(f"Lecture de la présence impossible: {str(e)}")
+            return 0
+
+    def flush(self):
+        """Reporter la présence dans PostgreSQL et purger les activités expirées ; retourne les lignes modifiées"""
+        from apps.users.models import User
+
+        client = self._client()
+        if client is None:
+            return 0
+        now = time.time()
+        since = float(client.get(f'{KEY_PREFIX}:flushed_at') or 0)
+
+        # Dernière position des navires actifs depuis le report précédent
+        fixes = {int(member): _to_datetime(score)
+                 for member, score in client.zrangebyscore(_key('fix'), since, '+inf', withscores=True)}
+        # Lecture directe, sans le repli de online() : une erreur Redis arrête le report
+        # au lieu de faire passer tous les utilisateurs hors ligne
+        online = [user_id for user_id, _ in self._online(client)]
+        users = list(User.objects.filter(id__in=fixes).only('id', 'last_location_update'))
+        for user in users:
+            user.last_location_update = max(fixes[user.id], user.last_location_update or fixes[user.id])
+        updated = User.objects.bulk_update(users, ['last_location_update'], batch_size=500)
+
+        updated += User.objects.filter(id__in=online, is_active_session=False).update(is_active_session=True)
+        updated += User.objects.filter(is_active_session=True).exclude(id__in=online).update(is_active_session=False)
+
+        expired = now - self.ttl()
+        pipe = client.pipeline(transaction=False)
+        for key in client.scan_iter(match=f'{KEY_PREFIX}:*', count=500):
+            if key.decode() != f'{KEY_PREFIX}:flushed_at':
+                pipe.zremrangebyscore(key, '-inf', expired)
+        pipe.set(f'{KEY_PREFIX}:flushed_at', now)
+        pipe.execute()
+
+        logger.info(f"Présence reportée: {len(online)} utilisateurs en ligne, {updated} lignes modifiées")
+        return updated
+
+
+# Instance globale
+presence = Presence()
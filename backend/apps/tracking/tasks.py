@@ -0,0 +1,7 @@
+from celery import shared_task
+from .presence import presence
+
+@shared_task
+def flush_presence():
+    """Reporter la présence Redis sur les utilisateurs (dernière position, session active)"""
+    return presence.flush()
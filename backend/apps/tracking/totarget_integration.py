@@ -15,7 +15,11 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from .models import Location, TrackerDevice
+from .fleet import fleet_index
+from .presence import presence
 from apps.users.models import User
+from apps.monitoring.metrics import metrics
+from pirogue_smart import fast_json
 
 logger = logging.getLogger(__name__)
 
@@ -300,8 +304,9 @@ def totarget_webhook(request):
 
         # Parser les données JSON
         try:
-            payload = json.loads(request.body)
+            payload = fast_json.loads(request.body)
             logger.info(f"Payload reçu: {len(payload)} dispositifs")
+            metrics.observe('ingest_devices_per_payload', len(payload), source='totarget')
         except json.JSONDecodeError as e:
             logger.error(f"Payload JSON invalide: {str(e)}")
             return JsonResponse({'error': 'JSON invalide'}, status=400)
@@ -315,6 +320,7 @@ def totarget_webhook(request):
                 # Valider l'ID du dispositif
                 if not totarget_integration._validate_device_id(device_id):
                     logger.warning(f"ID de dispositif invalide: {device_id}")
+                    metrics.inc('ingest_fixes_total', len(device_responses), source='totarget', result='rejected')
                     continue
                 
                 # Chercher le dispositif dans la base de données
@@ -322,6 +328,7 @@ def totarget_webhook(request):
                     device = TrackerDevice.objects.get(device_id=device_id, is_active=True)
                 except TrackerDevice.DoesNotExist:
                     logger.warning(f"Dispositif non trouvé: {device_id}")
+                    metrics.inc('ingest_fixes_total', len(device_responses), source='totarget', result='rejected')
                     continue
                 
                 # Traiter chaque réponse du dispositif
@@ -330,7 +337,10 @@ def totarget_webhook(request):
                         processed = process_device_response(device, response_data)
                         if processed:
                             processed_devices.append(device_id)
+                        metrics.inc('ingest_fixes_total', source='totarget',
+                                    result='accepted' if processed else 'rejected')
                     except Exception as e:
+                        metrics.inc('ingest_fixes_total', source='totarget', result='rejected')
                         error_msg = f"Erreur traitement réponse {device_id}: {str(e)}"
                         logger.error(error_msg)
                         errors.append(error_msg)
@@ -395,6 +405,7 @@ def process_device_response(device: TrackerDevice, response_data: dict):
         }
         
         location = Location.objects.create(**location_data)
+        fleet_index.update(device.user_id, lat, lon, location.timestamp)
         
         # Mettre à jour les informations du dispositif
         device.last_communication = timezone.now()
@@ -420,10 +431,8 @@ def process_device_response(device: TrackerDevice, response_data: dict):
         
         device.save()
         
-        # Mettre à jour l'utilisateur
-        device.user.last_location_update = timezone.now()
-        device.user.is_active_session = True
-        device.user.save()
+        # Présence dans Redis, reportée périodiquement sur l'utilisateur
+        presence.touch(device.user_id, fix=True, at=location.timestamp)
         
         # Traiter les réponses ELock si présentes
         elock_response = response_data.get('elockResponse')
@@ -448,7 +457,7 @@ def process_elock_response(device: TrackerDevice, elock_response: dict):
         
         # Créer une alerte si nécessaire
         if 'Alarm' in cmd_type or 'Failure' in cmd_type:
-            from apps.alerts.models import Alert
+            from apps.alerts.suppression import create_or_suppress, suppression_key
             
             severity = 'high' if 'Failure' in cmd_type else 'medium'
             title = f'Alerte ELock - {device.device_id}'
@@ -457,7 +466,8 @@ def process_elock_response(device: TrackerDevice, elock_response: dict):
             if elock_id:
                 message += f' (ELock ID: {elock_id})'
             
-            Alert.objects.create(
+            alert_id, created = create_or_suppress(
+                suppression_key(device.device_id, 'system', cmd_type),
                 user=device.user,
                 alert_type='system',
                 title=title,
@@ -470,7 +480,10 @@ def process_elock_response(device: TrackerDevice, elock_response: dict):
                 }
             )
             
-            logger.info(f"Alerte ELock créée pour {device.device_id}")
+            if created:
+                logger.info(f"Alerte ELock créée pour {device.device_id}")
+            else:
+                logger.info(f"Alerte ELock {alert_id} répétée pour {device.device_id}")
             
     except Exception as e:
         logger.error(f"Erreur traitement ELock: {str(e)}")
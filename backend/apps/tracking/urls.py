@@ -6,6 +6,7 @@ urlpatterns = [
     path('locations/', views.LocationListCreateView.as_view(), name='locations'),
     path('trips/', views.TripListCreateView.as_view(), name='trips'),
     path('devices/', views.TrackerDeviceListView.as_view(), name='devices'),
+    path('presence/', views.presence_view, name='presence'),
     path('webhook/tracker/', views.tracker_webhook, name='tracker-webhook'),
     path('webhook/totarget/', totarget_webhook, name='totarget-webhook'),
     path('totarget/command/', send_totarget_command, name='totarget-command'),
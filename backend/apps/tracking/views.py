@@ -3,10 +3,18 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.utils import timezone
+import logging
 from .models import Location, Trip, TrackerDevice
 from .serializers import LocationSerializer, TripSerializer, TrackerDeviceSerializer
+from .fleet import fleet_index
+from .presence import KINDS, presence
+from apps.monitoring.metrics import metrics
+from pirogue_smart.db_routing import ReplicaReadMixin
+from pirogue_smart.sparse_fields import SparseFieldsMixin
 
-class LocationListCreateView(generics.ListCreateAPIView):
+logger = logging.getLogger(__name__)
+
+class LocationListCreateView(ReplicaReadMixin, SparseFieldsMixin, generics.ListCreateAPIView):
     serializer_class = LocationSerializer
     permission_classes = [IsAuthenticated]
     
@@ -17,7 +25,9 @@ class LocationListCreateView(generics.ListCreateAPIView):
         return Location.objects.filter(user=user)
     
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user, timestamp=timezone.now())
+        location = serializer.save(user=self.request.user, timestamp=timezone.now())
+        fleet_index.update(location.user_id, location.latitude, location.longitude, location.timestamp)
+        presence.touch(location.user_id, fix=True, at=location.timestamp)
 
 @api_view(['POST'])
 @permission_classes([AllowAny])  # Pour permettre aux traqueurs d'envoyer des données
@@ -30,12 +40,14 @@ def tracker_webhook(request):
         device_id = data.get('device_id')
         
         if not device_id:
+            metrics.inc('ingest_fixes_total', source='tracker', result='rejected')
             return Response({'error': 'device_id requis'}, status=status.HTTP_400_BAD_REQUEST)
         
         # Trouver le dispositif
         try:
             device = TrackerDevice.objects.get(device_id=device_id, is_active=True)
         except TrackerDevice.DoesNotExist:
+            metrics.inc('ingest_fixes_total', source='tracker', result='rejected')
             return Response({'error': 'Dispositif non trouvé'}, status=status.HTTP_404_NOT_FOUND)
         
         # Créer la position
@@ -53,6 +65,7 @@ def tracker_webhook(request):
         serializer = LocationSerializer(data=location_data)
         if serializer.is_valid():
             location = serializer.save()
+            fleet_index.update(location.user_id, location.latitude, location.longitude, location.timestamp)
             
             # Mettre à jour le dispositif
             device.last_communication = timezone.now()
@@ -60,17 +73,17 @@ def tracker_webhook(request):
             device.signal_strength = data.get('signal_strength')
             device.save()
             
-            # Mettre à jour l'utilisateur
-            device.user.last_location_update = timezone.now()
-            device.user.is_active_session = True
-            device.user.save()
+            # Présence dans Redis, reportée périodiquement sur l'utilisateur
+            presence.touch(location.user_id, fix=True, at=location.timestamp)
             
+            metrics.inc('ingest_fixes_total', source='tracker', result='accepted')
             return Response({
                 'status': 'success',
                 'location_id': location.id,
                 'message': 'Position enregistrée'
             })
         
+        metrics.inc('ingest_fixes_total', source='tracker', result='rejected')
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
     except Exception as e:
@@ -79,7 +92,7 @@ def tracker_webhook(request):
             'details': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class TripListCreateView(generics.ListCreateAPIView):
+class TripListCreateView(ReplicaReadMixin, generics.ListCreateAPIView):
     serializer_class = TripSerializer
     permission_classes = [IsAuthenticated]
     
@@ -89,7 +102,7 @@ class TripListCreateView(generics.ListCreateAPIView):
             return Trip.objects.all()
         return Trip.objects.filter(user=user)
 
-class TrackerDeviceListView(generics.ListCreateAPIView):
+class TrackerDeviceListView(ReplicaReadMixin, SparseFieldsMixin, generics.ListCreateAPIView):
     serializer_class = TrackerDeviceSerializer
     permission_classes = [IsAuthenticated]
     
@@ -97,4 +110,41 @@ class TrackerDeviceListView(generics.ListCreateAPIView):
         user = self.request.user
         if user.role in ['admin', 'organization']:
             return TrackerDevice.objects.all()
-        return TrackerDevice.objects.filter(user=user)
\ No newline at end of file
+        return TrackerDevice.objects.filter(user=user)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def presence_view(request):
+    """
+    Utilisateurs actifs (depuis PRESENCE_TTL_SECONDS secondes), lus dans Redis
+    ?organization=... (admins et organisations ; les pêcheurs voient leur organisation)
+    ?kind=seen (toute activité, défaut) ou fix (position reçue : en mer)
+    """
+    try:
+        kind = request.query_params.get('kind', 'seen')
+        if kind not in KINDS:
+            return Response({'error': f"kind doit valoir {' ou '.join(KINDS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.user.role in ['admin', 'organization']:
+            organization = request.query_params.get('organization') or None
+        else:
+            profile = getattr(request.user, 'profile', None)
+            organization = getattr(profile, 'organization_name', None) or None
+            if organization is None:
+                return Response({'error': 'Aucune organisation associée au compte'}, status=status.HTTP_403_FORBIDDEN)
+
+        online = presence.online(organization, kind=kind)
+        return Response({
+            'organization': organization,
+            'kind': kind,
+            'count': len(online),
+            'users': [{'user_id': user_id, 'last_seen': last_seen.isoformat()} for user_id, last_seen in online],
+        })
+
+    except Exception as e:
+        logger.error(f"Erreur lecture de la présence: {str(e)}")
+        return Response({
+            'error': 'Erreur serveur',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
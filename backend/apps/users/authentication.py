@@ -0,0 +1,138 @@
+"""
+Authentification par token DRF avec cache
+
+TokenAuthentication relit le token et son utilisateur en base à chaque
+appel d'API. Ici le couple (token, utilisateur) est gardé :
+- dans un LRU local au processus (AUTH_TOKEN_CACHE_SIZE entrées, durée de
+  vie AUTH_TOKEN_LOCAL_TTL secondes), sans aller-retour réseau ;
+- dans le cache partagé (Redis) pendant AUTH_TOKEN_CACHE_TTL secondes,
+  pour les autres workers.
+La suppression du token (déconnexion) et toute modification de
+l'utilisateur autre que sa position (mot de passe, désactivation, rôle)
+invalident le cache partagé et le LRU du processus ; le LRU des autres
+processus expire au plus tard après AUTH_TOKEN_LOCAL_TTL secondes.
+Les entrées sont des copies sérialisées : chaque requête reçoit sa propre
+instance d'utilisateur.
+Cette instance est en lecture seule : elle peut dater de
+AUTH_TOKEN_CACHE_TTL secondes (position, session, mot de passe...). Une vue
+qui modifie l'utilisateur le relit d'abord (User.objects.get(pk=...)) ou
+n'enregistre que les champs modifiés (update_fields), sinon save()
+réécrirait les anciennes valeurs.
+"""
+
+import hashlib
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from apps.monitoring.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'auth_token'
+
+
+def _cache_key(key):
+    # Le token lui-même n'apparaît jamais dans le cache
+    return f'{KEY_PREFIX}:{hashlib.sha256(key.encode()).hexdigest()[:32]}'
+
+
+class LocalTokenCache:
+    """LRU borné local au processus : clé -> (expiration, token sérialisé)"""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        ttl = getattr(settings, 'AUTH_TOKEN_LOCAL_TTL', 5)
+        size = getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 1024)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalTokenCache()
+
+
+def invalidate(keys):
+    """Retirer des tokens des caches local et partagé"""
+    cache_keys = [_cache_key(key) for key in keys]
+    for cache_key in cache_keys:
+        local_cache.delete(cache_key)
+    try:
+        cache.delete_many(cache_keys)
+    except Exception as e:
+        logger.warning(f"Invalidation du cache des tokens impossible: {str(e)}")
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication servie depuis le cache (LRU local puis Redis), la base en dernier recours"""
+
+    def authenticate_credentials(self, key):
+        cache_key = _cache_key(key)
+
+        payload = local_cache.get(cache_key)
+        if payload is not None:
+            metrics.inc('auth_token_cache_total', result='local')
+            return self._check(pickle.loads(payload))
+
+        try:
+            payload = cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Lecture du cache des tokens impossible: {str(e)}")
+            payload = None
+        if payload is not None:
+            metrics.inc('auth_token_cache_total', result='shared')
+            local_cache.set(cache_key, payload)
+            return self._check(pickle.loads(payload))
+
+        metrics.inc('auth_token_cache_total', result='miss')
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        # Utilisateur désactivé : pas mis en cache, la base reste la référence
+        if token.user.is_active:
+            payload = pickle.dumps(token, pickle.HIGHEST_PROTOCOL)
+            local_cache.set(cache_key, payload)
+            try:
+                cache.set(cache_key, payload, timeout=getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 60))
+            except Exception as e:
+                logger.warning(f"Écriture du cache des tokens impossible: {str(e)}")
+        return self._check(token)
+
+    @staticmethod
+    def _check(token):
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return (token.user, token)
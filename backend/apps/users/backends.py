@@ -0,0 +1,38 @@
+"""
+Connexion par email
+
+L'utilisateur est retrouvé par son email, sans tenir compte de la casse, en
+une requête sur l'index unique LOWER(email) (contrainte
+`user_email_ci_unique`), puis le mot de passe est vérifié une seule fois.
+Email inconnu : le hasher tourne quand même une fois, la durée de la
+réponse ne révèle pas si le compte existe.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models.functions import Lower
+
+
+def users_by_email(email):
+    """Utilisateurs dont l'email correspond sans tenir compte de la casse (lecture sur l'index LOWER(email))"""
+    # email <> '' : condition de l'index partiel, sans elle PostgreSQL ne peut pas l'utiliser
+    return get_user_model()._default_manager.alias(email_lower=Lower('email')).filter(
+        email_lower=email.strip().lower()).exclude(email='')
+
+
+class EmailBackend(ModelBackend):
+    """authenticate(request, email=..., password=...)"""
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if not email or password is None:
+            return None
+        UserModel = get_user_model()
+        try:
+            user = users_by_email(email).get()
+        except UserModel.DoesNotExist:
+            # Même coût qu'un mot de passe faux
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.1 on 2026-10-19 15:43
+
+import django.db.models.functions.text
+from django.core.management.base import CommandError
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """
+    Arrêter la migration si des comptes partagent un email à la casse près :
+    la contrainte ne pourrait pas être créée, et fusionner des comptes ne se
+    fait pas automatiquement. Corriger ou vider ces emails puis relancer migrate.
+    """
+    User = apps.get_model('users', 'User')
+    duplicates = list(
+        User.objects.using(schema_editor.connection.alias).exclude(email='')
+        .values(email_lower=Lower('email')).annotate(accounts=Count('id')).filter(accounts__gt=1)
+        .order_by('email_lower').values_list('email_lower', flat=True)
+    )
+    if duplicates:
+        raise CommandError(
+            f"{len(duplicates)} emails utilisés par plusieurs comptes (sans tenir compte de la casse), "
+            f"à corriger avant la contrainte user_email_ci_unique: {', '.join(duplicates[:20])}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(('email', ''), _negated=True), name='user_email_ci_unique'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
 class User(AbstractUser):
@@ -17,6 +18,13 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Connexion par email : un compte par adresse, casse ignorée (index lu par EmailBackend)
+            models.UniqueConstraint(Lower('email'), condition=~models.Q(email=''),
+                                    name='user_email_ci_unique'),
+        ]
+
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
 
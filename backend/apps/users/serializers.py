@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from .backends import users_by_email
 from .models import User, UserProfile
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -26,15 +27,8 @@ class LoginSerializer(serializers.Serializer):
         password = attrs.get('password')
         
         if email and password:
-            # Essayer d'abord avec l'email comme username
-            user = authenticate(username=email, password=password)
-            if not user:
-                # Si ça ne marche pas, chercher l'utilisateur par email
-                try:
-                    user_obj = User.objects.get(email=email)
-                    user = authenticate(username=user_obj.username, password=password)
-                except User.DoesNotExist:
-                    user = None
+            # Une requête sur l'index LOWER(email) et un seul calcul du hash (EmailBackend)
+            user = authenticate(self.context.get('request'), email=email, password=password)
             
             if not user:
                 raise serializers.ValidationError('Identifiants invalides')
@@ -55,6 +49,11 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = User
         fields = ['email', 'password', 'confirm_password', 'role', 'phone', 'profile']
     
+    def validate_email(self, value):
+        if users_by_email(value).exists():
+            raise serializers.ValidationError("Un compte existe déjà avec cet email")
+        return value
+    
     def validate(self, attrs):
         if attrs['password'] != attrs['confirm_password']:
             raise serializers.ValidationError("Les mots de passe ne correspondent pas")
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .authentication import invalidate
+from .models import User
+
+# Champs mis à jour à chaque position : sans effet sur l'authentification
+PRESENCE_FIELDS = {'last_location_update', 'is_active_session', 'last_login', 'updated_at'}
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    """Déconnexion : le token ne doit plus être accepté depuis le cache"""
+    invalidate([instance.key])
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    """Mot de passe, désactivation, rôle... : relire l'utilisateur en base à la prochaine requête"""
+    if update_fields is not None and set(update_fields) <= PRESENCE_FIELDS:
+        return
+    invalidate(Token.objects.filter(user_id=instance.pk).values_list('key', flat=True))
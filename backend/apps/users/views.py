@@ -6,11 +6,13 @@ from rest_framework.authtoken.models import Token
 from django.contrib.auth import login, logout
 from .models import User, UserProfile
 from .serializers import LoginSerializer, RegisterSerializer, UserSerializer
+from pirogue_smart.db_routing import ReplicaReadMixin
+from pirogue_smart.sparse_fields import SparseFieldsMixin
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def login_view(request):
-    serializer = LoginSerializer(data=request.data)
+    serializer = LoginSerializer(data=request.data, context={'request': request})
     if serializer.is_valid():
         user = serializer.validated_data['user']
         token, created = Token.objects.get_or_create(user=user)
@@ -55,13 +57,15 @@ def profile_view(request):
         return Response(UserSerializer(request.user).data)
     
     elif request.method == 'PUT':
-        serializer = UserSerializer(request.user, data=request.data, partial=True)
+        # request.user peut être une copie en cache (CachedTokenAuthentication) : relu avant écriture
+        user = User.objects.get(pk=request.user.pk)
+        serializer = UserSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class UserListView(generics.ListCreateAPIView):
+class UserListView(ReplicaReadMixin, SparseFieldsMixin, generics.ListCreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
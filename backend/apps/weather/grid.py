@@ -0,0 +1,184 @@
+"""
+Grille météo en mémoire
+
+Les prévisions sont rattachées à une grille fixe de WEATHER_GRID_DEG degrés
+(nœud (i, j) = latitude i * pas, longitude j * pas). Chaque processus garde
+la prévision courante de chaque nœud dans un dict : la recherche du nœud le
+plus proche, ou l'interpolation bilinéaire entre les quatre nœuds voisins,
+se fait sans requête SQL.
+
+Chaque écriture incrémente la version HTTP de la ressource « weather »
+(pirogue_smart.http_cache) ; chaque processus la consulte au plus toutes
+les WEATHER_GRID_CHECK secondes et recharge la grille quand elle a changé.
+"""
+
+import logging
+import math
+from abc import ABC, abstractmethod
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from pirogue_smart import http_cache
+
+logger = logging.getLogger(__name__)
+
+RESOURCE = 'weather'
+
+# Champs numériques interpolés, les autres viennent du nœud le plus proche
+NUMERIC_FIELDS = ('temperature', 'wind_speed', 'wave_height', 'visibility', 'pressure', 'humidity')
+FIELDS = NUMERIC_FIELDS + ('wind_direction', 'condition', 'icon', 'forecast_time')
+
+
+def grid_step() -> float:
+    return getattr(settings, 'WEATHER_GRID_DEG', 0.25)
+
+
+def snap(lat, lon, step=None):
+    """Nœud de grille le plus proche de (lat, lon)"""
+    step = step or grid_step()
+    # floor(x + 0.5) plutôt que round() : même arrondi que le SQL de la migration
+    return (math.floor(float(lat) / step + 0.5), math.floor(float(lon) / step + 0.5))
+
+
+def bump_version():
+    """Signaler aux autres processus (et aux clients HTTP) que la grille a changé"""
+    http_cache.bump_version(RESOURCE)
+
+
+class VersionedGridCache(ABC):
+    """
+    Données de grille chargées en mémoire, rechargées quand la version
+    partagée change (ou au moins toutes les heures)
+    """
+
+    def __init__(self, step=None, check_seconds=None):
+        self.step = step or grid_step()
+        self.check_seconds = check_seconds if check_seconds is not None else \
+            getattr(settings, 'WEATHER_GRID_CHECK', 5)
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = None
+        self._loaded_at = None
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_seconds:
+            return
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_seconds:
+                return
+            version = http_cache.get_version(RESOURCE)[0]
+            if version is None:
+                version = self._version
+            # Rechargement aussi à chaque heure : les échéances utiles avancent avec le temps
+            stale = self._loaded_at is None or now - self._loaded_at >= 3600
+            if version != self._version or stale:
+                try:
+                    self._load()
+                    self._version = version
+                    self._loaded_at = now
+                except Exception as e:
+                    logger.error(f"Chargement de la grille météo impossible: {str(e)}")
+            self._checked_at = now
+
+    @abstractmethod
+    def _load(self):
+        """Relire les données de la grille depuis la base"""
+
+
+class WeatherGrid(VersionedGridCache):
+    """Prévision courante par nœud de grille"""
+
+    def __init__(self, step=None, check_seconds=None):
+        super().__init__(step, check_seconds)
+        self._nodes = {}   # (i, j) -> dict des valeurs
+
+    def _load(self):
+        from .models import WeatherData
+
+        # Prévision la plus récente déjà valide pour chaque nœud (DISTINCT ON sur l'index du nœud)
+        now = timezone.now()
+        rows = (
+            WeatherData.objects.filter(
+                forecast_time__lte=now,
+                forecast_time__gte=now - timedelta(hours=getattr(settings, 'WEATHER_GRID_MAX_AGE_HOURS', 24)),
+            )
+            .order_by('grid_i', 'grid_j', '-forecast_time')
+            .distinct('grid_i', 'grid_j')
+            .values('grid_i', 'grid_j', *FIELDS)
+        )
+        nodes = {}
+        for row in rows:
+            key = (row.pop('grid_i'), row.pop('grid_j'))
+            for field in NUMERIC_FIELDS:
+                row[field] = float(row[field])
+            nodes[key] = row
+        self._nodes = nodes
+        logger.info(f"Grille météo chargée: {len(nodes)} nœuds")
+
+    def nearest(self, lat, lon):
+        """Nœud renseigné le plus proche (nœud exact, sinon ses huit voisins), ou None"""
+        self._ensure_fresh()
+        ci, cj = snap(lat, lon, self.step)
+        nodes = self._nodes
+        if (ci, cj) in nodes:
+            return self._result((ci, cj), nodes[(ci, cj)], interpolated=False)
+
+        best = None
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                key = (ci + di, cj + dj)
+                if key not in nodes:
+                    continue
+                distance = (lat - key[0] * self.step) ** 2 + (lon - key[1] * self.step) ** 2
+                if best is None or distance < best[0]:
+                    best = (distance, key)
+        if best is None:
+            return None
+        return self._result(best[1], nodes[best[1]], interpolated=False)
+
+    def interpolate(self, lat, lon):
+        """
+        Interpolation bilinéaire entre les quatre nœuds qui encadrent (lat, lon).
+        Les nœuds manquants sont ignorés (poids renormalisés) ; sans aucun nœud,
+        repli sur le nœud le plus proche.
+        """
+        self._ensure_fresh()
+        fi, fj = lat / self.step, lon / self.step
+        i0, j0 = math.floor(fi), math.floor(fj)
+        ti, tj = fi - i0, fj - j0
+        corners = [
+            ((i0, j0), (1 - ti) * (1 - tj)),
+            ((i0 + 1, j0), ti * (1 - tj)),
+            ((i0, j0 + 1), (1 - ti) * tj),
+            ((i0 + 1, j0 + 1), ti * tj),
+        ]
+        nodes = self._nodes
+        present = [(key, weight, nodes[key]) for key, weight in corners if key in nodes]
+        total = sum(weight for _, weight, _ in present)
+        if not present or total <= 0:
+            return self.nearest(lat, lon)
+
+        # Valeurs non numériques : celles du nœud de plus fort poids
+        key, _, base = max(present, key=lambda corner: corner[1])
+        result = self._result(key, base, interpolated=True)
+        result['latitude'], result['longitude'] = lat, lon
+        for field in NUMERIC_FIELDS:
+            result[field] = round(sum(weight * values[field] for _, weight, values in present) / total, 2)
+        result['humidity'] = round(result['humidity'])
+        return result
+
+    def _result(self, key, values, interpolated):
+        return {
+            **values,
+            'grid_cell': list(key),
+            'latitude': round(key[0] * self.step, 6),
+            'longitude': round(key[1] * self.step, 6),
+            'interpolated': interpolated,
+        }
+
+
+# Instance globale
+weather_grid = WeatherGrid()
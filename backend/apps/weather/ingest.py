@@ -0,0 +1,314 @@
+"""
+Ingestion en masse des fichiers de prévisions marines
+
+Formats acceptés :
+- .npz : tableaux maillés à la manière d'un NetCDF — `latitude` (n_lat),
+  `longitude` (n_lon), `forecast_time` (n_t, secondes epoch ou datetime64)
+  et une variable (n_t, n_lat, n_lon) par grandeur
+- .csv : une ligne par point (latitude, longitude, forecast_time ISO 8601
+  ou epoch, puis les grandeurs)
+
+Grandeurs : temperature, wind_speed (km/h), wind_direction, wave_height
+(obligatoires), visibility, pressure, humidity (facultatives). Les points
+sans valeur (NaN, typiquement la terre) sont ignorés.
+
+Les tableaux sont traités avec NumPy (rattachement à la grille, arrondis,
+code de condition), chargés par COPY dans une table temporaire, puis
+fusionnés dans WeatherData en une requête INSERT ... ON CONFLICT. Les
+prévisions remplacées par le nouveau run et celles plus anciennes que
+WEATHER_FORECAST_RETENTION_HOURS sont supprimées.
+"""
+
+import io
+import logging
+import shutil
+import time
+from datetime import timedelta
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .grid import bump_version, grid_step
+from .models import WeatherData
+
+logger = logging.getLogger(__name__)
+
+REQUIRED = ('temperature', 'wind_speed', 'wind_direction', 'wave_height')
+OPTIONAL = {'visibility': 10.0, 'pressure': 1013.25, 'humidity': 75.0}
+VARIABLES = REQUIRED + tuple(OPTIONAL)
+
+# code -> (condition, icon)
+CONDITIONS = [
+    ('Mer calme', 'calm'),
+    ('Mer agitée', 'rough-sea'),
+    ('Tempête', 'storm'),
+    ('Brouillard', 'fog'),
+]
+
+STAGING_COLUMNS = ('grid_i', 'grid_j', 'distance', 'forecast_time') + VARIABLES + ('condition_code',)
+# Format texte COPY par colonne (décimales à 2 chiffres par défaut)
+COPY_FORMATS = {
+    'grid_i': '%d', 'grid_j': '%d', 'distance': '%.10g', 'forecast_time': '%d',
+    'wind_direction': '%d', 'humidity': '%d', 'condition_code': '%d',
+}
+
+
+class ForecastFileError(ValueError):
+    pass
+
+
+def _epoch_seconds(values) -> np.ndarray:
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.number):
+        return values.astype(np.int64)
+    if values.dtype.kind in ('U', 'S', 'O'):
+        # numpy n'accepte pas les suffixes de fuseau : les heures sont en UTC
+        values = np.char.replace(values.astype(str), 'Z', '')
+        values = np.char.replace(values, '+00:00', '')
+    return values.astype('datetime64[s]').astype(np.int64)
+
+
+def read_npz(path) -> dict:
+    """Colonnes à plat (une valeur par point et par échéance) depuis un fichier .npz"""
+    with np.load(path) as data:
+        missing = [key for key in ('latitude', 'longitude', 'forecast_time', *REQUIRED) if key not in data]
+        if missing:
+            raise ForecastFileError(f"Tableaux manquants: {', '.join(missing)}")
+        lat, lon = data['latitude'].astype(float), data['longitude'].astype(float)
+        times = _epoch_seconds(data['forecast_time'])
+        shape = (len(times), len(lat), len(lon))
+
+        t_grid, lat_grid, lon_grid = np.meshgrid(times, lat, lon, indexing='ij')
+        columns = {
+            'latitude': lat_grid.ravel(),
+            'longitude': lon_grid.ravel(),
+            'forecast_time': t_grid.ravel(),
+        }
+        for name in VARIABLES:
+            if name in data:
+                values = data[name].astype(float)
+                if values.shape != shape:
+                    raise ForecastFileError(f"{name}: dimensions {values.shape}, attendu {shape}")
+                columns[name] = values.ravel()
+    return columns
+
+
+def read_csv(path) -> dict:
+    """Colonnes depuis un fichier CSV avec en-tête"""
+    rows = np.genfromtxt(path, delimiter=',', names=True, dtype=None, encoding='utf-8', autostrip=True)
+    names = rows.dtype.names or ()
+    missing = [key for key in ('latitude', 'longitude', 'forecast_time', *REQUIRED) if key not in names]
+    if missing:
+        raise ForecastFileError(f"Colonnes manquantes: {', '.join(missing)}")
+    rows = np.atleast_1d(rows)
+    columns = {
+        'latitude': rows['latitude'].astype(float),
+        'longitude': rows['longitude'].astype(float),
+        'forecast_time': _epoch_seconds(rows['forecast_time']),
+    }
+    for name in VARIABLES:
+        if name in names:
+            columns[name] = rows[name].astype(float)
+    return columns
+
+
+def read_forecast_file(path) -> dict:
+    suffix = Path(path).suffix.lower()
+    if suffix == '.npz':
+        return read_npz(path)
+    if suffix == '.csv':
+        return read_csv(path)
+    raise ForecastFileError(f"Format non supporté: {suffix}")
+
+
+def prepare(columns: dict, step: float = None) -> dict:
+    """Rattachement à la grille, valeurs par défaut, arrondis et code de condition (vectorisé)"""
+    step = step or grid_step()
+    lat, lon = columns['latitude'], columns['longitude']
+    n = len(lat)
+
+    values = {name: columns.get(name, np.full(n, OPTIONAL.get(name, np.nan))) for name in VARIABLES}
+    for name, default in OPTIONAL.items():
+        values[name] = np.where(np.isnan(values[name]), default, values[name])
+    keep = ~np.isnan(np.column_stack([lat, lon] + [values[name] for name in REQUIRED])).any(axis=1)
+    keep &= (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+
+    lat, lon = lat[keep], lon[keep]
+    values = {name: column[keep] for name, column in values.items()}
+    grid_i = np.floor(lat / step + 0.5).astype(np.int64)
+    grid_j = np.floor(lon / step + 0.5).astype(np.int64)
+
+    # Bornes des colonnes décimales du modèle
+    values['temperature'] = np.clip(values['temperature'], -99, 99).round(2)
+    values['wind_speed'] = np.clip(values['wind_speed'], 0, 999).round(2)
+    values['wave_height'] = np.clip(values['wave_height'], 0, 99).round(2)
+    values['visibility'] = np.clip(values['visibility'], 0, 999).round(2)
+    values['pressure'] = np.clip(values['pressure'], 0, 99999).round(2)
+    values['wind_direction'] = np.mod(np.rint(values['wind_direction']), 360)
+    values['humidity'] = np.clip(np.rint(values['humidity']), 0, 100)
+
+    condition_code = np.select(
+        [
+            (values['wave_height'] >= 3) | (values['wind_speed'] >= 50),
+            (values['wave_height'] >= 2) | (values['wind_speed'] >= 30),
+            values['visibility'] < 2,
+        ],
+        [2, 1, 3],
+        default=0,
+    )
+
+    return {
+        'grid_i': grid_i,
+        'grid_j': grid_j,
+        # Plusieurs points source peuvent tomber sur le même nœud : on garde le plus proche
+        'distance': (lat - grid_i * step) ** 2 + (lon - grid_j * step) ** 2,
+        'forecast_time': columns['forecast_time'][keep],
+        **values,
+        'condition_code': condition_code,
+    }
+
+
+def _copy_buffer(prepared: dict) -> io.StringIO:
+    table = np.column_stack([prepared[name].astype(float) for name in STAGING_COLUMNS])
+    fmt = [COPY_FORMATS.get(name, '%.2f') for name in STAGING_COLUMNS]
+    buffer = io.StringIO()
+    np.savetxt(buffer, table, fmt=fmt, delimiter='\t')
+    buffer.seek(0)
+    return buffer
+
+
+def load(prepared: dict, prune: bool = True, step: float = None) -> dict:
+    """COPY dans une table temporaire puis fusion dans WeatherData"""
+    step = step or grid_step()
+    table = WeatherData._meta.db_table
+    retention = getattr(settings, 'WEATHER_FORECAST_RETENTION_HOURS', 48)
+    condition_sql = ' '.join(f"WHEN {code} THEN %s" for code in range(len(CONDITIONS)))
+    stats = {'merged': 0, 'superseded': 0, 'expired': 0}
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TEMP TABLE weather_staging (
+                    grid_i integer, grid_j integer, distance double precision,
+                    forecast_time bigint, temperature numeric, wind_speed numeric,
+                    wind_direction integer, wave_height numeric, visibility numeric,
+                    pressure numeric, humidity integer, condition_code smallint
+                ) ON COMMIT DROP
+                """
+            )
+            cursor.cursor.copy_expert(
+                f"COPY weather_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN",
+                _copy_buffer(prepared)
+            )
+            cursor.execute('CREATE INDEX ON weather_staging (grid_i, grid_j, forecast_time)')
+            cursor.execute('ANALYZE weather_staging')
+
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (latitude, longitude, temperature, wind_speed, wind_direction,
+                                     wave_height, visibility, pressure, humidity, condition, icon,
+                                     forecast_time, grid_i, grid_j, created_at)
+                SELECT DISTINCT ON (grid_i, grid_j, forecast_time)
+                       round((grid_i * %s)::numeric, 8), round((grid_j * %s)::numeric, 8),
+                       temperature, wind_speed, wind_direction, wave_height, visibility,
+                       pressure, humidity,
+                       CASE condition_code {condition_sql} END,
+                       CASE condition_code {condition_sql} END,
+                       to_timestamp(forecast_time), grid_i, grid_j, now()
+                FROM weather_staging
+                ORDER BY grid_i, grid_j, forecast_time, distance
+                ON CONFLICT (grid_i, grid_j, forecast_time) DO UPDATE SET
+                    temperature = EXCLUDED.temperature, wind_speed = EXCLUDED.wind_speed,
+                    wind_direction = EXCLUDED.wind_direction, wave_height = EXCLUDED.wave_height,
+                    visibility = EXCLUDED.visibility, pressure = EXCLUDED.pressure,
+                    humidity = EXCLUDED.humidity, condition = EXCLUDED.condition,
+                    icon = EXCLUDED.icon, created_at = EXCLUDED.created_at
+                """,
+                [step, step,
+                 *[condition for condition, _ in CONDITIONS],
+                 *[icon for _, icon in CONDITIONS]]
+            )
+            stats['merged'] = cursor.rowcount
+
+            if prune:
+                # Échéances de l'ancien run absentes du nouveau, sur les nœuds et la période couverts
+                cursor.execute(
+                    f"""
+                    DELETE FROM {table} w
+                    USING (SELECT DISTINCT grid_i, grid_j FROM weather_staging) nodes,
+                          (SELECT to_timestamp(min(forecast_time)) AS first_time,
+                                  to_timestamp(max(forecast_time)) AS last_time
+                           FROM weather_staging) span
+                    WHERE w.grid_i = nodes.grid_i AND w.grid_j = nodes.grid_j
+                      AND w.forecast_time BETWEEN span.first_time AND span.last_time
+                      AND NOT EXISTS (
+                          SELECT 1 FROM weather_staging s
+                          WHERE s.grid_i = w.grid_i AND s.grid_j = w.grid_j
+                            AND to_timestamp(s.forecast_time) = w.forecast_time
+                      )
+                    """
+                )
+                stats['superseded'] = cursor.rowcount
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE forecast_time < %s",
+                    [timezone.now() - timedelta(hours=retention)]
+                )
+                stats['expired'] = cursor.rowcount
+
+    bump_version()
+    return stats
+
+
+def ingest_file(path, prune: bool = True) -> dict:
+    """Ingérer un fichier de prévisions, retourne les statistiques (lignes, durée, débit)"""
+    started = time.perf_counter()
+    columns = read_forecast_file(path)
+    read_at = time.perf_counter()
+    prepared = prepare(columns)
+    stats = load(prepared, prune=prune)
+
+    elapsed = time.perf_counter() - started
+    stats.update({
+        'file': str(path),
+        'points': len(columns['latitude']),
+        'rows': len(prepared['grid_i']),
+        'read_seconds': round(read_at - started, 3),
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(len(prepared['grid_i']) / elapsed) if elapsed else None,
+    })
+    logger.info(
+        f"Prévisions {Path(path).name}: {stats['rows']} points en {elapsed:.2f}s "
+        f"({stats['rows_per_second']} points/s), {stats['merged']} fusionnés, "
+        f"{stats['superseded']} remplacés, {stats['expired']} expirés"
+    )
+    return stats
+
+
+def ingest_directory(directory=None, prune: bool = True) -> list:
+    """
+    Ingérer les fichiers en attente de WEATHER_FORECAST_DIR (plus anciens d'abord),
+    déplacés ensuite dans processed/ ou failed/
+    """
+    directory = Path(directory or settings.WEATHER_FORECAST_DIR)
+    if not directory.is_dir():
+        logger.warning(f"Répertoire de prévisions introuvable: {directory}")
+        return []
+
+    files = sorted(
+        (path for path in directory.iterdir() if path.suffix.lower() in ('.csv', '.npz') and path.is_file()),
+        key=lambda path: path.stat().st_mtime
+    )
+    results = []
+    for path in files:
+        try:
+            results.append(ingest_file(path, prune=prune))
+            target = directory / 'processed'
+        except Exception as e:
+            logger.error(f"Ingestion du fichier de prévisions {path.name} impossible: {str(e)}")
+            results.append({'file': str(path), 'error': str(e)})
+            target = directory / 'failed'
+        target.mkdir(exist_ok=True)
+        shutil.move(str(path), str(target / path.name))
+    return results
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.weather.ingest import ingest_directory, ingest_file
+
+class Command(BaseCommand):
+    help = 'Ingérer des fichiers de prévisions marines (.csv / .npz) dans WeatherData'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'files',
+            nargs='*',
+            help='Fichiers à ingérer (par défaut : fichiers en attente dans WEATHER_FORECAST_DIR)',
+        )
+        parser.add_argument(
+            '--no-prune',
+            action='store_true',
+            help='Ne pas supprimer les prévisions remplacées ou expirées',
+        )
+
+    def handle(self, *args, **options):
+        prune = not options['no_prune']
+        if options['files']:
+            try:
+                results = [ingest_file(path, prune=prune) for path in options['files']]
+            except (OSError, ValueError) as e:
+                raise CommandError(str(e))
+        else:
+            results = ingest_directory(prune=prune)
+
+        for result in results:
+            if 'error' in result:
+                self.stdout.write(self.style.ERROR(f"❌ {result['file']}: {result['error']}"))
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {result['file']}: {result['rows']} points en {result['seconds']}s "
+                f"({result['rows_per_second']} points/s) — {result['merged']} fusionnés, "
+                f"{result['superseded']} remplacés, {result['expired']} expirés"
+            ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from apps.weather.risk import score_fleet
+
+class Command(BaseCommand):
+    help = 'Évaluer le risque météo de la flotte et mettre à jour les alertes météo'
+
+    def handle(self, *args, **options):
+        stats = score_fleet()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {stats['vessels']} navires ({stats['covered']} couverts), {stats['at_risk']} à risque — "
+            f"{stats['created']} créées, {stats['updated']} mises à jour ({stats['escalated']} aggravées), "
+            f"{stats['resolved']} résolues — calcul {stats['compute_ms']}ms, total {stats['total_ms']}ms"
+        ))
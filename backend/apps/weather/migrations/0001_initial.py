@@ -0,0 +1,37 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('latitude', models.DecimalField(decimal_places=8, max_digits=10)),
+                ('longitude', models.DecimalField(decimal_places=8, max_digits=11)),
+                ('temperature', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('wind_speed', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('wind_direction', models.IntegerField()),
+                ('wave_height', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('visibility', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('pressure', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('humidity', models.IntegerField()),
+                ('condition', models.CharField(max_length=100)),
+                ('icon', models.CharField(max_length=50)),
+                ('forecast_time', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-forecast_time'],
+                'indexes': [models.Index(fields=['latitude', 'longitude'], name='weather_wea_latitud_d598c3_idx'), models.Index(fields=['-forecast_time'], name='weather_wea_forecas_57df2b_idx')],
+            },
+        ),
+    ]
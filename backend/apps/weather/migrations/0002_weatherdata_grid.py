@@ -0,0 +1,41 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def snap_existing(apps, schema_editor):
+    """Rattacher les données existantes à la grille"""
+    step = getattr(settings, 'WEATHER_GRID_DEG', 0.25)
+    WeatherData = apps.get_model('weather', 'WeatherData')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {WeatherData._meta.db_table} "
+            "SET grid_i = floor(latitude / %s + 0.5), grid_j = floor(longitude / %s + 0.5)",
+            [step, step]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='weatherdata',
+            name='grid_i',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='weatherdata',
+            name='grid_j',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(snap_existing, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='weatherdata',
+            index=models.Index(fields=['grid_i', 'grid_j', '-forecast_time'], name='weather_grid_time_idx'),
+        ),
+    ]
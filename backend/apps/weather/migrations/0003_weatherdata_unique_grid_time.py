@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:58
+
+from django.db import migrations, models
+
+
+def drop_duplicates(apps, schema_editor):
+    """Garder la ligne la plus récente par nœud et par échéance"""
+    WeatherData = apps.get_model('weather', 'WeatherData')
+    table = WeatherData._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} a USING {table} b "
+            "WHERE a.grid_i = b.grid_i AND a.grid_j = b.grid_j "
+            "AND a.forecast_time = b.forecast_time AND a.id < b.id"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0002_weatherdata_grid'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='weatherdata',
+            name='weather_grid_time_idx',
+        ),
+        migrations.RunPython(drop_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='weatherdata',
+            constraint=models.UniqueConstraint(fields=('grid_i', 'grid_j', 'forecast_time'), name='unique_weather_grid_time'),
+        ),
+    ]
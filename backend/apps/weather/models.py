@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
 class WeatherData(models.Model):
     # Temporarily using decimal fields instead of PostGIS Point
@@ -14,6 +14,9 @@ class WeatherData(models.Model):
     condition = models.CharField(max_length=100)
     icon = models.CharField(max_length=50)
     forecast_time = models.DateTimeField()
+    # Nœud de la grille météo (WEATHER_GRID_DEG), calculé à l'enregistrement
+    grid_i = models.IntegerField(default=0)
+    grid_j = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -22,6 +25,34 @@ class WeatherData(models.Model):
             models.Index(fields=['latitude', 'longitude']),
             models.Index(fields=['-forecast_time']),
         ]
+        constraints = [
+            # Une prévision par nœud et par échéance (clé de fusion de l'ingestion)
+            models.UniqueConstraint(fields=['grid_i', 'grid_j', 'forecast_time'],
+                                    name='unique_weather_grid_time'),
+        ]
+    
+    def save(self, *args, **kwargs):
+        from .grid import snap
+        self.grid_i, self.grid_j = snap(self.latitude, self.longitude)
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        try:
+            with transaction.atomic(using=kwargs.get('using')):
+                super().save(*args, **kwargs)
+        except IntegrityError:
+            # Nœud et échéance déjà présents (deux points de la même maille) : mise à jour
+            # de la ligne existante, comme ON CONFLICT DO UPDATE à l'ingestion
+            existing = WeatherData.objects.using(kwargs.get('using')).filter(
+                grid_i=self.grid_i, grid_j=self.grid_j, forecast_time=self.forecast_time,
+            ).values_list('pk', flat=True).first()
+            if existing is None:
+                raise
+            self.pk = existing
+            self._state.adding = False
+            super().save(using=kwargs.get('using'), update_fields=[
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'created_at'
+            ])
     
     def __str__(self):
         return f"Météo {self.forecast_time.strftime('%Y-%m-%d %H:%M')} - {self.temperature}°C"
\ No newline at end of file
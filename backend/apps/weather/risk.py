@@ -0,0 +1,210 @@
+"""
+Score de risque météo de la flotte
+
+Toutes les dernières positions connues (index de flotte) sont croisées en
+une passe NumPy avec les prévisions en mémoire (cube vent / houle /
+visibilité interpolé à l'heure courante). Chaque navire reçoit un score
+(rapport au seuil de danger le plus dépassé) et une sévérité ; les alertes
+météo sont ensuite créées, mises à jour ou résolues par lots :
+- une seule alerte météo ouverte par navire (déduplication), dont le
+  compteur d'occurrences et les valeurs sont mis à jour à chaque passage ;
+- une hausse de sévérité réactive une alerte déjà acquittée ;
+- l'alerte est résolue quand le navire repasse sous les seuils.
+"""
+
+import json
+import logging
+import time
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.alerts import counters
+from apps.alerts.models import Alert
+from apps.alerts.notifications import ORGANIZATION_GROUP, broadcast_many, user_group
+from apps.monitoring.metrics import metrics
+from apps.tracking.fleet import fleet_index
+from .route import forecast_cube
+
+logger = logging.getLogger(__name__)
+
+SOURCE = 'weather_risk'
+SEVERITIES = [None, 'medium', 'high', 'critical']
+# Rang de gravité des alertes existantes (saisies à la main : 'low' compris), inconnue = 0
+SEVERITY_RANK = {key: rank for rank, (key, _) in enumerate(Alert.SEVERITY_CHOICES, start=1)}
+
+
+def thresholds() -> dict:
+    """{variable: (seuil de vigilance, seuil de danger)} ; pour la visibilité, plus bas est pire"""
+    return getattr(settings, 'WEATHER_RISK_THRESHOLDS', {
+        'wind_speed': (30, 50),
+        'wave_height': (2.0, 3.0),
+        'visibility': (2.0, 1.0),
+    })
+
+
+def score(wind, wave, visibility):
+    """
+    Score et niveau de sévérité (0 = aucun, 1 = medium, 2 = high, 3 = critical) par navire.
+    Score = rapport au seuil de danger le plus dépassé (1 = seuil de danger atteint).
+    """
+    limits = thresholds()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratios = np.vstack([
+            wind / limits['wind_speed'][1],
+            wave / limits['wave_height'][1],
+            limits['visibility'][1] / np.maximum(visibility, 0.01),
+        ])
+        watch = (
+            (wind >= limits['wind_speed'][0])
+            | (wave >= limits['wave_height'][0])
+            | (visibility <= limits['visibility'][0])
+        )
+    ratios = np.where(np.isnan(ratios), 0, ratios)
+    scores = ratios.max(axis=0)
+    levels = np.select([scores >= 1.5, scores >= 1, watch], [3, 2, 1], default=0)
+    return scores, levels
+
+
+def _describe(wind, wave, visibility):
+    parts = []
+    if not np.isnan(wind):
+        parts.append(f"vent {wind:.0f} km/h")
+    if not np.isnan(wave):
+        parts.append(f"houle {wave:.1f} m")
+    if not np.isnan(visibility):
+        parts.append(f"visibilité {visibility:.1f} km")
+    return ', '.join(parts)
+
+
+def _update_open_alerts(alerts, now, batch_size=1000):
+    """Mise à jour des alertes ouvertes en une requête UPDATE ... FROM (VALUES ...) par lot"""
+    table = Alert._meta.db_table
+    for start in range(0, len(alerts), batch_size):
+        batch = alerts[start:start + batch_size]
+        values = ', '.join(['(%s, %s, %s, %s, %s::jsonb)'] * len(batch))
+        params = [value for alert in batch
+                  for value in (alert.id, alert.severity, alert.status, alert.message, json.dumps(alert.metadata))]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table} AS a SET
+                    severity = v.severity, status = v.status, message = v.message, metadata = v.metadata,
+                    occurrence_count = a.occurrence_count + 1, last_seen = %s, updated_at = %s
+                FROM (VALUES {values}) AS v(id, severity, status, message, metadata)
+                WHERE a.id = v.id
+                """,
+                [now, now, *params]
+            )
+
+
+def score_fleet() -> dict:
+    """Évaluer toute la flotte et mettre à jour les alertes météo, retourne les statistiques du passage"""
+    started = time.perf_counter()
+    now = timezone.now()
+
+    user_ids, lats, lons, _ = fleet_index.snapshot()
+    stats = {'vessels': len(user_ids), 'covered': 0, 'at_risk': 0,
+             'created': 0, 'updated': 0, 'escalated': 0, 'resolved': 0}
+    if not user_ids:
+        stats.update({'compute_ms': 0.0, 'total_ms': round((time.perf_counter() - started) * 1000, 1)})
+        return stats
+
+    lats, lons = np.array(lats), np.array(lons)
+    values = forecast_cube.sample(lats, lons, np.full(len(lats), now.timestamp()))
+    wind, wave, visibility = values['wind_speed'], values['wave_height'], values['visibility']
+    scores, levels = score(wind, wave, visibility)
+    covered = ~(np.isnan(wind) & np.isnan(wave) & np.isnan(visibility))
+    compute_ms = (time.perf_counter() - started) * 1000
+
+    at_risk = {user_ids[k]: k for k in np.flatnonzero(levels > 0)}
+    # Navires couverts par la grille et sous les seuils : leur alerte ouverte est résolue
+    safe = {user_ids[k] for k in np.flatnonzero((levels == 0) & covered)}
+    stats.update({'covered': int(covered.sum()), 'at_risk': len(at_risk)})
+
+    def details(k):
+        return {
+            'source': SOURCE,
+            'score': round(float(scores[k]), 2),
+            'wind_speed': None if np.isnan(wind[k]) else round(float(wind[k]), 1),
+            'wave_height': None if np.isnan(wave[k]) else round(float(wave[k]), 2),
+            'visibility': None if np.isnan(visibility[k]) else round(float(visibility[k]), 1),
+            'latitude': round(float(lats[k]), 6),
+            'longitude': round(float(lons[k]), 6),
+            'evaluated_at': now.isoformat(),
+        }
+
+    def message(k):
+        return f"Conditions dangereuses à votre position : {_describe(wind[k], wave[k], visibility[k])}"
+
+    notifications = []
+    with transaction.atomic():
+        open_alerts = list(
+            Alert.objects.select_for_update()
+            .filter(alert_type='weather', status__in=['active', 'acknowledged'],
+                    metadata__source=SOURCE, user_id__in=list(at_risk) + list(safe))
+            .only('id', 'user_id', 'alert_type', 'severity', 'status')
+        )
+        changes, updated, resolved = [], [], []
+        for alert in open_alerts:
+            old = (alert.severity, alert.status)
+            if alert.user_id in at_risk:
+                k = at_risk.pop(alert.user_id)
+                severity = SEVERITIES[levels[k]]
+                escalated = SEVERITY_RANK[severity] > SEVERITY_RANK.get(alert.severity, 0)
+                alert.severity = severity
+                if escalated:
+                    alert.status = 'active'
+                    stats['escalated'] += 1
+                    notifications.append((alert, k))
+                alert.message = message(k)
+                alert.metadata = details(k)
+                updated.append(alert)
+            elif alert.user_id in safe:
+                alert.status = 'resolved'
+                resolved.append(alert)
+            changes.append((alert.user_id, alert.alert_type, old[0], old[1], alert.severity, alert.status))
+
+        _update_open_alerts(updated, now)
+        if resolved:
+            Alert.objects.filter(id__in=[alert.id for alert in resolved]).update(
+                status='resolved', resolved_at=now, updated_at=now)
+
+        # Navires à risque sans alerte ouverte
+        created = Alert.objects.bulk_create([
+            Alert(user_id=user_id, alert_type='weather', title='Risque météo', message=message(k),
+                  severity=SEVERITIES[levels[k]], last_seen=now, metadata=details(k))
+            for user_id, k in at_risk.items()
+        ], batch_size=500)
+        notifications.extend((alert, at_risk[alert.user_id]) for alert in created)
+
+        counters.record_changes(changes)
+        counters.record_created_bulk(created)
+
+    stats.update({'created': len(created), 'updated': len(updated), 'resolved': len(resolved)})
+
+    if notifications:
+        events = [({
+            'event': 'weather_risk',
+            'alert_id': alert.id,
+            'user_id': alert.user_id,
+            'severity': alert.severity,
+            'message': alert.message,
+            **details(k),
+        }, [user_group(alert.user_id)]) for alert, k in notifications]
+        events.append(({
+            'event': 'weather_risk_summary',
+            'alert_ids': [alert.id for alert, _ in notifications],
+            **{key: stats[key] for key in ('vessels', 'at_risk', 'created', 'escalated', 'resolved')},
+        }, [ORGANIZATION_GROUP]))
+        broadcast_many(events)
+
+    total = time.perf_counter() - started
+    stats.update({'compute_ms': round(compute_ms, 1), 'total_ms': round(total * 1000, 1)})
+    metrics.observe('weather_risk_run_seconds', total)
+    logger.info(
+        f"Risque météo: {stats['vessels']} navires ({stats['covered']} couverts), {stats['at_risk']} à risque, "
+        f"{stats['created']} alertes créées, {stats['updated']} mises à jour, {stats['resolved']} résolues "
+        f"— calcul {stats['compute_ms']}ms, total {stats['total_ms']}ms"
+    )
+    return stats
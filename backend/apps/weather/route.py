@@ -0,0 +1,216 @@
+"""
+Météo le long d'un itinéraire
+
+Les prévisions (vent, houle, visibilité) des prochaines heures sont gardées en mémoire
+sous forme de cubes NumPy (échéance x nœud latitude x nœud longitude),
+rechargés avec la grille météo. Le cube est borné à WEATHER_ROUTE_BBOX : un
+nœud isolé loin de la côte ne le fait pas grossir. Un itinéraire est découpé en points
+réguliers, chacun daté selon la vitesse du navire, puis tous les points sont
+interpolés d'un coup (trilinéaire en espace et en temps) : aucune requête
+SQL par point.
+"""
+
+import logging
+import math
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from .grid import VersionedGridCache
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_SAMPLES = 5000
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Distance orthodromique en kilomètres (vectorisée)"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class ForecastCube(VersionedGridCache):
+    """Vent, houle et visibilité par échéance et par nœud, en tableaux NumPy"""
+
+    VARIABLES = ('wind_speed', 'wave_height', 'visibility')
+
+    def __init__(self, step=None, check_seconds=None):
+        super().__init__(step, check_seconds)
+        self._cube = None
+
+    def _load(self):
+        from .models import WeatherData
+
+        now = timezone.now()
+        lat_min, lon_min, lat_max, lon_max = getattr(settings, 'WEATHER_ROUTE_BBOX', (10, -22, 18, -14))
+        rows = list(
+            WeatherData.objects.filter(
+                forecast_time__gte=now - timedelta(hours=3),
+                forecast_time__lte=now + timedelta(hours=getattr(settings, 'WEATHER_ROUTE_HORIZON_HOURS', 72)),
+                grid_i__gte=math.ceil(lat_min / self.step), grid_i__lte=math.floor(lat_max / self.step),
+                grid_j__gte=math.ceil(lon_min / self.step), grid_j__lte=math.floor(lon_max / self.step),
+            )
+            .order_by()
+            .values_list('grid_i', 'grid_j', 'forecast_time', *self.VARIABLES)
+        )
+        if not rows:
+            self._cube = None
+            return
+
+        grid_i, grid_j, times, *values = zip(*rows)
+        grid_i, grid_j = np.array(grid_i), np.array(grid_j)
+        epochs, t_index = np.unique(np.array([t.timestamp() for t in times]), return_inverse=True)
+        i0, j0 = grid_i.min(), grid_j.min()
+        shape = (len(epochs), grid_i.max() - i0 + 1, grid_j.max() - j0 + 1)
+
+        arrays = {}
+        for name, column in zip(self.VARIABLES, values):
+            array = np.full(shape, np.nan)
+            array[t_index, grid_i - i0, grid_j - j0] = np.array(column, dtype=float)
+            arrays[name] = array
+
+        # Remplacement en bloc : les lectures en cours gardent l'ancien cube
+        self._cube = {'epochs': epochs, 'i0': i0, 'j0': j0, 'arrays': arrays}
+        size_mb = sum(array.nbytes for array in arrays.values()) / 2 ** 20
+        logger.info(f"Cube de prévisions chargé: {shape[0]} échéances x {shape[1]} x {shape[2]} nœuds, "
+                    f"{size_mb:.1f} Mo")
+
+    def sample(self, lats, lons, epochs) -> dict:
+        """Valeurs interpolées {variable: tableau} aux points (lat, lon, epoch), NaN hors couverture"""
+        self._ensure_fresh()
+        cube = self._cube
+        n = len(lats)
+        if cube is None:
+            return {name: np.full(n, np.nan) for name in self.VARIABLES}
+
+        ft = np.interp(epochs, cube['epochs'], np.arange(len(cube['epochs'])), left=np.nan, right=np.nan)
+        fi = np.asarray(lats) / self.step - cube['i0']
+        fj = np.asarray(lons) / self.step - cube['j0']
+        return {name: _trilinear(array, ft, fi, fj) for name, array in cube['arrays'].items()}
+
+
+def _trilinear(array, ft, fi, fj):
+    """
+    Interpolation trilinéaire ; les coins absents (NaN ou hors cube) sont
+    ignorés et les poids restants renormalisés
+    """
+    size_t, size_i, size_j = array.shape
+    known = ~np.isnan(ft)
+    ft = np.where(known, ft, 0)
+    t0, i0, j0 = np.floor(ft).astype(int), np.floor(fi).astype(int), np.floor(fj).astype(int)
+    dt, di, dj = ft - t0, fi - i0, fj - j0
+
+    total = np.zeros(len(ft))
+    weights = np.zeros(len(ft))
+    for ot in (0, 1):
+        wt = dt if ot else 1 - dt
+        t = t0 + ot
+        for oi in (0, 1):
+            wi = di if oi else 1 - di
+            i = i0 + oi
+            for oj in (0, 1):
+                wj = dj if oj else 1 - dj
+                j = j0 + oj
+                w = wt * wi * wj
+                inside = known & (w > 0) & (t >= 0) & (t < size_t) & (i >= 0) & (i < size_i) & (j >= 0) & (j < size_j)
+                values = np.full(len(ft), np.nan)
+                values[inside] = array[t[inside], i[inside], j[inside]]
+                ok = inside & ~np.isnan(values)
+                total[ok] += w[ok] * values[ok]
+                weights[ok] += w[ok]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(weights > 0, total / weights, np.nan)
+
+
+def densify(points, step_km):
+    """
+    Points régulièrement espacés le long de la polyligne.
+    Retourne (lats, lons, distance cumulée en km, numéro du tronçon, longueur des tronçons).
+    """
+    points = np.asarray(points, dtype=float)
+    legs = haversine_km(points[:-1, 0], points[:-1, 1], points[1:, 0], points[1:, 1])
+    total = legs.sum()
+    # Pas élargi si l'itinéraire dépasse le nombre maximal de points
+    step_km = max(step_km, total / MAX_SAMPLES)
+    counts = np.maximum(np.ceil(legs / step_km).astype(int), 1)
+
+    leg = np.repeat(np.arange(len(legs)), counts + 1)
+    position = np.concatenate([np.linspace(0, 1, count + 1) for count in counts])
+    start, end = points[leg], points[leg + 1]
+    lats = start[:, 0] + (end[:, 0] - start[:, 0]) * position
+    lons = start[:, 1] + (end[:, 1] - start[:, 1]) * position
+    distance = np.concatenate([[0], np.cumsum(legs)])[leg] + legs[leg] * position
+    return lats, lons, distance, leg, legs
+
+
+def sample_route(points, speed_kmh, departure=None, step_km=None) -> dict:
+    """
+    Conditions prévues le long d'un itinéraire parcouru à `speed_kmh` depuis `departure`.
+    Retourne le résumé, le pire vent et la pire houle par tronçon, et les points échantillonnés.
+    """
+    departure = departure or timezone.now()
+    step_km = step_km or getattr(settings, 'WEATHER_ROUTE_STEP_KM', 2)
+    lats, lons, distance, leg, legs = densify(points, step_km)
+    hours = distance / speed_kmh
+    epochs = departure.timestamp() + hours * 3600
+    values = forecast_cube.sample(lats, lons, epochs)
+    wind, wave = values['wind_speed'], values['wave_height']
+
+    def at(index):
+        return (departure + timedelta(hours=float(hours[index]))).isoformat()
+
+    def worst(array, mask):
+        masked = np.where(mask & ~np.isnan(array), array, -np.inf)
+        index = int(np.argmax(masked))
+        if not np.isfinite(masked[index]):
+            return None, None
+        return round(float(array[index]), 2), index
+
+    segments = []
+    for number in range(len(legs)):
+        mask = leg == number
+        indices = np.flatnonzero(mask)
+        max_wind, wind_index = worst(wind, mask)
+        max_wave, wave_index = worst(wave, mask)
+        covered = ~np.isnan(wind[mask]) | ~np.isnan(wave[mask])
+        segments.append({
+            'index': number,
+            'start': [float(points[number][0]), float(points[number][1])],
+            'end': [float(points[number + 1][0]), float(points[number + 1][1])],
+            'distance_km': round(float(legs[number]), 2),
+            'eta_start': at(indices[0]),
+            'eta_end': at(indices[-1]),
+            'max_wind_speed': max_wind,
+            'max_wind_at': at(wind_index) if wind_index is not None else None,
+            'max_wind_position': [float(lats[wind_index]), float(lons[wind_index])] if wind_index is not None else None,
+            'max_wave_height': max_wave,
+            'max_wave_at': at(wave_index) if wave_index is not None else None,
+            'max_wave_position': [float(lats[wave_index]), float(lons[wave_index])] if wave_index is not None else None,
+            'coverage': round(float(covered.mean()), 2),
+        })
+
+    all_points = np.ones(len(lats), dtype=bool)
+    return {
+        'departure': departure.isoformat(),
+        'arrival': at(len(lats) - 1),
+        'speed_kmh': speed_kmh,
+        'distance_km': round(float(legs.sum()), 2),
+        'duration_hours': round(float(hours[-1]), 2),
+        'max_wind_speed': worst(wind, all_points)[0],
+        'max_wave_height': worst(wave, all_points)[0],
+        'segments': segments,
+        'samples': {
+            'latitude': np.round(lats, 5).tolist(),
+            'longitude': np.round(lons, 5).tolist(),
+            'eta_hours': np.round(hours, 3).tolist(),
+            'wind_speed': [None if math.isnan(v) else round(v, 2) for v in wind.tolist()],
+            'wave_height': [None if math.isnan(v) else round(v, 2) for v in wave.tolist()],
+        },
+    }
+
+
+# Instance globale
+forecast_cube = ForecastCube()
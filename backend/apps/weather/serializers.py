@@ -6,5 +6,5 @@ class WeatherDataSerializer(serializers.ModelSerializer):
         model = WeatherData
         fields = ['id', 'latitude', 'longitude', 'temperature', 'wind_speed', 
                  'wind_direction', 'wave_height', 'visibility', 'pressure', 
-                 'humidity', 'condition', 'icon', 'forecast_time', 'created_at']
-        read_only_fields = ['id', 'created_at']
\ No newline at end of file
+                 'humidity', 'condition', 'icon', 'forecast_time', 'grid_i', 'grid_j', 'created_at']
+        read_only_fields = ['id', 'grid_i', 'grid_j', 'created_at']
\ No newline at end of file
@@ -0,0 +1,11 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import WeatherData
+from .grid import bump_version
+
+@receiver(post_save, sender=WeatherData)
+@receiver(post_delete, sender=WeatherData)
+def weather_changed(sender, using, **kwargs):
+    """Invalider la grille météo des autres processus et le cache HTTP, une fois la transaction validée"""
+    transaction.on_commit(bump_version, using=using)
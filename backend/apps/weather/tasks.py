@@ -0,0 +1,12 @@
+from celery import shared_task
+from . import ingest, risk
+
+@shared_task
+def ingest_weather_forecasts():
+    """Ingérer les fichiers de prévisions déposés dans WEATHER_FORECAST_DIR"""
+    return ingest.ingest_directory()
+
+@shared_task
+def score_fleet_weather_risk():
+    """Croiser les positions de la flotte avec la météo et mettre à jour les alertes"""
+    return risk.score_fleet()
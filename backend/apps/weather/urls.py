@@ -5,4 +5,5 @@ urlpatterns = [
     path('', views.WeatherDataListView.as_view(), name='weather-data'),
     path('current/', views.current_weather, name='current-weather'),
     path('forecast/', views.weather_forecast, name='weather-forecast'),
+    path('route/', views.route_weather, name='route-weather'),
 ]
\ No newline at end of file
@@ -2,13 +2,22 @@ from rest_framework import generics
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.conf import settings
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from pirogue_smart.http_cache import CachedListMixin, cache_response
 from .models import WeatherData
 from .serializers import WeatherDataSerializer
+from .grid import snap, weather_grid
+from .route import sample_route
+from apps.tracking.fleet import fleet_index
+from apps.tracking.models import Location, Trip
 
-class WeatherDataListView(generics.ListAPIView):
+class WeatherDataListView(CachedListMixin, generics.ListAPIView):
     serializer_class = WeatherDataSerializer
     permission_classes = [IsAuthenticated]
+    cache_resource = 'weather'
+    cache_time_bucket = 300
     
     def get_queryset(self):
         # Retourner les données météo récentes
@@ -18,39 +27,29 @@ class WeatherDataListView(generics.ListAPIView):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cache_response('weather', time_bucket=3600)
 def current_weather(request):
     """
-    Obtenir les conditions météo actuelles
+    Obtenir les conditions météo actuelles au nœud de grille le plus proche
+    (?interpolate=1 : interpolation bilinéaire entre les nœuds voisins)
     """
     try:
-        lat = request.GET.get('lat', 14.9325)  # Cayar par défaut
-        lon = request.GET.get('lon', -17.1925)
+        try:
+            lat = float(request.GET.get('lat', 14.9325))  # Cayar par défaut
+            lon = float(request.GET.get('lon', -17.1925))
+        except (TypeError, ValueError):
+            return Response({'error': 'Coordonnées invalides'}, status=400)
+        if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
+            return Response({'error': 'Coordonnées invalides'}, status=400)
         
-        # Chercher les données météo les plus récentes pour cette position
-        weather = WeatherData.objects.filter(
-            latitude__range=[float(lat) - 0.1, float(lat) + 0.1],
-            longitude__range=[float(lon) - 0.1, float(lon) + 0.1]
-        ).first()
-        
-        if weather:
-            serializer = WeatherDataSerializer(weather)
-            return Response(serializer.data)
+        if request.GET.get('interpolate') in ('1', 'true'):
+            weather = weather_grid.interpolate(lat, lon)
         else:
-            # Retourner des données simulées si aucune donnée en base
-            return Response({
-                'temperature': 26.5,
-                'wind_speed': 12.3,
-                'wind_direction': 245,
-                'wave_height': 1.2,
-                'visibility': 10.0,
-                'pressure': 1013.2,
-                'humidity': 75,
-                'condition': 'Partiellement nuageux',
-                'icon': 'partly-cloudy',
-                'forecast_time': timezone.now().isoformat(),
-                'latitude': lat,
-                'longitude': lon
-            })
+            weather = weather_grid.nearest(lat, lon)
+        
+        if weather is None:
+            return Response({'error': 'Aucune donnée météo pour cette position'}, status=404)
+        return Response(weather)
             
     except Exception as e:
         return Response({
@@ -60,29 +59,139 @@ def current_weather(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cache_response('weather', time_bucket=3600)
 def weather_forecast(request):
     """
-    Obtenir les prévisions météo
+    Obtenir les prévisions météo par jour au nœud de grille le plus proche
     """
     try:
-        days = int(request.GET.get('days', 3))
+        days = min(int(request.GET.get('days', 3)), 10)
+        lat = float(request.GET.get('lat', 14.9325))  # Cayar par défaut
+        lon = float(request.GET.get('lon', -17.1925))
+        
+        grid_i, grid_j = snap(lat, lon)
+        current = weather_grid.nearest(lat, lon)
+        if current:
+            grid_i, grid_j = current['grid_cell']
+        
+        now = timezone.now()
+        rows = WeatherData.objects.filter(
+            grid_i=grid_i, grid_j=grid_j,
+            forecast_time__gte=now,
+            forecast_time__lt=now + timezone.timedelta(days=days)
+        ).order_by('forecast_time').values(
+            'forecast_time', 'temperature', 'wind_speed', 'wave_height', 'condition', 'icon'
+        )
+        
+        # Agrégat journalier : température moyenne, vent et houle maximaux,
+        # condition de l'échéance la plus forte houle
+        by_day = {}
+        for row in rows:
+            date = timezone.localtime(row['forecast_time']).date().isoformat()
+            by_day.setdefault(date, []).append(row)
         
-        # Simuler des prévisions pour la démonstration
         forecast = []
-        for i in range(days):
-            date = timezone.now() + timezone.timedelta(days=i)
+        for date, items in by_day.items():
+            worst = max(items, key=lambda item: item['wave_height'])
             forecast.append({
-                'date': date.date().isoformat(),
-                'temperature': 26 + (i * 0.5),
-                'wind_speed': 10 + (i * 2),
-                'wave_height': 1.0 + (i * 0.2),
-                'condition': 'Ensoleillé' if i == 0 else 'Partiellement nuageux'
+                'date': date,
+                'temperature': round(sum(float(item['temperature']) for item in items) / len(items), 1),
+                'wind_speed': max(float(item['wind_speed']) for item in items),
+                'wave_height': float(worst['wave_height']),
+                'condition': worst['condition'],
+                'icon': worst['icon']
             })
         
-        return Response({'forecast': forecast})
+        return Response({'grid_cell': [grid_i, grid_j], 'forecast': forecast[:days]})
         
+    except (TypeError, ValueError):
+        return Response({'error': 'Paramètres invalides'}, status=400)
     except Exception as e:
         return Response({
             'error': 'Erreur prévisions météo',
             'details': str(e)
-        }, status=500)
\ No newline at end of file
+        }, status=500)
+
+ROUTE_MAX_POINTS = 200
+
+def _parse_points(raw):
+    """[[lat, lon], ...] ou [{latitude, longitude}, ...] -> liste de (lat, lon)"""
+    points = []
+    for point in raw or []:
+        if isinstance(point, dict):
+            lat, lon = point.get('latitude', point.get('lat')), point.get('longitude', point.get('lon'))
+        else:
+            lat, lon = point
+        lat, lon = float(lat), float(lon)
+        if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
+            raise ValueError('Coordonnées invalides')
+        points.append((lat, lon))
+    return points
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def route_weather(request):
+    """
+    Conditions prévues le long d'un itinéraire
+    - {"points": [[lat, lon], ...], "speed_kmh": 15, "departure": "..."} : itinéraire prévu
+    - {"trip": id, "points": [...]} : sortie en cours, depuis la dernière position du
+      navire vers les points donnés (par défaut retour au point de départ)
+    Renvoie le pire vent et la pire houle par tronçon.
+    """
+    try:
+        data = request.data
+        user = request.user
+        try:
+            points = _parse_points(data.get('points'))
+            speed = data.get('speed_kmh')
+            speed = float(speed) if speed is not None else None
+            step_km = float(data['step_km']) if data.get('step_km') else None
+        except (TypeError, ValueError, KeyError):
+            return Response({'error': 'Itinéraire invalide'}, status=400)
+        
+        departure = None
+        if data.get('departure'):
+            departure = parse_datetime(str(data['departure']))
+            if departure is None:
+                return Response({'error': 'Date de départ invalide'}, status=400)
+            if timezone.is_naive(departure):
+                departure = timezone.make_aware(departure)
+        
+        if data.get('trip'):
+            try:
+                trip = Trip.objects.select_related('start_location').get(id=data['trip'])
+            except (Trip.DoesNotExist, ValueError):
+                return Response({'error': 'Sortie non trouvée'}, status=404)
+            if user.role not in ['admin', 'organization'] and trip.user_id != user.id:
+                return Response({'error': 'Permission refusée'}, status=403)
+            
+            current = fleet_index.get(trip.user_id)
+            if current is None:
+                last = Location.objects.filter(user_id=trip.user_id).values_list('latitude', 'longitude').first()
+                current = (float(last[0]), float(last[1])) if last else None
+            if current is None:
+                return Response({'error': 'Position du navire inconnue'}, status=400)
+            if not points and trip.start_location:
+                points = [(float(trip.start_location.latitude), float(trip.start_location.longitude))]
+            points = [(current[0], current[1])] + points
+            if speed is None and trip.avg_speed:
+                speed = float(trip.avg_speed)
+        
+        if len(points) < 2:
+            return Response({'error': 'Au moins deux points sont nécessaires'}, status=400)
+        if len(points) > ROUTE_MAX_POINTS:
+            return Response({'error': f'{ROUTE_MAX_POINTS} points maximum'}, status=400)
+        speed = speed or settings.WEATHER_ROUTE_DEFAULT_SPEED_KMH
+        if speed <= 0:
+            return Response({'error': 'Vitesse invalide'}, status=400)
+        
+        result = sample_route(points, speed, departure=departure, step_km=step_km)
+        if not data.get('include_samples'):
+            result.pop('samples')
+        return Response(result)
+        
+    except Exception as e:
+        return Response({
+            'error': 'Erreur météo itinéraire',
+            'details': str(e)
+        }, status=500)
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Zone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('zone_type', models.CharField(choices=[('safety', 'Zone de Sécurité'), ('fishing', 'Zone de Pêche'), ('restricted', 'Zone Restreinte'), ('navigation', 'Zone de Navigation')], max_length=20)),
+                ('coordinates', models.JSONField(help_text='GeoJSON polygon coordinates')),
+                ('radius', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['zone_type', 'is_active'], name='zones_zone_zone_ty_6329ab_idx'), models.Index(fields=['-created_at'], name='zones_zone_created_e33e86_idx')],
+            },
+        ),
+    ]
@@ -9,4 +9,8 @@ class ZoneSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'zone_type', 'coordinates', 
                  'radius', 'is_active', 'created_by', 'created_by_name', 
                  'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at', 'created_by_name']
\ No newline at end of file
+        read_only_fields = ['id', 'created_at', 'updated_at', 'created_by_name']
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('created_by__profile')
\ No newline at end of file
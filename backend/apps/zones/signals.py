@@ -0,0 +1,11 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from pirogue_smart.http_cache import bump_version
+from .models import Zone
+
+@receiver(post_save, sender=Zone)
+@receiver(post_delete, sender=Zone)
+def zone_changed(sender, using, **kwargs):
+    """Invalider le cache HTTP des zones une fois la transaction validée"""
+    transaction.on_commit(lambda: bump_version('zones'), using=using)
@@ -2,10 +2,13 @@ from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from .models import Zone
 from .serializers import ZoneSerializer
+from pirogue_smart.eager_loading import EagerLoadingMixin
+from pirogue_smart.http_cache import CachedListMixin
 
-class ZoneListCreateView(generics.ListCreateAPIView):
+class ZoneListCreateView(CachedListMixin, EagerLoadingMixin, generics.ListCreateAPIView):
     serializer_class = ZoneSerializer
     permission_classes = [IsAuthenticated]
+    cache_resource = 'zones'
     
     def get_queryset(self):
         return Zone.objects.filter(is_active=True)
@@ -13,7 +16,7 @@ class ZoneListCreateView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
-class ZoneDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ZoneDetailView(EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ZoneSerializer
     permission_classes = [IsAuthenticated]
     
@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+"""
+Test de charge du chat websocket (ws/chat/<channel_id>/)
+
+Usage (depuis backend/, PostgreSQL et Redis locaux démarrés) :
+
+    python -m benchmarks.chat_load --sockets 300 --channels 30 --messages 20 --interval 1
+
+Ouvre `--sockets` connexions authentifiées par token (comptes de bench)
+réparties sur `--channels` canaux, via l'application ASGI complète et le
+channel layer Redis réel. Chaque socket envoie `--messages` messages, un
+toutes les `--interval` secondes (0 : au plus vite, en attendant l'accusé
+du précédent) ; on mesure :
+- le temps de connexion ;
+- la latence de l'accusé (message enregistré, id serveur reçu) ;
+- la latence de diffusion aux autres membres du canal et la part des
+  diffusions reçues (le channel layer abandonne les messages au-delà de sa
+  capacité par consumer) ;
+- le débit global et la taille des lots écrits en base.
+Le script vérifie enfin la reprise (resume) et que chaque message est en
+base, et renvoie le code 1 sinon.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from asgiref.testing import ApplicationCommunicator  # noqa: E402
+from channels.db import database_sync_to_async  # noqa: E402
+from apps.communication.batcher import MessageBatcher  # noqa: E402
+from apps.communication.models import Message  # noqa: E402
+from benchmarks.run import percentile  # noqa: E402
+from benchmarks.seed import seed_accounts  # noqa: E402
+from pirogue_smart.asgi import application  # noqa: E402
+
+CHANNEL_PREFIX = 'bench-chat'
+
+
+def summary(values):
+    values = sorted(values)
+    return {
+        'count': len(values),
+        'p50_ms': round(percentile(values, 50), 2),
+        'p95_ms': round(percentile(values, 95), 2),
+        'p99_ms': round(percentile(values, 99), 2),
+        'max_ms': round(values[-1], 2) if values else 0.0,
+    }
+
+
+class Socket(ApplicationCommunicator):
+    """
+    Client websocket en mémoire sur l'application ASGI
+    (channels.testing.WebsocketCommunicator impose daphne, absent des dépendances)
+    """
+
+    def __init__(self, path, query_string):
+        super().__init__(application, {
+            'type': 'websocket',
+            'path': path,
+            'query_string': query_string.encode(),
+            'headers': [],
+            'subprotocols': [],
+        })
+
+    async def connect(self, timeout=30):
+        await self.send_input({'type': 'websocket.connect'})
+        response = await self.receive_output(timeout)
+        return response['type'] == 'websocket.accept', response.get('code')
+
+    async def send_json_to(self, data):
+        await self.send_input({'type': 'websocket.receive', 'text': json.dumps(data)})
+
+    async def receive_json_from(self, timeout=30):
+        response = await self.receive_output(timeout)
+        return json.loads(response['text'])
+
+    async def disconnect(self, code=1000, timeout=5):
+        await self.send_input({'type': 'websocket.disconnect', 'code': code})
+        await self.wait(timeout)
+
+
+class Client:
+    def __init__(self, token, channel_id):
+        self.channel_id = channel_id
+        self.communicator = Socket(f'/ws/chat/{channel_id}/', f'token={token}')
+        self.acks = {}            # client_id -> future
+        self.sent = set()
+        self.fanout = []          # latences de diffusion reçues (ms)
+        self.persisted = 0
+        self.errors = 0
+        self.history = asyncio.Queue()
+        self._reader = None
+
+    async def connect(self):
+        connected, _ = await self.communicator.connect(timeout=30)
+        if connected:
+            self._reader = asyncio.create_task(self._read())
+        return connected
+
+    async def _read(self):
+        while True:
+            event = await self.communicator.receive_json_from(timeout=3600)
+            kind = event['type']
+            if kind == 'ack':
+                self.acks.pop(event['client_id']).set_result(event['id'])
+            elif kind == 'message':
+                sent = (event.get('metadata') or {}).get('sent')
+                if sent and event['client_id'] not in self.sent:
+                    self.fanout.append((time.perf_counter() - sent) * 1000)
+            elif kind == 'persisted':
+                self.persisted += len(event['messages'])
+            elif kind == 'history':
+                await self.history.put(event)
+            elif kind == 'error':
+                self.errors += 1
+                future = self.acks.pop(event.get('client_id'), None)
+                if future is not None:
+                    future.set_exception(RuntimeError(event['error']))
+
+    async def send(self, text):
+        client_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self.acks[client_id] = future
+        self.sent.add(client_id)
+        await self.communicator.send_json_to({
+            'type': 'message',
+            'client_id': client_id,
+            'content': text,
+            'metadata': {'sent': time.perf_counter()},
+        })
+        return await future
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+        await self.communicator.disconnect()
+
+
+async def run(args, tokens):
+    run_id = uuid.uuid4().hex[:8]
+    channels = [f'{CHANNEL_PREFIX}-{run_id}-{n}' for n in range(args.channels)]
+    clients = [Client(tokens[k % len(tokens)], channels[k % len(channels)]) for k in range(args.sockets)]
+
+    # Connexions simultanées
+    connect_times = []
+
+    async def connect(client):
+        t0 = time.perf_counter()
+        ok = await client.connect()
+        connect_times.append((time.perf_counter() - t0) * 1000)
+        return ok
+
+    t0 = time.perf_counter()
+    connected = await asyncio.gather(*(connect(client) for client in clients))
+    connect_wall = time.perf_counter() - t0
+    if not all(connected):
+        print(f"❌ {connected.count(False)} connexions refusées")
+        return None
+
+    # Envoi : chaque socket enchaîne ses messages, en attendant chaque accusé
+    ack_times, ids, failures = [], [], 0
+
+    async def talk(client, k):
+        nonlocal failures
+        # Départs étalés pour ne pas envoyer tous les messages au même instant
+        await asyncio.sleep(args.interval * k / len(clients))
+        for m in range(args.messages):
+            t = time.perf_counter()
+            try:
+                ids.append(await client.send(f'Message {m} du socket {k}'))
+            except RuntimeError:
+                failures += 1
+                continue
+            ack_times.append((time.perf_counter() - t) * 1000)
+            await asyncio.sleep(max(0.0, args.interval - (time.perf_counter() - t)))
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(talk(client, k) for k, client in enumerate(clients)))
+    send_wall = time.perf_counter() - t0
+    # Laisser arriver les dernières diffusions
+    await asyncio.sleep(0.5)
+
+    # Reprise : un socket du premier canal redemande tout depuis l'id 0
+    await clients[0].communicator.send_json_to({'type': 'resume', 'last_id': 0})
+    history = await asyncio.wait_for(clients[0].history.get(), timeout=30)
+    expected_history = sum(1 for client in clients if client.channel_id == channels[0]) * args.messages
+
+    await asyncio.gather(*(client.close() for client in clients))
+
+    stored = await database_sync_to_async(
+        Message.objects.filter(channel_id__in=channels).count
+    )()
+    total = args.sockets * args.messages
+    fanout = [value for client in clients for value in client.fanout]
+    members = [sum(1 for client in clients if client.channel_id == channel) for channel in channels]
+    expected_fanout = sum(count * (count - 1) for count in members) * args.messages
+    return {
+        'sockets': args.sockets,
+        'channels': args.channels,
+        'messages': total,
+        'connect': {**summary(connect_times), 'wall_s': round(connect_wall, 2)},
+        'ack': summary(ack_times),
+        'fanout': {**summary(fanout), 'delivered_ratio': round(len(fanout) / expected_fanout, 4) if expected_fanout else 1.0},
+        'throughput_msg_s': round(len(ack_times) / send_wall, 1) if send_wall else 0.0,
+        'acked': len(ack_times),
+        'unique_ids': len(set(ids)),
+        'failures': failures,
+        'errors': sum(client.errors for client in clients),
+        'persisted_events': sum(client.persisted for client in clients),
+        'stored': stored,
+        'resume': {'returned': len(history['messages']), 'expected': min(expected_history, history_limit()),
+                   'has_more': history['has_more']},
+    }
+
+
+def history_limit():
+    from django.conf import settings
+    return getattr(settings, 'CHAT_RESUME_LIMIT', 500)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge du chat websocket PIROGUE-SMART")
+    parser.add_argument('--sockets', type=int, default=300, help="Nombre de connexions simultanées")
+    parser.add_argument('--channels', type=int, default=30, help="Nombre de canaux")
+    parser.add_argument('--messages', type=int, default=20, help="Messages envoyés par socket")
+    parser.add_argument('--interval', type=float, default=1.0, help="Secondes entre deux messages d'un socket")
+    parser.add_argument('--output', type=Path, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    admin, fishermen, _, tokens = seed_accounts()
+    tokens = [tokens[user.id] for user in [admin] + fishermen]
+
+    # Taille des lots écrits, mesurée autour de l'écriture réelle
+    batch_sizes = []
+    bulk_create = MessageBatcher._bulk_create
+
+    def recording_bulk_create(messages):
+        batch_sizes.append(len(messages))
+        return bulk_create(messages)
+
+    MessageBatcher._bulk_create = staticmethod(recording_bulk_create)
+
+    results = asyncio.run(run(args, tokens))
+    if results is None:
+        sys.exit(1)
+    results['batches'] = {
+        'count': len(batch_sizes),
+        'mean_size': round(sum(batch_sizes) / len(batch_sizes), 1) if batch_sizes else 0.0,
+        'max_size': max(batch_sizes, default=0),
+    }
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+    ok = (
+        results['acked'] == results['messages']
+        and results['unique_ids'] == results['messages']
+        and results['stored'] == results['messages']
+        and results['resume']['returned'] == results['resume']['expected']
+    )
+    print("✅ Tous les messages sont acquittés et enregistrés" if ok else "❌ Messages perdus ou non acquittés")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
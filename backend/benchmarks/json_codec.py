@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+Rendu et lecture JSON : JSONRenderer / JSONParser de DRF contre orjson
+
+Usage (depuis backend/, PostgreSQL local démarré) :
+
+    python -m benchmarks.json_codec --rows 1000
+
+Rendu de réponses réelles de l'API :
+- positions et alertes : une page de --rows lignes sortie du serializer ;
+- positions brutes : dicts values() (Decimal, datetime non convertis), cas
+  des vues fonctions qui renvoient des données construites à la main.
+Lecture de corps de requêtes : un payload Totarget de 500 dispositifs et
+la page de positions rendue. Temps médian et taille des octets sont
+affichés ; les sorties des deux chemins doivent être identiques, sinon le
+script renvoie le code 1.
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+from apps.alerts.models import Alert  # noqa: E402
+from apps.alerts.serializers import AlertSerializer  # noqa: E402
+from apps.tracking.models import Location  # noqa: E402
+from apps.tracking.serializers import LocationSerializer  # noqa: E402
+from benchmarks.seed import seed_accounts, seed_alerts  # noqa: E402
+from pirogue_smart.fast_json import ORJSONParser, ORJSONRenderer  # noqa: E402
+
+
+def timed(produce, repeat):
+    """(médiane en ms, dernier résultat)"""
+    durations = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = produce()
+        durations.append((time.perf_counter() - t0) * 1000)
+    return round(statistics.median(durations), 2), result
+
+
+def totarget_payload(devices):
+    """Corps d'un webhook Totarget (format de benchmarks.scenarios.totarget_webhook)"""
+    rng = random.Random(42)
+    return json.dumps({
+        f'BENCH{index:06d}': [{
+            'responseType': 'Location',
+            'gpsLocation': {
+                'lat': round(14.6 + rng.random(), 6),
+                'lon': round(-17.6 + rng.random(), 6),
+                'speed': round(rng.uniform(0, 12), 1),
+                'direction': rng.randint(0, 359),
+                'altitude': 0,
+            },
+            'extraInfoDescArr': ['Device Power: 76%', 'Signal strength - 4'],
+        }] for index in range(devices)
+    }).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rendu et lecture JSON de l'API, PIROGUE-SMART")
+    parser.add_argument('--rows', type=int, default=1000, help="Lignes par page")
+    parser.add_argument('--repeat', type=int, default=15, help="Mesures par variante")
+    parser.add_argument('--output', type=Path, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=True, serialize=False)
+    admin, fishermen, _, _ = seed_accounts()
+    seed_alerts(admin, fishermen)
+    context = {'request': Request(APIRequestFactory().get('/'))}
+
+    pages = {
+        'locations': LocationSerializer(Location.objects.select_related('user')[:args.rows],
+                                        many=True, context=context).data,
+        'alerts': AlertSerializer(Alert.objects.select_related('user')[:args.rows],
+                                  many=True, context=context).data,
+        'locations_values': list(Location.objects.values()[:args.rows]),
+    }
+
+    results, mismatches = {'render': {}, 'parse': {}}, []
+    for name, data in pages.items():
+        drf_ms, drf = timed(lambda: JSONRenderer().render(data), args.repeat)
+        fast_ms, fast = timed(lambda: ORJSONRenderer().render(data), args.repeat)
+        if drf != fast:
+            mismatches.append(f'rendu {name}')
+        results['render'][name] = {'rows': len(data), 'drf_ms': drf_ms, 'orjson_ms': fast_ms,
+                                   'drf_bytes': len(drf), 'orjson_bytes': len(fast)}
+        print(f"   rendu {name} ({len(data)} lignes): {drf_ms}ms -> {fast_ms}ms, "
+              f"{len(drf)} -> {len(fast)} octets")
+
+    bodies = {'totarget_webhook': totarget_payload(500), 'locations_page': JSONRenderer().render(pages['locations'])}
+    for name, body in bodies.items():
+        drf_ms, drf = timed(lambda: JSONParser().parse(io.BytesIO(body)), args.repeat)
+        fast_ms, fast = timed(lambda: ORJSONParser().parse(io.BytesIO(body)), args.repeat)
+        if drf != fast:
+            mismatches.append(f'lecture {name}')
+        results['parse'][name] = {'bytes': len(body), 'drf_ms': drf_ms, 'orjson_ms': fast_ms}
+        print(f"   lecture {name} ({len(body)} octets): {drf_ms}ms -> {fast_ms}ms")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+    if mismatches:
+        print(f"❌ Sortie différente de DRF: {', '.join(mismatches)}")
+        sys.exit(1)
+    print("✅ Rendu et lecture orjson identiques à DRF")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Construction d'une page de liste : serializer DRF, lecture rapide et ?fields=
+
+Usage (depuis backend/, PostgreSQL local démarré) :
+
+    python -m benchmarks.list_fields --rows 1000
+
+Pour chaque liste (positions, alertes, utilisateurs, dispositifs), une page
+de --rows lignes (au plus les lignes présentes) est construite trois fois :
+- serializer : instances de modèles (avec chargement anticipé) puis
+  serializer DRF, comme avant SparseFieldsMixin ;
+- rapide : tuples values_list() convertis en dicts (FastListPlan), tous
+  les champs ;
+- champs : lecture rapide limitée aux champs d'une carte mobile (?fields=).
+Temps médian (requête SQL comprise) et taille JSON de la page sont
+affichés ; les sorties « serializer » et « rapide » doivent être
+identiques, sinon le script renvoie le code 1.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+from apps.alerts.models import Alert  # noqa: E402
+from apps.alerts.serializers import AlertSerializer  # noqa: E402
+from apps.tracking.models import Location, TrackerDevice  # noqa: E402
+from apps.tracking.serializers import LocationSerializer, TrackerDeviceSerializer  # noqa: E402
+from apps.users.models import User  # noqa: E402
+from apps.users.serializers import UserSerializer  # noqa: E402
+from benchmarks.seed import seed_accounts, seed_alerts  # noqa: E402
+from pirogue_smart.eager_loading import eager_load  # noqa: E402
+from pirogue_smart.sparse_fields import fast_list_plan, restrict_fields  # noqa: E402
+
+# liste -> (serializer, queryset, champs d'une carte mobile)
+LISTS = {
+    'locations': (LocationSerializer, Location.objects.all(), ['id', 'user', 'latitude', 'longitude', 'timestamp']),
+    'alerts': (AlertSerializer, Alert.objects.all(), ['id', 'user_name', 'severity', 'status', 'created_at']),
+    'users': (UserSerializer, User.objects.order_by('id'), ['id', 'username', 'last_location_update']),
+    'devices': (TrackerDeviceSerializer, TrackerDevice.objects.order_by('id'), ['id', 'device_id', 'battery_level']),
+}
+
+
+def timed(produce, repeat):
+    """(médiane en ms, dernier résultat)"""
+    durations = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = produce()
+        durations.append((time.perf_counter() - t0) * 1000)
+    return round(statistics.median(durations), 2), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construction des pages de liste, PIROGUE-SMART")
+    parser.add_argument('--rows', type=int, default=1000, help="Lignes par page")
+    parser.add_argument('--repeat', type=int, default=7, help="Mesures par variante")
+    parser.add_argument('--output', type=Path, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=True, serialize=False)
+    admin, fishermen, _, _ = seed_accounts()
+    seed_alerts(admin, fishermen)
+    context = {'request': Request(APIRequestFactory().get('/'))}
+
+    results, mismatches = {}, []
+    for name, (serializer_class, queryset, fields) in LISTS.items():
+        page = queryset[:args.rows]
+
+        def serializer_page():
+            return serializer_class(list(eager_load(serializer_class, page)), many=True, context=context).data
+
+        def fast_page(names=None):
+            serializer = serializer_class(context=context)
+            if names:
+                restrict_fields(serializer, names)
+            plan = fast_list_plan(serializer)
+            return [plan.build(row) for row in page.values_list(*plan.paths)]
+
+        slow_ms, slow = timed(serializer_page, args.repeat)
+        fast_ms, fast = timed(fast_page, args.repeat)
+        sparse_ms, sparse = timed(lambda: fast_page(fields), args.repeat)
+        if JSONRenderer().render(slow) != JSONRenderer().render(fast):
+            mismatches.append(name)
+
+        results[name] = {
+            'rows': len(fast),
+            'serializer_ms': slow_ms,
+            'fast_ms': fast_ms,
+            'fields_ms': sparse_ms,
+            'serializer_bytes': len(JSONRenderer().render(slow)),
+            'fields_bytes': len(JSONRenderer().render(sparse)),
+        }
+        entry = results[name]
+        print(f"   {name} ({entry['rows']} lignes): serializer {slow_ms}ms | rapide {fast_ms}ms | "
+              f"?fields= {sparse_ms}ms, {entry['serializer_bytes']} -> {entry['fields_bytes']} octets")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+    if mismatches:
+        print(f"❌ Sortie différente du serializer: {', '.join(mismatches)}")
+        sys.exit(1)
+    print("✅ Lecture rapide identique au serializer")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Coût CPU d'une connexion par email : ancien chemin contre EmailBackend
+
+Usage (depuis backend/, PostgreSQL local démarré) :
+
+    python -m benchmarks.login_cpu --iterations 20
+
+Un compte de benchmark dont le nom d'utilisateur diffère de l'email (cas
+des comptes créés par l'administration) se connecte avec un mot de passe
+correct, un mot de passe faux, puis avec un email inconnu :
+- ancien chemin : authenticate(username=email), puis en cas d'échec
+  recherche par email (sans index) et second authenticate ;
+- nouveau chemin : LoginSerializer, une requête sur l'index LOWER(email)
+  et un seul hash.
+Le temps CPU du processus (hash PBKDF2 compris) et le nombre de requêtes
+SQL sont affichés par connexion.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import authenticate  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from rest_framework import serializers  # noqa: E402
+from apps.users.models import User  # noqa: E402
+from apps.users.serializers import LoginSerializer  # noqa: E402
+from benchmarks.seed import BENCH_PREFIX  # noqa: E402
+
+EMAIL = 'Bench-Login@Pirogue-Smart.com'
+PASSWORD = 'mot-de-passe-bench'
+
+CASES = {
+    'correct': (EMAIL, PASSWORD),
+    'wrong_password': (EMAIL, 'faux'),
+    'unknown_email': ('inconnu@pirogue-smart.com', PASSWORD),
+}
+
+
+def legacy_login(email, password):
+    """Chemin de connexion avant EmailBackend (deux authenticate pour un compte dont username != email)"""
+    user = authenticate(username=email, password=password)
+    if not user:
+        try:
+            user_obj = User.objects.get(email=email)
+            user = authenticate(username=user_obj.username, password=password)
+        except User.DoesNotExist:
+            user = None
+    return user
+
+
+def email_login(email, password):
+    serializer = LoginSerializer(data={'email': email, 'password': password})
+    try:
+        serializer.is_valid(raise_exception=True)
+    except serializers.ValidationError:
+        return None
+    return serializer.validated_data['user']
+
+
+def measure(login, email, password, iterations):
+    """(temps CPU moyen en ms, requêtes SQL) par connexion"""
+    cpu = []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            t0 = time.process_time()
+            login(email, password)
+            cpu.append((time.process_time() - t0) * 1000)
+    return round(sum(cpu) / len(cpu), 2), len(captured.captured_queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU par connexion par email, PIROGUE-SMART")
+    parser.add_argument('--iterations', type=int, default=20, help="Connexions mesurées par cas")
+    parser.add_argument('--output', type=Path, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=True, serialize=False)
+    user, _ = User.objects.get_or_create(username=f'{BENCH_PREFIX}login', defaults={'email': EMAIL})
+    user.set_password(PASSWORD)
+    user.save()
+
+    results = {}
+    for case, (email, password) in CASES.items():
+        legacy_ms, legacy_queries = measure(legacy_login, email, password, args.iterations)
+        email_ms, email_queries = measure(email_login, email, password, args.iterations)
+        results[case] = {
+            'legacy': {'cpu_ms': legacy_ms, 'queries': legacy_queries},
+            'email_backend': {'cpu_ms': email_ms, 'queries': email_queries},
+        }
+        print(f"   {case}: {legacy_ms}ms CPU, {legacy_queries} requêtes -> "
+              f"{email_ms}ms CPU, {email_queries} requêtes ({email_ms / legacy_ms:.0%})")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+    correct = results['correct']
+    print(f"✅ CPU d'une connexion réussie : {correct['legacy']['cpu_ms']}ms -> {correct['email_backend']['cpu_ms']}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Vérification du nombre de requêtes SQL des listes paginées
+
+Usage (depuis backend/, PostgreSQL local démarré) :
+
+    python -m benchmarks.query_counts --page-sizes 10 100 500
+
+Chaque endpoint de liste est appelé avec chaque taille de page
+(`?page_size=`) sur la base de benchmark. Le nombre de requêtes SQL doit
+être identique quelle que soit la taille : une requête de plus par ligne
+(relation lue par le serializer sans chargement anticipé) fait échouer le
+script (code 1). La latence moyenne est affichée pour chaque taille.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from benchmarks.scenarios import BenchmarkContext  # noqa: E402
+from benchmarks.seed import bench_channel, seed_accounts, seed_alerts, seed_messages, seed_zones  # noqa: E402
+from pirogue_smart.http_cache import bump_version  # noqa: E402
+
+
+def endpoints(ctx):
+    """{nom: (client, url, paramètres, ressource du cache HTTP à invalider)}"""
+    admin = ctx.client_for(ctx.admin)
+    fisherman = ctx.client_for(ctx.fishermen[0])
+    return {
+        'messages': (fisherman, '/api/communication/messages/', {'channel': bench_channel(0)}, None),
+        'zones': (admin, '/api/zones/', {}, 'zones'),
+        'alerts': (admin, '/api/alerts/', {}, None),
+    }
+
+
+def measure(client, url, params, resource, page_size, repeat):
+    """(requêtes SQL, lignes renvoyées, latence moyenne en ms) pour une taille de page"""
+    params = {**params, 'page_size': page_size}
+    latencies, queries, rows = [], None, 0
+    for _ in range(repeat):
+        if resource:
+            # Réponse en cache : on mesure la production de la page, pas le cache
+            bump_version(resource)
+        with CaptureQueriesContext(connection) as captured:
+            t0 = time.perf_counter()
+            response = client.get(url, params)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} a répondu {response.status_code}")
+        queries = len(captured.captured_queries)
+        rows = len(response.data['results'])
+    return queries, rows, round(sum(latencies) / len(latencies), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requêtes SQL par page des listes PIROGUE-SMART")
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[10, 100, 500], help="Tailles de page")
+    parser.add_argument('--repeat', type=int, default=5, help="Appels par taille de page")
+    parser.add_argument('--output', type=Path, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=True, serialize=False)
+    admin, fishermen, devices, tokens = seed_accounts()
+    seed_messages(fishermen)
+    seed_zones(fishermen)
+    seed_alerts(admin, fishermen)
+    ctx = BenchmarkContext(admin, fishermen, devices, tokens)
+
+    results, failures = {}, []
+    for name, (client, url, params, resource) in endpoints(ctx).items():
+        results[name] = {}
+        for page_size in args.page_sizes:
+            queries, rows, latency = measure(client, url, params, resource, page_size, args.repeat)
+            results[name][page_size] = {'queries': queries, 'rows': rows, 'mean_ms': latency}
+            print(f"   {name} page_size={page_size}: {rows} lignes | {queries} requêtes SQL | {latency}ms")
+        counts = {entry['queries'] for entry in results[name].values()}
+        if len(counts) > 1:
+            failures.append(f"{name}: {sorted(counts)} requêtes selon la taille de page")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+    if failures:
+        print(f"❌ Nombre de requêtes variable ({len(failures)} endpoint(s)):")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+    print("✅ Nombre de requêtes constant quelle que soit la taille de page")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+"""
+Suite de benchmarks de l'ingestion PIROGUE-SMART
+
+Usage (depuis backend/, PostgreSQL local démarré) :
+
+    python -m benchmarks.run --rows 1000000
+    python -m benchmarks.run --rows 10000000 --scenarios location_list_admin location_list_fisherman
+    python -m benchmarks.run --rows 1000000 --update-baseline
+
+Les résultats (débit, percentiles de latence, nombre de requêtes SQL) sont
+écrits dans un fichier JSON puis comparés à la référence stockée dans
+benchmarks/baselines/. Le code de sortie vaut 1 si une régression dépasse
+le seuil.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, reset_queries  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from benchmarks.scenarios import SCENARIOS, BenchmarkContext  # noqa: E402
+from benchmarks.seed import seed_accounts, seed_locations, seed_messages, seed_weather  # noqa: E402
+
+DEFAULT_THRESHOLD = 0.15
+
+
+def rows_label(rows: int) -> str:
+    if rows >= 1_000_000 and rows % 1_000_000 == 0:
+        return f"{rows // 1_000_000}m"
+    if rows >= 1_000 and rows % 1_000 == 0:
+        return f"{rows // 1_000}k"
+    return str(rows)
+
+
+def percentile(sorted_values, pct):
+    """Percentile au rang le plus proche sur une liste triée"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def run_scenario(name, ctx, warmup, iterations):
+    """Exécuter un scénario et calculer ses statistiques"""
+    request = SCENARIOS[name](ctx)
+    errors = 0
+
+    # Échauffement : on en profite pour compter les requêtes SQL, hors mesure de latence
+    query_counts = []
+    for i in range(warmup):
+        with CaptureQueriesContext(connection) as queries:
+            response = request(i)
+        query_counts.append(len(queries.captured_queries))
+        if response.status_code >= 400:
+            errors += 1
+    reset_queries()
+
+    latencies = []
+    started = time.perf_counter()
+    for i in range(warmup, warmup + iterations):
+        t0 = time.perf_counter()
+        response = request(i)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': iterations,
+        'errors': errors,
+        'duration_s': round(elapsed, 3),
+        'throughput_rps': round(iterations / elapsed, 2) if elapsed else 0.0,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 3),
+            'p50': round(percentile(latencies, 50), 3),
+            'p90': round(percentile(latencies, 90), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'max': round(latencies[-1], 3),
+        },
+        'queries_per_request': {
+            'mean': round(sum(query_counts) / len(query_counts), 2) if query_counts else 0,
+            'max': max(query_counts) if query_counts else 0,
+        },
+    }
+
+
+def compare(results, baseline, threshold):
+    """Comparer les résultats à la référence, renvoyer la liste des régressions"""
+    regressions = []
+    if baseline.get('meta', {}).get('rows') != results['meta']['rows']:
+        print(f"⚠️ Référence générée avec {baseline.get('meta', {}).get('rows')} positions, "
+              f"exécution actuelle avec {results['meta']['rows']}")
+
+    for name, current in results['scenarios'].items():
+        reference = baseline.get('scenarios', {}).get(name)
+        if not reference:
+            print(f"ℹ️ {name}: pas de référence")
+            continue
+
+        ref_p95 = reference['latency_ms']['p95']
+        cur_p95 = current['latency_ms']['p95']
+        if ref_p95 and cur_p95 > ref_p95 * (1 + threshold):
+            regressions.append(f"{name}: p95 {cur_p95:.2f}ms > {ref_p95:.2f}ms (+{(cur_p95 / ref_p95 - 1):.0%})")
+
+        ref_rps = reference['throughput_rps']
+        cur_rps = current['throughput_rps']
+        if ref_rps and cur_rps < ref_rps * (1 - threshold):
+            regressions.append(f"{name}: débit {cur_rps:.1f} req/s < {ref_rps:.1f} req/s ({(cur_rps / ref_rps - 1):.0%})")
+
+        # Le nombre de requêtes SQL est déterministe : toute hausse est une régression
+        ref_queries = reference['queries_per_request']['max']
+        cur_queries = current['queries_per_request']['max']
+        if cur_queries > ref_queries:
+            regressions.append(f"{name}: {cur_queries} requêtes SQL > {ref_queries}")
+
+        if current['errors'] > reference.get('errors', 0):
+            regressions.append(f"{name}: {current['errors']} erreurs HTTP")
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks ingestion PIROGUE-SMART')
+    parser.add_argument('--rows', type=int, default=1_000_000,
+                        help='Nombre de positions en base (1000000, 10000000...)')
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS),
+                        help='Scénarios à exécuter')
+    parser.add_argument('--iterations', type=int, default=500, help='Requêtes mesurées par scénario')
+    parser.add_argument('--warmup', type=int, default=50, help='Requêtes d\'échauffement par scénario')
+    parser.add_argument('--output', type=Path, default=None, help='Fichier JSON de résultats')
+    parser.add_argument('--baseline', type=Path, default=None, help='Fichier JSON de référence')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Tolérance de régression (0.15 = 15%%)')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Remplacer la référence par les résultats de cette exécution')
+    args = parser.parse_args(argv)
+
+    label = rows_label(args.rows)
+    output = args.output or BENCH_DIR / 'results' / f'results-{label}.json'
+    baseline_path = args.baseline or BENCH_DIR / 'baselines' / f'baseline-{label}.json'
+
+    # Base dédiée conservée entre deux exécutions pour ne pas régénérer 10M de lignes
+    setup_test_environment(debug=False)
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=True, serialize=False)
+
+    print(f"🚀 Benchmarks PIROGUE-SMART ({args.rows} positions)")
+    admin, fishermen, devices, tokens = seed_accounts()
+    seed_locations(args.rows, fishermen)
+    seed_weather()
+    seed_messages(fishermen)
+    ctx = BenchmarkContext(admin, fishermen, devices, tokens)
+
+    results = {
+        'meta': {
+            'rows': args.rows,
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'date': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'host': platform.node(),
+        },
+        'scenarios': {},
+    }
+
+    for name in args.scenarios:
+        print(f"⏱️ {name}...")
+        stats = run_scenario(name, ctx, args.warmup, args.iterations)
+        results['scenarios'][name] = stats
+        print(f"   {stats['throughput_rps']} req/s | p50 {stats['latency_ms']['p50']}ms | "
+              f"p95 {stats['latency_ms']['p95']}ms | p99 {stats['latency_ms']['p99']}ms | "
+              f"{stats['queries_per_request']['max']} requêtes SQL | {stats['errors']} erreurs")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+    print(f"📝 Résultats écrits dans {output}")
+
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+        print(f"📌 Référence mise à jour: {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"ℹ️ Aucune référence ({baseline_path}), relancer avec --update-baseline pour en créer une")
+        return 0
+
+    regressions = compare(results, json.loads(baseline_path.read_text()), args.threshold)
+    if regressions:
+        print(f"❌ {len(regressions)} régression(s) au-delà de {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"   - {regression}")
+        return 1
+
+    print(f"✅ Aucune régression au-delà de {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
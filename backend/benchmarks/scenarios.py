@@ -0,0 +1,237 @@
+"""
+Scénarios de benchmark de l'ingestion et des lectures PIROGUE-SMART
+
+Chaque scénario reçoit le contexte de benchmark et renvoie une fonction
+`request(i)` qui exécute une requête HTTP complète (middlewares compris)
+via le client de test DRF.
+"""
+
+import json
+import random
+from rest_framework.test import APIClient
+
+
+class BenchmarkContext:
+    """Données partagées par les scénarios"""
+
+    def __init__(self, admin, fishermen, devices, tokens):
+        self.admin = admin
+        self.fishermen = fishermen
+        self.devices = devices
+        self.tokens = tokens
+        self.rng = random.Random(42)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.tokens[user.id]}')
+        return client
+
+    def random_fix(self):
+        return {
+            'lat': round(14.5 + self.rng.random(), 6),
+            'lon': round(-17.6 + self.rng.random(), 6),
+            'speed': round(self.rng.random() * 20, 2),
+            'heading': self.rng.randint(0, 359),
+        }
+
+
+def tracker_webhook(ctx):
+    """Une position unique envoyée par un traqueur"""
+    client = APIClient()
+
+    def request(i):
+        device = ctx.devices[i % len(ctx.devices)]
+        fix = ctx.random_fix()
+        return client.post('/api/tracking/webhook/tracker/', {
+            'device_id': device.device_id,
+            'latitude': fix['lat'],
+            'longitude': fix['lon'],
+            'speed': fix['speed'],
+            'heading': fix['heading'],
+            'battery_level': 80,
+            'signal_strength': 4,
+        }, format='json')
+
+    return request
+
+
+def totarget_webhook(ctx, devices_per_payload=25):
+    """Un payload Totarget regroupant plusieurs dispositifs"""
+    client = APIClient()
+
+    def request(i):
+        start = (i * devices_per_payload) % len(ctx.devices)
+        payload = {}
+        for offset in range(devices_per_payload):
+            device = ctx.devices[(start + offset) % len(ctx.devices)]
+            fix = ctx.random_fix()
+            payload[device.device_id] = [{
+                'responseType': 'Location',
+                'gpsLocation': {
+                    'lat': fix['lat'],
+                    'lon': fix['lon'],
+                    'speed': fix['speed'],
+                    'direction': fix['heading'],
+                    'altitude': 0,
+                },
+                'extraInfoDescArr': ['Device Power: 76%', 'Signal strength - 4'],
+            }]
+        return client.post(
+            '/api/tracking/webhook/totarget/',
+            data=json.dumps(payload),
+            content_type='application/json',
+            HTTP_DATA_SOURCE_ID='TGP',
+            HTTP_DATA_TYPE='HDR',
+        )
+
+    return request
+
+
+def location_list_admin(ctx):
+    """Première page de LocationListCreateView pour un administrateur (toutes les positions)"""
+    client = ctx.client_for(ctx.admin)
+
+    def request(i):
+        return client.get('/api/tracking/locations/')
+
+    return request
+
+
+def location_list_fisherman(ctx):
+    """Première page de LocationListCreateView pour un pêcheur (ses positions uniquement)"""
+    clients = [ctx.client_for(user) for user in ctx.fishermen]
+
+    def request(i):
+        return clients[i % len(clients)].get('/api/tracking/locations/')
+
+    return request
+
+
+def device_status(ctx):
+    """get_device_status avec la dernière position du dispositif"""
+    client = ctx.client_for(ctx.admin)
+
+    def request(i):
+        device = ctx.devices[i % len(ctx.devices)]
+        return client.get(f'/api/tracking/totarget/device/{device.device_id}/status/')
+
+    return request
+
+
+def alert_create(ctx):
+    """Création d'une alerte avec position par un pêcheur"""
+    clients = [ctx.client_for(user) for user in ctx.fishermen]
+
+    def request(i):
+        user = ctx.fishermen[i % len(clients)]
+        fix = ctx.random_fix()
+        return clients[i % len(clients)].post('/api/alerts/', {
+            'user': user.id,
+            'alert_type': 'system',
+            'title': 'Benchmark',
+            'message': f'Alerte de benchmark n°{i}',
+            'severity': 'low',
+            'location': {
+                'latitude': fix['lat'],
+                'longitude': fix['lon'],
+                'speed': fix['speed'],
+                'heading': fix['heading'],
+            },
+        }, format='json')
+
+    return request
+
+
+def emergency_alert(ctx):
+    """SOS via le circuit d'urgence (persistance, navires proches, diffusion)"""
+    clients = [ctx.client_for(user) for user in ctx.fishermen]
+
+    def request(i):
+        fix = ctx.random_fix()
+        return clients[i % len(clients)].post('/api/alerts/emergency/', {
+            'latitude': fix['lat'],
+            'longitude': fix['lon'],
+        }, format='json')
+
+    return request
+
+
+def weather_route(ctx):
+    """Vent et houle le long d'un itinéraire de 4 tronçons (~275 km)"""
+    clients = [ctx.client_for(user) for user in ctx.fishermen]
+    route = [[14.7, -17.5], [14.2, -17.8], [13.5, -17.3], [12.5, -17.0], [12.4, -16.9]]
+
+    def request(i):
+        return clients[i % len(clients)].post('/api/weather/route/', {
+            'points': route,
+            'speed_kmh': 10 + i % 10,
+        }, format='json')
+
+    return request
+
+
+def message_list_channel(ctx):
+    """Actualisation d'un canal par la liste paginée : dernière page (COUNT + OFFSET jusqu'à la fin)"""
+    from benchmarks.seed import MESSAGE_CHANNELS, bench_channel
+
+    clients = [ctx.client_for(user) for user in ctx.fishermen]
+
+    def request(i):
+        return clients[i % len(clients)].get(
+            '/api/communication/messages/', {'channel': bench_channel(i % MESSAGE_CHANNELS), 'page': 'last'})
+
+    return request
+
+
+def message_sync(ctx, new_messages=5):
+    """Actualisation d'un canal par curseur : seuls les `new_messages` derniers messages sont renvoyés"""
+    from apps.communication.models import Message
+    from benchmarks.seed import MESSAGE_CHANNELS, bench_channel
+
+    clients = [ctx.client_for(user) for user in ctx.fishermen]
+    cursors = {
+        channel: Message.objects.filter(channel_id=channel)
+        .order_by('-created_at', '-id').values_list('id', flat=True)[new_messages]
+        for channel in (bench_channel(n) for n in range(MESSAGE_CHANNELS))
+    }
+
+    def request(i):
+        channel = bench_channel(i % MESSAGE_CHANNELS)
+        return clients[i % len(clients)].get(
+            '/api/communication/messages/sync/', {'channel': channel, 'after_id': cursors[channel]})
+
+    return request
+
+
+def message_search(ctx):
+    """Recherche plein texte : terme rare sur tous les canaux, terme courant dans un canal sur une journée"""
+    from datetime import timedelta
+    from django.utils import timezone
+    from benchmarks.seed import MESSAGE_CHANNELS, SEARCH_RARE_TERM, bench_channel
+
+    clients = [ctx.client_for(user) for user in ctx.fishermen]
+    since = (timezone.now() - timedelta(days=1)).isoformat()
+
+    def request(i):
+        if i % 2:
+            params = {'q': f'"{SEARCH_RARE_TERM}"'}
+        else:
+            params = {'q': 'moteur', 'channel': bench_channel(i % MESSAGE_CHANNELS), 'since': since}
+        return clients[i % len(clients)].get('/api/communication/messages/search/', params)
+
+    return request
+
+
+SCENARIOS = {
+    'tracker_webhook': tracker_webhook,
+    'totarget_webhook': totarget_webhook,
+    'location_list_admin': location_list_admin,
+    'location_list_fisherman': location_list_fisherman,
+    'device_status': device_status,
+    'alert_create': alert_create,
+    'emergency_alert': emergency_alert,
+    'weather_route': weather_route,
+    'message_list_channel': message_list_channel,
+    'message_sync': message_sync,
+    'message_search': message_search,
+}
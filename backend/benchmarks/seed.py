@@ -0,0 +1,233 @@
+"""
+Génération des données de benchmark (utilisateurs, dispositifs, positions, prévisions, messages)
+"""
+
+import time
+import numpy as np
+from datetime import timedelta
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from apps.alerts import counters
+from apps.alerts.models import Alert
+from apps.communication.models import Message
+from apps.users.models import User, UserProfile
+from apps.tracking.models import Location, TrackerDevice
+from apps.weather.ingest import load, prepare
+from apps.weather.models import WeatherData
+from apps.zones.models import Zone
+
+BENCH_PREFIX = 'bench_'
+FISHERMEN_COUNT = 50
+SEED_CHUNK = 1_000_000
+MESSAGE_CHANNELS = 20
+MESSAGES_PER_CHANNEL = 10_000
+# Contenus des messages : sujets courants, et un nom de pirogue rare (1 message sur SEARCH_RARE_EVERY)
+MESSAGE_TOPICS = [
+    'Départ au port ce matin',
+    'Panne moteur au large, besoin d\'aide',
+    'Filets relevés, bonne prise de thiof',
+    'Houle forte, prudence près de la barre',
+    'Retour prévu avant la nuit',
+    'Besoin de carburant au quai',
+]
+SEARCH_RARE_TERM = 'Ndeye Fatou'
+SEARCH_RARE_EVERY = 997
+ZONES_COUNT = 500
+ALERTS_COUNT = 500
+
+
+def _device_id(index: int) -> str:
+    """ID Totarget valide (12 chiffres) pour le pêcheur n°index"""
+    return f"9{index:011d}"
+
+
+def seed_accounts():
+    """Créer (une seule fois) l'administrateur, les pêcheurs et leurs dispositifs"""
+    admin, _ = User.objects.get_or_create(
+        username=f'{BENCH_PREFIX}admin',
+        defaults={'email': 'bench-admin@pirogue-smart.com', 'role': 'admin'}
+    )
+    UserProfile.objects.get_or_create(user=admin, defaults={'full_name': 'Bench Admin'})
+
+    fishermen = []
+    for i in range(FISHERMEN_COUNT):
+        user, created = User.objects.get_or_create(
+            username=f'{BENCH_PREFIX}fisherman_{i}',
+            defaults={'email': f'bench-fisherman-{i}@pirogue-smart.com', 'role': 'fisherman'}
+        )
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=['password'])
+            UserProfile.objects.create(user=user, full_name=f'Pêcheur Bench {i}', boat_name=f'Pirogue {i}')
+        TrackerDevice.objects.get_or_create(
+            device_id=_device_id(i),
+            defaults={'device_type': 'gps_tracker', 'user': user, 'is_active': True}
+        )
+        fishermen.append(user)
+
+    tokens = {
+        user.id: Token.objects.get_or_create(user=user)[0].key
+        for user in [admin] + fishermen
+    }
+    devices = list(TrackerDevice.objects.filter(device_id__in=[_device_id(i) for i in range(FISHERMEN_COUNT)]))
+    return admin, fishermen, devices, tokens
+
+
+def seed_locations(target_rows: int, users, stdout=print):
+    """Compléter tracking_location jusqu'à target_rows lignes avec generate_series"""
+    current = Location.objects.count()
+    if current >= target_rows:
+        stdout(f"📦 {current} positions déjà présentes (cible {target_rows})")
+        return current
+
+    user_ids = [user.id for user in users]
+    remaining = target_rows - current
+    started = time.perf_counter()
+
+    while remaining > 0:
+        chunk = min(SEED_CHUNK, remaining)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO tracking_location
+                    (user_id, latitude, longitude, speed, heading, altitude, accuracy, timestamp, created_at)
+                SELECT
+                    (%s::bigint[])[1 + (g %% %s)],
+                    14.5 + random(),
+                    -17.6 + random(),
+                    round((random() * 20)::numeric, 2),
+                    (random() * 359)::int,
+                    0,
+                    10,
+                    now() - make_interval(secs => g),
+                    now()
+                FROM generate_series(%s, %s) AS g
+                """,
+                [user_ids, len(user_ids), current + 1, current + chunk]
+            )
+        current += chunk
+        remaining -= chunk
+        stdout(f"📦 {current}/{target_rows} positions générées")
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE tracking_location')
+
+    stdout(f"✅ Génération terminée en {time.perf_counter() - started:.1f}s")
+    return current
+
+
+def seed_weather(stdout=print):
+    """Prévisions horaires sur 72 h pour la côte sénégalaise (grille de 10° x 10°)"""
+    now = timezone.now().replace(minute=0, second=0, microsecond=0)
+    if WeatherData.objects.filter(forecast_time__gte=now + timedelta(hours=48)).exists():
+        stdout("📦 Prévisions météo déjà présentes")
+        return
+
+    rng = np.random.default_rng(42)
+    lat = np.arange(10, 20.01, 0.25)
+    lon = np.arange(-22, -12.01, 0.25)
+    epochs = np.array([(now + timedelta(hours=h)).timestamp() for h in range(-3, 73)], dtype=np.int64)
+    t_grid, lat_grid, lon_grid = np.meshgrid(epochs, lat, lon, indexing='ij')
+    shape = t_grid.shape
+    load(prepare({
+        'latitude': lat_grid.ravel(),
+        'longitude': lon_grid.ravel(),
+        'forecast_time': t_grid.ravel(),
+        'temperature': rng.uniform(22, 30, shape).ravel(),
+        'wind_speed': rng.uniform(0, 60, shape).ravel(),
+        'wind_direction': rng.uniform(0, 360, shape).ravel(),
+        'wave_height': rng.uniform(0, 4, shape).ravel(),
+    }))
+    stdout(f"✅ {t_grid.size} prévisions météo générées")
+
+
+def seed_zones(users, stdout=print):
+    """ZONES_COUNT zones actives créées par les pêcheurs (un créateur différent par zone)"""
+    if Zone.objects.filter(name__startswith=BENCH_PREFIX).count() >= ZONES_COUNT:
+        stdout("📦 Zones déjà présentes")
+        return
+
+    Zone.objects.filter(name__startswith=BENCH_PREFIX).delete()
+    Zone.objects.bulk_create([
+        Zone(
+            name=f'{BENCH_PREFIX}zone_{i}',
+            zone_type=Zone.ZONE_TYPES[i % len(Zone.ZONE_TYPES)][0],
+            coordinates={'type': 'Polygon', 'coordinates': [[
+                [-17.5 + i * 0.001, 14.6], [-17.4 + i * 0.001, 14.6], [-17.4 + i * 0.001, 14.7],
+                [-17.5 + i * 0.001, 14.6],
+            ]]},
+            created_by=users[i % len(users)],
+        )
+        for i in range(ZONES_COUNT)
+    ])
+    stdout(f"✅ {ZONES_COUNT} zones générées")
+
+
+def seed_alerts(admin, users, stdout=print):
+    """Au moins ALERTS_COUNT alertes avec position, un tiers acquittées par l'administrateur"""
+    missing = ALERTS_COUNT - Alert.objects.count()
+    if missing <= 0:
+        stdout("📦 Alertes déjà présentes")
+        return
+
+    now = timezone.now()
+    locations = {user.id: Location.objects.filter(user=user).order_by('-timestamp').first() for user in users}
+    alerts = Alert.objects.bulk_create([
+        Alert(
+            user=users[i % len(users)],
+            alert_type='system',
+            title=f'Alerte de benchmark n°{i}',
+            message=f'Alerte de benchmark n°{i}',
+            severity='low',
+            status='acknowledged' if i % 3 == 0 else 'active',
+            location=locations[users[i % len(users)].id],
+            acknowledged_by=admin if i % 3 == 0 else None,
+            acknowledged_at=now if i % 3 == 0 else None,
+            last_seen=now,
+        )
+        for i in range(missing)
+    ])
+    counters.record_created_bulk(alerts)
+    stdout(f"✅ {missing} alertes générées")
+
+
+def bench_channel(index: int) -> str:
+    return f'bench-channel-{index}'
+
+
+def seed_messages(users, stdout=print):
+    """Historique de chat : MESSAGES_PER_CHANNEL messages sur MESSAGE_CHANNELS canaux"""
+    channels = [bench_channel(i) for i in range(MESSAGE_CHANNELS)]
+    existing = Message.objects.filter(channel_id=channels[-1])
+    if existing.count() >= MESSAGES_PER_CHANNEL and existing.filter(content__contains=SEARCH_RARE_TERM).exists():
+        stdout("📦 Messages de chat déjà présents")
+        return
+
+    started = time.perf_counter()
+    user_ids = [user.id for user in users]
+    table = Message._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE channel_id = ANY(%s)", [channels])
+        # Un message toutes les 30 s par canal, jusqu'à maintenant
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (sender_id, receiver_id, channel_id, content, message_type, image,
+                                 created_at, is_read, metadata)
+            SELECT (%s::bigint[])[1 + (n %% array_length(%s::bigint[], 1))],
+                   (%s::bigint[])[1 + (n %% array_length(%s::bigint[], 1))],
+                   'bench-channel-' || c,
+                   (%s::text[])[1 + ((n * 7 + c) %% array_length(%s::text[], 1))] || ' (n°' || n || ')'
+                   || CASE WHEN (n + c) %% %s = 0 THEN ' — pirogue ' || %s ELSE '' END,
+                   'text', '',
+                   now() - ((%s - n) * interval '30 seconds'), false, NULL
+            FROM generate_series(0, %s - 1) AS c, generate_series(1, %s) AS n
+            ORDER BY n, c
+            """,
+            [user_ids, user_ids, user_ids, user_ids, MESSAGE_TOPICS, MESSAGE_TOPICS,
+             SEARCH_RARE_EVERY, SEARCH_RARE_TERM, MESSAGES_PER_CHANNEL,
+             MESSAGE_CHANNELS, MESSAGES_PER_CHANNEL]
+        )
+        cursor.execute(f'ANALYZE {table}')
+    stdout(f"✅ {MESSAGE_CHANNELS * MESSAGES_PER_CHANNEL} messages de chat générés "
+           f"en {time.perf_counter() - started:.1f}s")
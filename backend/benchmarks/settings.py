@@ -0,0 +1,17 @@
+"""
+Settings pour la suite de benchmarks PIROGUE-SMART.
+"""
+
+from pirogue_smart.settings import *  # noqa: F401,F403
+from decouple import config
+
+DEBUG = False
+
+# Base dédiée : la suite écrit des millions de lignes, on ne touche jamais à la base de dev
+DATABASES['default']['NAME'] = config('BENCH_DB_NAME', default='pirogue_smart_bench')  # noqa: F405
+DATABASES['default']['TEST'] = {'NAME': config('BENCH_DB_NAME', default='pirogue_smart_bench')}  # noqa: F405
+DATABASES['emergency']['NAME'] = DATABASES['default']['NAME']  # noqa: F405
+
+# Les logs INFO des webhooks faussent les mesures et noient la console
+LOGGING['handlers']['console']['level'] = 'WARNING'  # noqa: F405
+LOGGING['handlers']['file']['level'] = 'WARNING'  # noqa: F405
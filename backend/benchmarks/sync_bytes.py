@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Octets transférés par actualisation : endpoints séparés contre /api/sync/
+
+Usage (depuis backend/, PostgreSQL local démarré) :
+
+    python -m benchmarks.sync_bytes
+
+Un pêcheur de la base de benchmark actualise ses données de deux façons :
+- comme l'application aujourd'hui, un GET par ressource (profil, positions,
+  alertes, zones, messages, météo) toutes les 30 secondes ;
+- par la synchronisation delta : un POST /api/sync/ compressé en gzip, en
+  premier chargement puis à chaque tour avec les curseurs reçus, sans
+  changement puis après une alerte et un message.
+Le nombre de requêtes HTTP et les octets de corps de réponse sont affichés
+pour chaque cas.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from apps.alerts.models import Alert  # noqa: E402
+from apps.communication.models import Message  # noqa: E402
+from benchmarks.scenarios import BenchmarkContext  # noqa: E402
+from benchmarks.seed import (  # noqa: E402
+    bench_channel, seed_accounts, seed_alerts, seed_messages, seed_weather, seed_zones,
+)
+
+LAT, LON = 14.9325, -17.1925
+
+LEGACY_ENDPOINTS = [
+    '/api/users/profile/',
+    '/api/tracking/locations/',
+    '/api/alerts/',
+    '/api/zones/',
+    '/api/communication/messages/',
+    f'/api/weather/current/?lat={LAT}&lon={LON}',
+]
+
+
+def legacy_refresh(client):
+    """(requêtes, octets) d'une actualisation par endpoints séparés, réponses non compressées"""
+    total = 0
+    for url in LEGACY_ENDPOINTS:
+        response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} a répondu {response.status_code}")
+        total += len(response.content)
+    return len(LEGACY_ENDPOINTS), total
+
+
+def delta_sync(client, cursors):
+    """(octets transférés, octets décompressés, curseurs suivants) d'un tour de synchronisation"""
+    response = client.post(
+        '/api/sync/', data=json.dumps({'cursors': cursors, 'lat': LAT, 'lon': LON}),
+        content_type='application/json', HTTP_ACCEPT_ENCODING='gzip',
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"/api/sync/ a répondu {response.status_code}")
+    body = response.content
+    if response.get('Content-Encoding') == 'gzip':
+        body = gzip.decompress(body)
+    resources = json.loads(body)['resources']
+    return len(response.content), len(body), {name: data['cursor'] for name, data in resources.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Octets par actualisation, PIROGUE-SMART")
+    parser.add_argument('--output', type=Path, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=True, serialize=False)
+    admin, fishermen, devices, tokens = seed_accounts()
+    seed_weather()
+    seed_messages(fishermen)
+    seed_zones(fishermen)
+    seed_alerts(admin, fishermen)
+    ctx = BenchmarkContext(admin, fishermen, devices, tokens)
+    fisherman = fishermen[0]
+    client = ctx.client_for(fisherman)
+
+    results = {}
+    requests, size = legacy_refresh(client)
+    results['legacy_refresh'] = {'requests': requests, 'bytes': size}
+
+    size, raw, cursors = delta_sync(client, {})
+    results['sync_initial'] = {'requests': 1, 'bytes': size, 'uncompressed_bytes': raw}
+    size, raw, cursors = delta_sync(client, cursors)
+    results['sync_unchanged'] = {'requests': 1, 'bytes': size, 'uncompressed_bytes': raw}
+
+    alert = Alert.objects.create(user=fisherman, alert_type='sos', title='bench_sync',
+                                 message='Panne moteur', severity='high')
+    message = Message.objects.create(sender=fisherman, receiver=fisherman, channel_id=bench_channel(0),
+                                     content='Retour au port de Cayar')
+    try:
+        size, raw, cursors = delta_sync(client, cursors)
+        results['sync_one_change'] = {'requests': 1, 'bytes': size, 'uncompressed_bytes': raw}
+    finally:
+        alert.delete()
+        message.delete()
+
+    for name, entry in results.items():
+        print(f"   {name}: {entry['requests']} requête(s) | {entry['bytes']} octets")
+    legacy = results['legacy_refresh']['bytes']
+    unchanged = results['sync_unchanged']['bytes']
+    print(f"✅ Actualisation sans changement : {legacy} -> {unchanged} octets ({legacy / max(unchanged, 1):.0f}x)")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
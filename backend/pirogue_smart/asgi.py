@@ -4,17 +4,21 @@ ASGI config for PIROGUE-SMART project.
 
 import os
 from django.core.asgi import get_asgi_application
-from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
-import apps.communication.routing
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pirogue_smart.settings')
 
+# Initialiser Django avant d'importer les consumers (modèles)
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from pirogue_smart.ws_auth import TokenAuthMiddlewareStack  # noqa: E402
+import apps.communication.routing  # noqa: E402
+
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
-    "websocket": AuthMiddlewareStack(
+    "http": django_asgi_app,
+    "websocket": TokenAuthMiddlewareStack(
         URLRouter(
             apps.communication.routing.websocket_urlpatterns
         )
     ),
-})
\ No newline at end of file
+})
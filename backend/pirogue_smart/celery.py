@@ -0,0 +1,12 @@
+"""
+Configuration Celery pour PIROGUE-SMART.
+"""
+
+import os
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pirogue_smart.settings')
+
+app = Celery('pirogue_smart')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,142 @@
+"""
+Lectures des listes et résumés sur le réplica PostgreSQL
+
+Les vues de lecture marquées par `ReplicaReadMixin` (vues génériques, GET
+uniquement) ou `@replica_reads` (vues fonctions) lisent sur la base
+REPLICA_DB_ALIAS quand elle est déclarée dans DATABASES. Tout le reste
+reste sur 'default' : écritures, webhooks d'ingestion, vues non marquées,
+lectures dans une transaction, tâches Celery.
+
+Lecture de ses propres écritures : une requête POST/PUT/PATCH/DELETE, ou
+toute requête passée par le routeur en écriture, marque l'utilisateur dans
+le cache partagé (écritures SQL brutes et base d'urgence comprises), et
+ses lectures restent sur le primaire pendant REPLICA_STICKY_SECONDS, le
+temps que le réplica rattrape son retard. Une lecture qui suit une
+écriture dans la même requête part aussi sur le primaire.
+Chaque requête HTTP compte sa décision dans `db_route_total`.
+"""
+
+import functools
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+from apps.monitoring.metrics import metrics
+
+# Routage de la requête HTTP en cours (None hors requête : tout sur 'default')
+current_routing = ContextVar('current_routing', default=None)
+
+
+def replica_alias():
+    """Alias du réplica, None s'il n'est pas configuré"""
+    alias = getattr(settings, 'REPLICA_DB_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def _sticky_key(user_id):
+    return f'db_sticky:{user_id}'
+
+
+class RequestRouting:
+    __slots__ = ('target', 'reason', 'wrote')
+
+    def __init__(self):
+        self.target = None
+        self.reason = 'default'
+        self.wrote = False
+
+
+def route_reads_to_replica(request):
+    """Envoyer les lectures de la requête au réplica, sauf écriture récente de l'utilisateur"""
+    routing = current_routing.get()
+    if routing is None or request.method not in SAFE_METHODS or routing.wrote:
+        return
+    alias = replica_alias()
+    if alias is None:
+        routing.reason = 'no_replica'
+        return
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and cache.get(_sticky_key(user.pk)):
+        routing.reason = 'sticky'
+        return
+    routing.target, routing.reason = alias, 'read_only'
+
+
+def replica_reads(view):
+    """Vues fonctions DRF (sous @api_view) : lectures sur le réplica"""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        route_reads_to_replica(request)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaReadMixin:
+    """Vues génériques DRF : lectures des requêtes GET sur le réplica, après authentification"""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        route_reads_to_replica(request)
+
+
+class ReplicaRouter:
+    """Lectures sur le réplica pour les requêtes marquées, écritures toujours sur le primaire"""
+
+    def db_for_read(self, model, **hints):
+        routing = current_routing.get()
+        if routing is None or routing.target is None:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Transaction ouverte : lire ce qu'elle a écrit
+            return None
+        return routing.target
+
+    def db_for_write(self, model, **hints):
+        routing = current_routing.get()
+        if routing is not None and not routing.wrote:
+            routing.wrote = True
+            if routing.target is not None:
+                routing.target, routing.reason = None, 'write'
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db == replica_alias():
+            # Instance lue sur le réplica : enregistrée sur le primaire
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, replica_alias()}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Réplica physique : le schéma vient du primaire
+        return False if db == replica_alias() else None
+
+
+class ReplicaRoutingMiddleware:
+    """État de routage par requête, marque d'écriture de l'utilisateur, métrique de décision"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routing = RequestRouting()
+        token = current_routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+
+        user = getattr(request, 'user', None)
+        # Méthode d'écriture : écrit peut-être hors du routeur (curseur brut, .using('emergency'))
+        if routing.wrote or request.method not in SAFE_METHODS:
+            if routing.reason == 'default':
+                routing.reason = 'write'
+            if user is not None and user.is_authenticated and replica_alias() is not None:
+                cache.set(_sticky_key(user.pk), 1, getattr(settings, 'REPLICA_STICKY_SECONDS', 10))
+
+        match = getattr(request, 'resolver_match', None)
+        metrics.inc('db_route_total', view=match.view_name if match else 'unmatched',
+                    target='replica' if routing.target else 'primary', reason=routing.reason)
+        return response
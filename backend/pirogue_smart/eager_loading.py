@@ -0,0 +1,24 @@
+"""
+Chargement anticipé des relations lues par les serializers
+
+Un serializer qui lit des relations (`sender.profile.full_name`, profil de
+l'auteur...) déclare `setup_eager_loading(queryset)` : select_related /
+annotate des relations qu'il parcourt. Les vues génériques qui utilisent
+`EagerLoadingMixin` l'appliquent à leur queryset, après leur propre
+filtrage : une page de liste coûte alors le même nombre de requêtes SQL
+quelle que soit sa taille.
+"""
+
+
+def eager_load(serializer_class, queryset):
+    """Appliquer le chargement anticipé déclaré par le serializer, s'il y en a un"""
+    setup = getattr(serializer_class, 'setup_eager_loading', None)
+    return setup(queryset) if setup is not None else queryset
+
+
+class EagerLoadingMixin:
+    """Vues génériques DRF : chargement anticipé pour la liste comme pour le détail"""
+
+    def filter_queryset(self, queryset):
+        # filter_queryset (et non get_queryset, que les vues redéfinissent) précède list() et get_object()
+        return eager_load(self.get_serializer_class(), super().filter_queryset(queryset))
@@ -0,0 +1,66 @@
+"""
+Rendu et lecture JSON rapides (orjson) pour l'API
+
+`ORJSONRenderer` et `ORJSONParser` remplacent JSONRenderer / JSONParser de
+DRF (REST_FRAMEWORK, activés par API_FAST_JSON). orjson encode lui-même
+datetime, date, time, UUID et dataclasses, Decimal devient un nombre ; les
+autres types (chaînes paresseuses, QuerySet, numpy...) passent par
+l'encodeur de DRF : la sortie est celle de JSONRenderer, en octets UTF-8
+compacts.
+`loads` sert aux webhooks qui lisent le corps brut de la requête.
+"""
+
+from decimal import Decimal
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# UTC rendu « Z » comme DRF, clés non textuelles converties comme json.dumps
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+JSONDecodeError = orjson.JSONDecodeError  # sous-classe de json.JSONDecodeError
+
+_drf_default = JSONEncoder().default
+
+
+def _default(obj):
+    # Decimal (coordonnées lues par values()) : float comme l'encodeur DRF, sans parcourir ses cas
+    if type(obj) is Decimal:
+        return float(obj)
+    return _drf_default(obj)
+
+
+def dumps(data):
+    return orjson.dumps(data, default=_default, option=OPTIONS)
+
+
+def loads(content):
+    return orjson.loads(content)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer encodé par orjson (indentation demandée : rendu standard de DRF)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        content = dumps(data)
+        # Comme DRF : U+2028 / U+2029 échappés pour l'inclusion dans du JavaScript
+        if b'\xe2\x80' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser lu par orjson (corps en UTF-8)"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return loads(stream.read())
+        except JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
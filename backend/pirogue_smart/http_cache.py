@@ -0,0 +1,160 @@
+"""
+Cache HTTP conditionnel des ressources peu modifiées (météo, zones)
+
+Chaque ressource a un compteur de version dans le cache partagé, incrémenté
+à chaque écriture (`bump_version`). Les vues décorées :
+- répondent 304 Not Modified si l'ETag (ressource, version, paramètres)
+  ou la date If-Modified-Since du client est toujours valide ;
+- servent sinon les données déjà sérialisées depuis le cache partagé, clé
+  construite sur la version et les paramètres de requête normalisés : ni
+  requête SQL ni serializer sur un hit.
+Les en-têtes ETag, Last-Modified et Cache-Control sont ajoutés à chaque
+réponse 200.
+"""
+
+import functools
+import hashlib
+import logging
+import time
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.response import Response
+from apps.monitoring.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'http_cache'
+
+
+def _version_key(resource):
+    return f'{KEY_PREFIX}:version:{resource}'
+
+
+def _modified_key(resource):
+    return f'{KEY_PREFIX}:modified:{resource}'
+
+
+def get_version(resource: str):
+    """(version, date de dernière modification en secondes epoch) d'une ressource"""
+    keys = [_version_key(resource), _modified_key(resource)]
+    try:
+        values = cache.get_many(keys)
+        if keys[0] not in values:
+            # Cache vidé : nouvelle version (horodatage), les ETag déjà distribués deviennent invalides
+            now = int(time.time())
+            cache.add(keys[0], now, timeout=None)
+            cache.add(keys[1], now, timeout=None)
+            values = cache.get_many(keys)
+        now = int(time.time())
+        return values.get(keys[0], now), values.get(keys[1], now)
+    except Exception as e:
+        logger.warning(f"Lecture de la version HTTP de {resource} impossible: {str(e)}")
+        return None, None
+
+
+def bump_version(resource: str):
+    """Invalider les réponses en cache et les ETag d'une ressource (à appeler à chaque écriture)"""
+    try:
+        try:
+            cache.incr(_version_key(resource))
+        except ValueError:
+            cache.set(_version_key(resource), int(time.time()), timeout=None)
+        cache.set(_modified_key(resource), int(time.time()), timeout=None)
+    except Exception as e:
+        logger.warning(f"Mise à jour de la version HTTP de {resource} impossible: {str(e)}")
+
+
+def normalized_query(request) -> str:
+    """Paramètres de requête triés, valeurs vides ignorées"""
+    params = sorted(
+        (key, value)
+        for key in request.query_params
+        for value in request.query_params.getlist(key)
+        if value != ''
+    )
+    return urlencode(params)
+
+
+def cached_response(request, resource, produce, max_age=None, time_bucket=None):
+    """
+    Réponse conditionnelle pour `resource`, `produce()` n'étant appelé qu'en cas d'échec du cache.
+    `time_bucket` (secondes) : pour les données qui dépendent aussi de l'heure courante.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return produce()
+
+    version, modified = get_version(resource)
+    if version is None:
+        return produce()
+
+    max_age = max_age if max_age is not None else getattr(settings, 'HTTP_CACHE_MAX_AGE', 60)
+    if time_bucket:
+        bucket = int(time.time()) // time_bucket
+        version = f'{version}.{bucket}'
+        modified = max(modified, bucket * time_bucket)
+
+    query = normalized_query(request)
+    digest = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()[:16]
+    etag = f'"{resource}-{version}-{digest}"'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(modified),
+        'Cache-Control': f'private, max-age={max_age}, must-revalidate',
+    }
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        not_modified = etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')] \
+            or if_none_match.strip() == '*'
+    else:
+        since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        not_modified = since is not None and since >= modified
+    if not_modified:
+        metrics.inc('http_cache_requests_total', resource=resource, result='not_modified')
+        return Response(status=304, headers=headers)
+
+    key = f'{KEY_PREFIX}:response:{resource}:{version}:{digest}'
+    try:
+        data = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Lecture du cache HTTP impossible: {str(e)}")
+        data = None
+    if data is not None:
+        metrics.inc('http_cache_requests_total', resource=resource, result='hit')
+        return Response(data, headers=headers)
+
+    metrics.inc('http_cache_requests_total', resource=resource, result='miss')
+    response = produce()
+    if response.status_code == 200:
+        try:
+            cache.set(key, response.data, timeout=getattr(settings, 'HTTP_CACHE_TIMEOUT', 300))
+        except Exception as e:
+            logger.warning(f"Écriture du cache HTTP impossible: {str(e)}")
+        for header, value in headers.items():
+            response[header] = value
+    return response
+
+
+def cache_response(resource, max_age=None, time_bucket=None):
+    """Décorateur pour les vues fonction DRF (à placer sous @api_view / @permission_classes)"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            return cached_response(request, resource, lambda: view(request, *args, **kwargs),
+                                   max_age=max_age, time_bucket=time_bucket)
+        return wrapper
+    return decorator
+
+
+class CachedListMixin:
+    """Équivalent de cache_response pour les vues génériques de liste"""
+    cache_resource = None
+    cache_max_age = None
+    cache_time_bucket = None
+
+    def list(self, request, *args, **kwargs):
+        produce = functools.partial(super().list, request, *args, **kwargs)
+        return cached_response(request, self.cache_resource, produce,
+                               max_age=self.cache_max_age, time_bucket=self.cache_time_bucket)
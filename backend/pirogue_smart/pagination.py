@@ -0,0 +1,8 @@
+from django.conf import settings
+from rest_framework.pagination import PageNumberPagination
+
+
+class StandardPagination(PageNumberPagination):
+    """Pagination par numéro de page, taille ajustable par ?page_size= (bornée)"""
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'MAX_PAGE_SIZE', 500)
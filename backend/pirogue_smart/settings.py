@@ -42,11 +42,15 @@ LOCAL_APPS = [
     'apps.communication',
     'apps.zones',
     'apps.weather',
+    'apps.monitoring',
+    'apps.sync',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'apps.monitoring.middleware.MetricsMiddleware',
+    'pirogue_smart.db_routing.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -89,8 +93,38 @@ DATABASES = {
         'PORT': config('PGPORT', default=config('DB_PORT', default='5432')),
     }
 }
+
+# Connexion dédiée au circuit SOS : même base, connexion persistante et timeout court,
+# pour qu'une alerte d'urgence n'attende jamais derrière l'ingestion ou les listes
+DATABASES['emergency'] = {
+    **DATABASES['default'],
+    'CONN_MAX_AGE': 600,
+    'OPTIONS': {'options': '-c statement_timeout=2000'},
+    'TEST': {'MIRROR': 'default'},
+}
+
+# Réplica en lecture pour les listes, historiques et résumés (pirogue_smart/db_routing.py) :
+# déclaré si REPLICA_DB_HOST est renseigné, sinon tout reste sur 'default'
+REPLICA_DB_ALIAS = config('REPLICA_DB_ALIAS', default='replica')
+if config('REPLICA_DB_HOST', default=''):
+    DATABASES[REPLICA_DB_ALIAS] = {
+        **DATABASES['default'],
+        'NAME': config('REPLICA_DB_NAME', default=DATABASES['default']['NAME']),
+        'HOST': config('REPLICA_DB_HOST'),
+        'PORT': config('REPLICA_DB_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+# Après une écriture, lectures de l'utilisateur sur le primaire pendant ce délai (secondes)
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+DATABASE_ROUTERS = ['pirogue_smart.db_routing.ReplicaRouter']
 AUTH_USER_MODEL = "users.User"
 
+# Connexion par email d'abord (un seul hash), nom d'utilisateur pour l'admin Django
+AUTHENTICATION_BACKENDS = [
+    'apps.users.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -130,14 +164,32 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'apps.users.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-          'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+          'DEFAULT_PAGINATION_CLASS': 'pirogue_smart.pagination.StandardPagination',
       'PAGE_SIZE': 20
     }
+# JSON des réponses et des corps de requête par orjson (pirogue_smart/fast_json.py)
+API_FAST_JSON = config('API_FAST_JSON', default=True, cast=bool)
+if API_FAST_JSON:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+        'pirogue_smart.fast_json.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ]
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = [
+        'pirogue_smart.fast_json.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ]
+# Cache des tokens d'API : entrées du LRU local, durée de vie locale et dans le cache partagé (secondes)
+AUTH_TOKEN_CACHE_SIZE = config('AUTH_TOKEN_CACHE_SIZE', default=1024, cast=int)
+AUTH_TOKEN_LOCAL_TTL = config('AUTH_TOKEN_LOCAL_TTL', default=5, cast=int)
+AUTH_TOKEN_CACHE_TTL = config('AUTH_TOKEN_CACHE_TTL', default=60, cast=int)
+# Taille de page maximale demandée par ?page_size=
+MAX_PAGE_SIZE = config('MAX_PAGE_SIZE', default=500, cast=int)
 
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
@@ -162,20 +214,153 @@ CORS_ALLOW_METHODS = [
     'POST',
     'PUT',
 ]
+# En-têtes de cache HTTP lisibles par le frontend
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified']
+
+REDIS_URL = config('REDIS_URL', default='redis://localhost:6379')
+
+# Cache partagé entre workers (LocMemCache possible en développement via CACHE_BACKEND)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.redis.RedisCache'),
+        'LOCATION': config('CACHE_LOCATION', default=REDIS_URL),
+    }
+}
 
 # Channelscom
+# Pub/sub Redis : un group_send est un seul PUBLISH, sans file par processus à dépiler message
+# par message (channels_redis.core plafonne à ~1500 diffusions/s par processus). Livraison
+# « au plus une fois » : les messages de chat manqués sont récupérés par la reprise (resume).
 CHANNEL_LAYERS = {
     'default': {
-        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'BACKEND': config('CHANNEL_LAYER_BACKEND', default='channels_redis.pubsub.RedisPubSubChannelLayer'),
         'CONFIG': {
-            "hosts": [('127.0.0.1', 6379)],
+            "hosts": [config('CHANNEL_LAYER_URL', default=REDIS_URL)],
         },
     },
 }
 
 # Celery Configuration
-CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379')
-CELERY_RESULT_BACKEND = config('REDIS_URL', default='redis://localhost:6379')
+CELERY_BROKER_URL = REDIS_URL
+CELERY_RESULT_BACKEND = REDIS_URL
+CELERY_TIMEZONE = TIME_ZONE
+# Traitement des images du chat : file dédiée possible pour un pool de workers séparé
+# (celery -A pirogue_smart worker -Q images), file par défaut sinon
+CHAT_IMAGE_QUEUE = config('CHAT_IMAGE_QUEUE', default='celery')
+CELERY_TASK_ROUTES = {
+    'apps.communication.tasks.process_chat_image': {'queue': CHAT_IMAGE_QUEUE},
+}
+CELERY_BEAT_SCHEDULE = {
+    'reconcile-alert-counters': {
+        'task': 'apps.alerts.tasks.reconcile_alert_counters',
+        'schedule': 15 * 60,
+    },
+    'reconcile-unread-counters': {
+        'task': 'apps.communication.tasks.reconcile_unread_counters',
+        'schedule': 60 * 60,
+    },
+    'flush-presence': {
+        'task': 'apps.tracking.tasks.flush_presence',
+        'schedule': 60,
+    },
+    'purge-sync-tombstones': {
+        'task': 'apps.sync.tasks.purge_tombstones',
+        'schedule': 24 * 60 * 60,
+    },
+    'archive-alerts': {
+        'task': 'apps.alerts.tasks.archive_alerts',
+        'schedule': 24 * 60 * 60,
+    },
+    'ingest-weather-forecasts': {
+        'task': 'apps.weather.tasks.ingest_weather_forecasts',
+        'schedule': 10 * 60,
+    },
+    'score-fleet-weather-risk': {
+        'task': 'apps.weather.tasks.score_fleet_weather_risk',
+        'schedule': 5 * 60,
+    },
+}
+
+# Métriques Prometheus (agrégées entre workers dans Redis, vide = locales au processus)
+METRICS_REDIS_URL = config('METRICS_REDIS_URL', default=REDIS_URL)
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5, cast=int)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Alertes : fenêtre (secondes) pendant laquelle une alarme répétée met à jour l'alerte active
+ALERT_SUPPRESSION_WINDOW = config('ALERT_SUPPRESSION_WINDOW', default=300, cast=int)
+# Ancienneté (jours) après laquelle une alerte résolue ou acquittée part en archive
+ALERT_ARCHIVE_AFTER_DAYS = config('ALERT_ARCHIVE_AFTER_DAYS', default=30, cast=int)
+
+# Circuit d'urgence (SOS)
+EMERGENCY_DB_ALIAS = 'emergency'
+EMERGENCY_NEAREST_VESSELS = config('EMERGENCY_NEAREST_VESSELS', default=5, cast=int)
+EMERGENCY_LATENCY_BUDGET_MS = config('EMERGENCY_LATENCY_BUDGET_MS', default=500, cast=int)
+
+# Index en mémoire des dernières positions de la flotte
+FLEET_INDEX_CELL_DEG = 0.1
+FLEET_INDEX_MAX_AGE_HOURS = config('FLEET_INDEX_MAX_AGE_HOURS', default=12, cast=int)
+FLEET_INDEX_REFRESH = config('FLEET_INDEX_REFRESH', default=30, cast=int)
+
+# Présence dans Redis (vide = désactivée) : durée d'activité, écriture websocket au plus toutes les
+# PRESENCE_TOUCH_INTERVAL secondes, organisation des utilisateurs gardée PRESENCE_ORG_CACHE_SECONDS
+PRESENCE_REDIS_URL = config('PRESENCE_REDIS_URL', default=REDIS_URL)
+PRESENCE_TTL_SECONDS = config('PRESENCE_TTL_SECONDS', default=300, cast=int)
+PRESENCE_TOUCH_INTERVAL = config('PRESENCE_TOUCH_INTERVAL', default=30, cast=int)
+PRESENCE_ORG_CACHE_SECONDS = config('PRESENCE_ORG_CACHE_SECONDS', default=300, cast=int)
+
+# Grille météo : pas en degrés (le changer impose de recalculer grid_i/grid_j),
+# vérification de la version partagée (secondes) et âge maximal d'une prévision courante
+WEATHER_GRID_DEG = 0.25
+WEATHER_GRID_CHECK = config('WEATHER_GRID_CHECK', default=5, cast=int)
+WEATHER_GRID_MAX_AGE_HOURS = config('WEATHER_GRID_MAX_AGE_HOURS', default=24, cast=int)
+# Fichiers de prévisions à ingérer (.csv / .npz) et durée de conservation des échéances passées
+WEATHER_FORECAST_DIR = config('WEATHER_FORECAST_DIR', default=str(BASE_DIR / 'data' / 'forecasts'))
+WEATHER_FORECAST_RETENTION_HOURS = config('WEATHER_FORECAST_RETENTION_HOURS', default=48, cast=int)
+# Météo le long d'un itinéraire : horizon des prévisions en mémoire, pas d'échantillonnage, vitesse par défaut
+WEATHER_ROUTE_HORIZON_HOURS = config('WEATHER_ROUTE_HORIZON_HOURS', default=72, cast=int)
+WEATHER_ROUTE_STEP_KM = config('WEATHER_ROUTE_STEP_KM', default=2, cast=float)
+WEATHER_ROUTE_DEFAULT_SPEED_KMH = config('WEATHER_ROUTE_DEFAULT_SPEED_KMH', default=15, cast=float)
+# Zone couverte par le cube d'itinéraire « lat_min,lon_min,lat_max,lon_max » : nœuds hors zone ignorés
+WEATHER_ROUTE_BBOX = config('WEATHER_ROUTE_BBOX', default='10,-22,18,-14',
+                            cast=lambda v: tuple(float(x) for x in v.split(',')))
+# Risque météo de la flotte : (seuil de vigilance, seuil de danger) ; visibilité : plus bas est pire
+WEATHER_RISK_THRESHOLDS = {
+    'wind_speed': (30, 50),      # km/h
+    'wave_height': (2.0, 3.0),   # m
+    'visibility': (2.0, 1.0),    # km
+}
+
+# Chat temps réel : enregistrement par lots (taille maximale, délai maximal en ms)
+# et nombre maximal de messages renvoyés à la reprise d'une connexion
+CHAT_BATCH_SIZE = config('CHAT_BATCH_SIZE', default=100, cast=int)
+CHAT_BATCH_DELAY_MS = config('CHAT_BATCH_DELAY_MS', default=50, cast=int)
+CHAT_RESUME_LIMIT = config('CHAT_RESUME_LIMIT', default=500, cast=int)
+# Variantes des images du chat : {nom: (plus grand côté en pixels, qualité WebP/JPEG)}
+CHAT_IMAGE_VARIANTS = {
+    'large': (2048, 85),
+    'medium': (1024, 80),
+    'thumb': (320, 70),
+}
+# Synchronisation HTTP par curseur : taille de page (défaut, maximum), attente maximale
+# du long-poll (s) et intervalle de vérification de la version du canal (ms)
+CHAT_SYNC_PAGE_SIZE = 100
+CHAT_SYNC_MAX_PAGE_SIZE = 500
+CHAT_SYNC_MAX_WAIT = config('CHAT_SYNC_MAX_WAIT', default=25, cast=int)
+CHAT_SYNC_POLL_MS = config('CHAT_SYNC_POLL_MS', default=250, cast=int)
+# Recherche plein texte des messages : taille de page (défaut, maximum)
+CHAT_SEARCH_PAGE_SIZE = 20
+CHAT_SEARCH_MAX_PAGE_SIZE = 100
+
+# Synchronisation delta (/api/sync/) : enregistrements par ressource et par tour, envois par tour,
+# marge de validation des transactions et rétention des suppressions
+SYNC_MAX_RECORDS = config('SYNC_MAX_RECORDS', default=500, cast=int)
+SYNC_MAX_UPLOADS = config('SYNC_MAX_UPLOADS', default=1000, cast=int)
+SYNC_COMMIT_MARGIN_SECONDS = config('SYNC_COMMIT_MARGIN_SECONDS', default=5, cast=int)
+SYNC_TOMBSTONE_RETENTION_DAYS = config('SYNC_TOMBSTONE_RETENTION_DAYS', default=30, cast=int)
+
+# Cache HTTP conditionnel (météo, zones) : max-age client et durée de vie des réponses partagées
+HTTP_CACHE_MAX_AGE = config('HTTP_CACHE_MAX_AGE', default=60, cast=int)
+HTTP_CACHE_TIMEOUT = config('HTTP_CACHE_TIMEOUT', default=300, cast=int)
 
 # Totarget GPS API Configuration
 TOTARGET_API_URL = config('TOTARGET_API_URL', default='https://api.totarget.net:8108/api/send-command')
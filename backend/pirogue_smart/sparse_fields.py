@@ -0,0 +1,182 @@
+"""
+Champs partiels (?fields=) et listes en lecture rapide
+
+`?fields=id,latitude,longitude` limite la réponse aux champs demandés
+(liste comme détail). Les vues de liste qui utilisent `SparseFieldsMixin`
+construisent en plus leurs pages sans instancier de modèles : le
+serializer est traduit une fois par requête en colonnes `values_list()`
+(relations comprises : `user.profile.full_name` devient
+`user__profile__full_name`, un serializer imbriqué devient ses propres
+colonnes), et chaque ligne est convertie par le `to_representation` des
+seuls champs demandés. Le SQL ne lit que ces colonnes.
+La sortie est celle du serializer, y compris les clés omises quand une
+relation facultative est vide. Un serializer sans équivalent values()
+(SerializerMethodField, relation multiple, source='*') passe par le
+chemin normal.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.fields.files import FieldFile, FileField
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.fields import ISO_8601
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+FIELDS_PARAM = 'fields'
+
+
+def requested_fields(request):
+    """Champs demandés par ?fields=a,b (None : tous)"""
+    value = request.query_params.get(FIELDS_PARAM) if request is not None else None
+    if not value:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def restrict_fields(serializer, names):
+    """Retirer du serializer les champs non demandés, ValidationError si un nom est inconnu"""
+    target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+    unknown = [name for name in names if name not in target.fields]
+    if unknown:
+        raise serializers.ValidationError({FIELDS_PARAM: f"Champs inconnus: {', '.join(unknown)}"})
+    for name in set(target.fields) - set(names):
+        target.fields.pop(name)
+    return serializer
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _converter(field, model_field):
+    """Conversion d'une valeur de values_list() vers la sortie de `field`, à l'identique de DRF"""
+    if isinstance(field, serializers.RelatedField):
+        # PrimaryKeyRelatedField : la colonne contient déjà l'id
+        return None
+    if isinstance(model_field, FileField):
+        # values() renvoie le nom du fichier : FieldFile pour l'URL (absolue avec la requête du contexte)
+        return lambda value: field.to_representation(FieldFile(None, model_field, value))
+
+    if isinstance(field, serializers.DateTimeField) and \
+            getattr(field, 'format', api_settings.DATETIME_FORMAT) == ISO_8601:
+        # Fuseau résolu une fois par page et non à chaque valeur
+        tz = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if tz is not None:
+            def datetime_representation(value):
+                if not isinstance(value, datetime) or timezone.is_naive(value):
+                    return field.to_representation(value)
+                value = value.astimezone(tz).isoformat()
+                return value[:-6] + 'Z' if value.endswith('+00:00') else value
+            return datetime_representation
+
+    if isinstance(field, serializers.DecimalField) and not field.localize and \
+            getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING) and \
+            field.decimal_places is not None:
+        # Valeur lue avec l'échelle de la colonne : l'arrondi de DRF ne la change pas
+        exponent = -field.decimal_places
+        def decimal_representation(value):
+            if isinstance(value, Decimal) and value.as_tuple().exponent == exponent:
+                return '{:f}'.format(value)
+            return field.to_representation(value)
+        return decimal_representation
+
+    return field.to_representation
+
+
+class FastListPlan:
+    """Colonnes values_list() d'un serializer et construction des dicts de sortie à partir des tuples"""
+
+    def __init__(self, serializer):
+        self.paths = []
+        self._indexes = {}
+        self.build = self._compile(serializer, serializer.Meta.model, '')
+
+    def _index(self, path):
+        if path not in self._indexes:
+            self._indexes[path] = len(self.paths)
+            self.paths.append(path)
+        return self._indexes[path]
+
+    def _resolve(self, model, attrs):
+        """(chemin relatif, colonnes à tester, champ de modèle final) d'une source pointée"""
+        guards = []
+        for position, attr in enumerate(attrs[:-1]):
+            field = model._meta.get_field(attr)
+            if not field.is_relation:
+                raise _Unsupported(attr)
+            if field.concrete and field.null:
+                # Clé étrangère vide : DRF omet la clé (AttributeError sur None)
+                guards.append('__'.join(attrs[:position + 1]))
+            model = field.related_model
+        model_field = model._meta.get_field(attrs[-1])
+        if model_field.is_relation and not model_field.concrete:
+            raise _Unsupported(attrs[-1])
+        return '__'.join(attrs), guards, model_field
+
+    def _compile(self, serializer, model, prefix):
+        entries = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or isinstance(field, (serializers.SerializerMethodField,
+                                                         serializers.ManyRelatedField,
+                                                         serializers.ListSerializer)):
+                raise _Unsupported(name)
+
+            if isinstance(field, serializers.BaseSerializer):
+                if '.' in field.source or not model._meta.get_field(field.source).is_relation:
+                    raise _Unsupported(name)
+                nested_model = field.Meta.model
+                pk = self._index(f'{prefix}{field.source}__{nested_model._meta.pk.name}')
+                entries.append((name, 'nested', pk, self._compile(field, nested_model, f'{prefix}{field.source}__')))
+                continue
+
+            path, guards, model_field = self._resolve(model, field.source_attrs)
+            guards = [self._index(prefix + guard) for guard in guards]
+            entries.append((name, 'field', self._index(prefix + path), (guards, _converter(field, model_field))))
+
+        def build(row):
+            data = {}
+            for name, kind, index, extra in entries:
+                if kind == 'nested':
+                    data[name] = None if row[index] is None else extra(row)
+                    continue
+                guards, convert = extra
+                if any(row[guard] is None for guard in guards):
+                    continue
+                value = row[index]
+                data[name] = value if value is None or convert is None else convert(value)
+            return data
+
+        return build
+
+
+def fast_list_plan(serializer):
+    """FastListPlan du serializer, None s'il n'a pas d'équivalent values()"""
+    try:
+        return FastListPlan(serializer)
+    except (_Unsupported, FieldDoesNotExist, AttributeError):
+        return None
+
+
+class SparseFieldsMixin:
+    """Vues génériques DRF : ?fields= sur les lectures, listes construites depuis values_list()"""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        names = requested_fields(self.request) if self.request.method == 'GET' else None
+        return restrict_fields(serializer, names) if names else serializer
+
+    def list(self, request, *args, **kwargs):
+        plan = fast_list_plan(self.get_serializer())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).values_list(*plan.paths)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response([plan.build(row) for row in page])
+        return Response([plan.build(row) for row in queryset])
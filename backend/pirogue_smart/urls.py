@@ -11,6 +11,8 @@ urlpatterns = [
     path('api/communication/', include('apps.communication.urls')),
     path('api/zones/', include('apps.zones.urls')),
     path('api/weather/', include('apps.weather.urls')),
+    path('api/monitoring/', include('apps.monitoring.urls')),
+    path('api/sync/', include('apps.sync.urls')),
 ]
 
 # Servir les fichiers media en développement
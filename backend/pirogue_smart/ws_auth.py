@@ -0,0 +1,40 @@
+"""
+Authentification des websockets par token DRF
+
+Le frontend s'authentifie par token (en-tête Authorization), que les
+navigateurs ne peuvent pas envoyer à l'ouverture d'un websocket : le token
+est passé dans la query string (`?token=...`). Sans token, la session
+Django (AuthMiddlewareStack) reste utilisée.
+"""
+
+from urllib.parse import parse_qs
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+
+
+@database_sync_to_async
+def _user_for_token(key):
+    from rest_framework.authtoken.models import Token
+    try:
+        # Profil chargé avec l'utilisateur : les consumers de chat affichent le nom de l'expéditeur
+        token = Token.objects.select_related('user__profile').get(key=key)
+    except Token.DoesNotExist:
+        return None
+    return token.user if token.user.is_active else None
+
+
+class TokenAuthMiddleware(BaseMiddleware):
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get('query_string', b'').decode())
+        key = (query.get('token') or [None])[0]
+        if key:
+            user = await _user_for_token(key)
+            if user is not None:
+                scope['user'] = user
+        return await super().__call__(scope, receive, send)
+
+
+def TokenAuthMiddlewareStack(inner):
+    # Session d'abord, le token (s'il est valide) remplace l'utilisateur anonyme
+    return AuthMiddlewareStack(TokenAuthMiddleware(inner))
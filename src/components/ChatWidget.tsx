@@ -3,6 +3,7 @@ import { MessageCircle, Send, MapPin, X, Users, AlertTriangle, Cloud, Anchor, Mi
 import { motion, AnimatePresence } from 'framer-motion';
 import { useAuth } from '../contexts/AuthContext';
 import { useData } from '../contexts/DataContext';
+import { communicationAPI } from '../lib/djangoApi';
 
 const ChatWidget: React.FC = () => {
   const { user } = useAuth();
@@ -35,12 +36,27 @@ const ChatWidget: React.FC = () => {
   }, [channelMessages]);
 
   useEffect(() => {
-    const unread = messages.filter(msg => 
-      !msg.isRead && msg.senderId !== user?.id
-    ).length;
-    setUnreadCount(unread);
+    // Compteur serveur (une ligne par canal), calcul local si l'API est indisponible
+    communicationAPI.getUnreadCounts()
+      .then(data => setUnreadCount(data.total))
+      .catch(() => {
+        const unread = messages.filter(msg => 
+          !msg.isRead && msg.senderId !== user?.id
+        ).length;
+        setUnreadCount(unread);
+      });
   }, [messages, user?.id]);
 
+  useEffect(() => {
+    // Canal affiché : tout est lu jusqu'au dernier message
+    const last = channelMessages[channelMessages.length - 1];
+    if (!isOpen || isMinimized || !last || !/^\d+$/.test(last.id)) return;
+    communicationAPI.markAsRead(last.id)
+      .then(() => communicationAPI.getUnreadCounts())
+      .then(data => setUnreadCount(data.total))
+      .catch(() => {});
+  }, [isOpen, isMinimized, activeChannel, channelMessages.length]);
+
   const handleSendMessage = async (e: React.FormEvent) => {
     e.preventDefault();
     if (!newMessage.trim() || !user) return;
@@ -328,7 +344,7 @@ const ChatWidget: React.FC = () => {
                               {message.type === 'image' && message.imageUrl && (
                                 <div className="mt-3">
                                   <img 
-                                    src={message.imageUrl} 
+                                    src={message.thumbnailUrl || message.imageUrl} 
                                     alt="Image partagée"
                                     className="max-w-full h-auto rounded-lg cursor-pointer hover:opacity-90 transition-opacity"
                                     onClick={() => window.open(message.imageUrl, '_blank')}
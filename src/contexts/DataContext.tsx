@@ -334,6 +334,8 @@ export const DataProvider: React.FC<{ children: React.ReactNode }> = ({ children
           timestamp: msg.created_at,
           isRead: msg.is_read,
           imageUrl: msg.image_url,
+          // Vignette WebP (~20 Ko) générée par le serveur, l'image complète n'est chargée qu'au clic
+          thumbnailUrl: msg.image_variants?.thumb?.webp,
           metadata: msg.metadata
         }));
         setMessages(transformedMessages);
@@ -666,7 +668,18 @@ export const DataProvider: React.FC<{ children: React.ReactNode }> = ({ children
     try {
       let alertId: string;
       
-      if (isDjangoConnected) {
+      if (isDjangoConnected && alert.type === 'emergency') {
+        // Circuit SOS dédié : enregistrement atomique et diffusion aux navires les plus proches
+        const response = await alertsAPI.sendEmergency({
+          latitude: alert.location?.latitude,
+          longitude: alert.location?.longitude,
+          speed: alert.location?.speed,
+          heading: alert.location?.heading,
+          message: alert.message
+        });
+        alertId = response.alert.id;
+        console.log('🚨 Alerte SOS envoyée à Django');
+      } else if (isDjangoConnected) {
         const response = await alertsAPI.createAlert({
           user: alert.userId,
           alert_type: alert.type,
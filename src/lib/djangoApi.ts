@@ -436,6 +436,16 @@ export const alertsAPI = {
     }
   },
 
+  sendEmergency: async (data: { latitude?: number; longitude?: number; speed?: number; heading?: number; message?: string }): Promise<any> => {
+    try {
+      const response = await api.post('/alerts/emergency/', data);
+      return response.data;
+    } catch (error) {
+      console.error('Erreur lors de l\'envoi de l\'alerte SOS:', error);
+      throw error;
+    }
+  },
+
   acknowledgeAlert: async (alertId: string): Promise<void> => {
     try {
       await api.post(`/alerts/${alertId}/acknowledge/`);
@@ -445,6 +455,16 @@ export const alertsAPI = {
     }
   },
 
+  bulkUpdateAlerts: async (data: { action: 'acknowledge' | 'resolve' | 'acknowledge_all'; ids?: number[]; filter?: Record<string, any> }): Promise<{ updated: number; ids: number[] }> => {
+    try {
+      const response = await api.post('/alerts/bulk/', data);
+      return response.data;
+    } catch (error) {
+      console.error('Erreur lors de la mise à jour groupée des alertes:', error);
+      throw error;
+    }
+  },
+
   updateAlert: async (alertId: string, data: Partial<Alert>): Promise<Alert> => {
     try {
       const response = await api.put(`/alerts/${alertId}/`, data);
@@ -490,6 +510,48 @@ export const communicationAPI = {
     }
   },
 
+  // Synchronisation par curseur : afterId pour les nouveaux messages (wait en secondes pour le long-poll),
+  // beforeId pour remonter l'historique ; renvoie results, has_more, first_id et last_id
+  syncMessages: async (channelId: string, params: { afterId?: number; beforeId?: number; limit?: number; wait?: number } = {}): Promise<any> => {
+    try {
+      const response = await api.get('/communication/messages/sync/', {
+        params: {
+          channel: channelId,
+          after_id: params.afterId,
+          before_id: params.beforeId,
+          limit: params.limit,
+          wait: params.wait,
+        },
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Erreur lors de la synchronisation des messages:', error);
+      throw error;
+    }
+  },
+
+  // Recherche plein texte (syntaxe web : "expression exacte", -exclu) ; order 'rank' ou 'recent',
+  // cursor = next_cursor de la page précédente
+  searchMessages: async (query: string, params: { channels?: string[]; since?: string; until?: string; order?: 'rank' | 'recent'; cursor?: string; limit?: number } = {}): Promise<any> => {
+    try {
+      const response = await api.get('/communication/messages/search/', {
+        params: {
+          q: query,
+          channel: params.channels?.join(','),
+          since: params.since,
+          until: params.until,
+          order: params.order,
+          cursor: params.cursor,
+          limit: params.limit,
+        },
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Erreur lors de la recherche de messages:', error);
+      throw error;
+    }
+  },
+
   sendMessage: async (data: Omit<Message, 'id' | 'timestamp' | 'isRead'>): Promise<Message> => {
     try {
       const response = await api.post('/communication/messages/', data);
@@ -509,6 +571,17 @@ export const communicationAPI = {
     }
   },
 
+  // Non lus par canal, maintenus côté serveur : { total, channels: [{ channel_id, unread, last_read_id }] }
+  getUnreadCounts: async (): Promise<any> => {
+    try {
+      const response = await api.get('/communication/unread/');
+      return response.data;
+    } catch (error) {
+      console.error('Erreur lors de la récupération des messages non lus:', error);
+      throw error;
+    }
+  },
+
   deleteMessage: async (messageId: string): Promise<void> => {
     try {
       await api.delete(`/communication/messages/${messageId}/`);
@@ -630,6 +703,16 @@ export const weatherAPI = {
     }
   },
 
+  getRouteWeather: async (data: { points?: [number, number][]; trip?: number; speed_kmh?: number; departure?: string }): Promise<any> => {
+    try {
+      const response = await api.post('/weather/route/', data);
+      return response.data;
+    } catch (error) {
+      console.error('Erreur lors de la récupération de la météo sur l\'itinéraire:', error);
+      throw error;
+    }
+  },
+
   getWeatherAlerts: async (latitude: number, longitude: number): Promise<Alert[]> => {
     try {
       const response = await api.get(`/weather/alerts/?lat=${latitude}&lon=${longitude}`);
@@ -641,4 +724,29 @@ export const weatherAPI = {
   }
 };
 
+// Synchronisation delta en un aller-retour (connexion faible en mer) : cursors = curseurs reçus
+// au tour précédent par ressource, uploads = positions et messages en file avec un client_id.
+// Réponse : { server_time, uploads, resources: { nom: { cursor, reset, updated, deleted, has_more } } }
+export const syncAPI = {
+  sync: async (
+    cursors: Record<string, string> = {},
+    uploads: { locations?: any[]; messages?: any[] } = {},
+    options: { resources?: string[]; latitude?: number; longitude?: number } = {}
+  ): Promise<any> => {
+    try {
+      const response = await api.post('/sync/', {
+        cursors,
+        uploads,
+        resources: options.resources,
+        lat: options.latitude,
+        lon: options.longitude,
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Erreur lors de la synchronisation:', error);
+      throw error;
+    }
+  }
+};
+
 export default api;
\ No newline at end of file
@@ -54,6 +54,7 @@ export interface Message {
   timestamp: string;
   isRead: boolean;
   imageUrl?: string;
+  thumbnailUrl?: string;
   metadata?: Record<string, any>;
 }
 